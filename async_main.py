@@ -0,0 +1,396 @@
+"""
+Async mode: saare updates ek hi asyncio loop par (AsyncTeleBot). Hazaron conversations ke liye
+hazaron threads nahi chahiye; Gemini, TTS aur quiz timers tasks hain, limits semaphores se.
+Handlers ka flow (quiz, callbacks, voice) aur baaki logic bot_core.py se share hota hai;
+main.py (threaded runtime, Flask) yahan import nahi hota.
+
+    python async_main.py
+"""
+import os
+import time
+import asyncio
+import inspect
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from telebot.async_telebot import AsyncTeleBot
+from telebot.asyncio_helper import ApiTelegramException
+
+import bot_core as core
+from log_shipper import LogShipper
+from singleflight import AsyncSingleFlight
+from telegram_governor import AsyncTelegramGovernor, PRIORITY_LOG
+from streaming import split_message
+from markdown_format import format_markdown, strip_markdown
+
+bot = AsyncTeleBot(core.BOT_TOKEN)
+
+# --- LIMITS ---
+GEMINI_CONCURRENCY = int(os.getenv("ASYNC_GEMINI_CONCURRENCY", "64"))
+TELEGRAM_CONCURRENCY = int(os.getenv("ASYNC_TG_CONCURRENCY", "30"))
+# Jo kaam abhi bhi blocking hai (link fetch, quiz bank, files) wo itne threads tak
+BLOCKING_CONCURRENCY = int(os.getenv("ASYNC_BLOCKING_CONCURRENCY", "16"))
+
+# Session stores (user_data, quiz_sessions): memory backend loop par hi, sqlite ke liye apne threads.
+# sqlite write BEGIN IMMEDIATE + busy_timeout par ruk sakta hai; loop par hua to saari chats ruk jaati hain
+STORE_THREADS = int(os.getenv("ASYNC_STORE_THREADS", "8"))
+
+gemini_limit = asyncio.Semaphore(GEMINI_CONCURRENCY)
+telegram_limit = asyncio.Semaphore(TELEGRAM_CONCURRENCY)
+blocking_limit = asyncio.Semaphore(BLOCKING_CONCURRENCY)
+
+# Threaded mode jaisi hi rate limits (global + per chat, 429 par ruk ke retry)
+governor = AsyncTelegramGovernor(
+    global_rate=float(os.getenv("TG_GLOBAL_RATE", "30")),
+    chat_rate=float(os.getenv("TG_CHAT_RATE", "1")),
+)
+governor.set_chat_priority(core.LOG_CHANNEL_ID, PRIORITY_LOG)
+
+# Threaded gemini_flight jaisa: same prompt ek saath aaye to Gemini ki ek hi call
+gemini_flight = AsyncSingleFlight()
+
+# Agla quiz sawal pehle se: user_id -> ((level, topic), Task)
+quiz_prefetch = {}
+# Loop tasks ke sirf weak refs rakhta hai; bina ref ke task beech mein garbage collect ho sakta hai
+background_tasks = set()
+
+class UserLanes:
+    """
+    Ek user ke updates order mein chalte hain (threaded dispatcher ki lanes jaisa), baaki users parallel.
+    """
+
+    def __init__(self):
+        self._locks = {}   # user_id -> [Lock, users waiting/holding]
+
+    async def run(self, user_id, coro_fn, *args):
+        entry = self._locks.get(user_id)
+        if entry is None:
+            entry = self._locks[user_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await coro_fn(*args)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0: del self._locks[user_id]
+
+lanes = UserLanes()
+
+def spawn(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+def api_method_name(fn):
+    # send_message -> sendMessage, taaki metrics labels threaded mode jaise hi rahein
+    first, *rest = fn.__name__.split("_")
+    return first + "".join(p.title() for p in rest)
+
+@functools.lru_cache(maxsize=None)
+def _signature(fn):
+    return inspect.signature(fn)
+
+def chat_of(fn, args, kwargs):
+    # Governor ke liye call ka chat: chat_id argument, ya reply_to jaisi calls mein message.chat.id
+    try:
+        bound = _signature(fn).bind_partial(*args, **kwargs).arguments
+    except TypeError:
+        return None
+    if bound.get("chat_id") is not None: return bound["chat_id"]
+    message = bound.get("message")
+    return message.chat.id if message is not None else None
+
+async def tg(fn, *args, **kwargs):
+    # Bot API call: governor (rate limit + 429 retry), phir concurrency limit
+    method = api_method_name(fn)
+    async def send():
+        async with telegram_limit:
+            return await fn(*args, **kwargs)
+    # send_voice jaisi calls ki files: 429 retry se pehle governor inhe shuru par laata hai
+    streams = [v for v in (*args, *kwargs.values()) if hasattr(v, "seek")]
+    with core.TELEGRAM_SECONDS.time(method=method):
+        return await governor.call(method, chat_of(fn, args, kwargs), send, streams)
+
+async def blocking(fn, *args):
+    async with blocking_limit:
+        return await asyncio.to_thread(fn, *args)
+
+# Alag pool: quiz refill jaisa lamba blocking kaam store ki chhoti calls ko na roke
+store_pool = ThreadPoolExecutor(max_workers=STORE_THREADS, thread_name_prefix="session-store") \
+    if core.SESSION_BACKEND != "memory" else None
+
+async def store(fn, *args):
+    if store_pool is None: return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(store_pool, functools.partial(fn, *args))
+
+def later(delay, coro_fn, *args):
+    # scheduler.schedule jaisa: delay ke baad task, .cancel() se roka ja sakta hai
+    async def run():
+        await asyncio.sleep(delay)
+        await coro_fn(*args)
+    return spawn(run())
+
+async def ask_gemini(prompt, kind="chat"):
+    # Basic model: router ka async roop (latency tracking, breaker, hedging).
+    # Text prompt core.ask_gemini ki tarah coalesce hota hai; voice ke parts mein audio hai, wo seedha
+    if isinstance(prompt, str):
+        return await gemini_flight.do(("router", kind, prompt), route_gemini, prompt, kind)
+    return await route_gemini(prompt, kind)
+
+async def route_gemini(prompt, kind):
+    async with gemini_limit:
+        return await core.model_router.generate_async(prompt, timeout=core.GEMINI_TIMEOUT, kind=kind)
+
+async def ask_gemini_search(prompt):
+    model_name = f"{core.active_model_name}+search"
+    # core.generate_text jaisi hi key: same search prompt ek hi call
+    return await gemini_flight.do((model_name, prompt), search_gemini, model_name, prompt)
+
+async def search_gemini(model_name, prompt):
+    t0 = time.perf_counter()
+    outcome = "error"
+    try:
+        async with gemini_limit:
+            response = await asyncio.wait_for(core.model_search.generate_content_async(prompt), core.GEMINI_TIMEOUT)
+        outcome = "ok"
+        return response.text
+    finally:
+        core.GEMINI_SECONDS.observe(time.perf_counter() - t0, model=model_name, outcome=outcome)
+
+async def speech_bytes(text, keep=False):
+    # keep=True (quiz/speak buttons) par bani audio cache mein bhi, threaded generate_audio jaisa
+    if not text or len(text.strip()) == 0: return None
+    cached = await blocking(core.get_cached_audio, text)
+    if cached: return cached
+    t0 = time.perf_counter()
+    try:
+        engine, data = await core.tts_service.synthesize_async(text)
+        core.TTS_SECONDS.observe(time.perf_counter() - t0, engine=engine)
+    except Exception as e:
+        core.TTS_SECONDS.observe(time.perf_counter() - t0, engine="error")
+        print(f"TTS Error: {e}")
+        return None
+    if keep:
+        try: await blocking(core.cache_audio, text, engine, data)
+        except Exception as e: print(f"TTS Cache Error: {e}")
+    return data
+
+async def reply_markdown(message, text, where="text"):
+    # Formatter ke baad ek hi send; plain text sirf aakhri raasta
+    for part in split_message(format_markdown(text)):
+        try:
+            await tg(bot.reply_to, message, part, parse_mode="Markdown")
+        except ApiTelegramException as e:
+            print(f"Markdown Failed, sending plain text. Error: {e}")
+            core.MARKDOWN_FALLBACKS.inc(where=where)
+            await tg(bot.reply_to, message, strip_markdown(part))
+
+# --- RUNTIME FOR SHARED FLOWS ---
+async def fetch_question(user_id, level, topic):
+    # QuestionBank abhi sync hai (disk + batch refill), isliye thread mein
+    return await blocking(core.fetch_quiz_question, user_id, level, topic)
+
+class AsyncRuntime:
+    """
+    bot_core ke flows ke Steps is loop par: Bot API tg() se, blocking kaam threads mein, timers tasks.
+    """
+
+    def __init__(self):
+        self.loop = None
+
+    async def api(self, method, *args, **kwargs):
+        return await tg(getattr(bot, method), *args, **kwargs)
+
+    async def work(self, fn, *args):
+        return await blocking(fn, *args)
+
+    async def store(self, fn, *args):
+        return await store(fn, *args)
+
+    async def generate(self, parts):
+        return await ask_gemini(parts, kind="voice")
+
+    async def speech(self, text, keep):
+        return await speech_bytes(text, keep)
+
+    async def defer(self, user_id, delay, flow_fn, *args):
+        # Timer ek task hai; user ki lane mein chalega taaki answer ke saath race na ho
+        return later(delay, lanes.run, user_id, self.run, flow_fn, *args)
+
+    async def run(self, flow_fn, *args):
+        return await core.run_flow_async(self, flow_fn(*args))
+
+    async def cancel_timer(self, user_id):
+        timer = core.quiz_timers.pop(user_id)
+        # Timeout handler khud naya sawal bhejta hai: apne aap ko cancel na kare
+        if timer and timer is not asyncio.current_task(): timer.cancel()
+
+    async def take_prefetched(self, user_id, tag):
+        entry = quiz_prefetch.pop(user_id, None)
+        if entry is None: return None
+        if entry[0] != tag:
+            entry[1].cancel()
+            return None
+        try: return await entry[1]
+        except Exception: return None
+
+    async def prefetch(self, user_id, tag):
+        level, topic = tag
+        old = quiz_prefetch.pop(user_id, None)
+        if old: old[1].cancel()
+        quiz_prefetch[user_id] = (tag, spawn(fetch_question(user_id, level, topic)))
+
+    async def drop_prefetch(self, user_id):
+        entry = quiz_prefetch.pop(user_id, None)
+        if entry: entry[1].cancel()
+
+    def in_lane(self, user_id, fn, *args):
+        # Kisi bhi thread se (jaise history summary): user ki lane mein; fn session store likhta hai
+        async def call():
+            await store(fn, *args)
+        self.loop.call_soon_threadsafe(lambda: spawn(lanes.run(user_id, call)))
+
+runtime = AsyncRuntime()
+
+class LoopBot:
+    """
+    LogShipper apne thread se bhejta hai; ye calls loop par tg() se jaati hain, taaki log channel
+    bhi usi governor ke andar rahe.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def _call(self, fn, *args):
+        return asyncio.run_coroutine_threadsafe(tg(fn, *args), self.loop).result(timeout=120)
+
+    def send_message(self, chat_id, text):
+        return self._call(bot.send_message, chat_id, text)
+
+    def forward_message(self, chat_id, from_chat_id, message_id):
+        return self._call(bot.forward_message, chat_id, from_chat_id, message_id)
+
+# --- COMMAND HANDLERS ---
+@bot.message_handler(commands=['raj'])
+async def send_welcome(message):
+    await tg(bot.reply_to, message, core.WELCOME_TEXT)
+    core.send_log_to_channel(message.from_user, "COMMAND", "/raj", "Bot Status Checked")
+
+@bot.message_handler(commands=['debug'])
+async def debug_bot(message):
+    try:
+        if core.LOG_CHANNEL_ID:
+            await tg(bot.send_message, core.LOG_CHANNEL_ID, "✅ **Test Log from Dev Bot**")
+            await tg(bot.reply_to, message, core.debug_report(f"⚡ Tasks: {len(background_tasks)}", f"🚦 Telegram: {governor.stats()}"))
+        else:
+            await tg(bot.reply_to, message, "❌ LOG_CHANNEL_ID Missing.")
+    except Exception as e:
+        await tg(bot.reply_to, message, f"❌ Log Failed! Error: {e}")
+
+@bot.message_handler(commands=['help'])
+async def send_help(message):
+    await tg(bot.reply_to, message, core.HELP_TEXT, parse_mode="Markdown")
+
+@bot.message_handler(commands=['settings'])
+async def settings_menu(message):
+    markup = await store(core.get_settings_markup, message.from_user.id)
+    await tg(bot.reply_to, message, "🎛️ **Settings**", reply_markup=markup)
+
+@bot.message_handler(commands=['img'])
+async def send_image(message):
+    prompt = message.text.replace("/img", "").strip()
+    if not prompt: return await tg(bot.reply_to, message, "Likho: `/img car`")
+    await tg(bot.send_chat_action, message.chat.id, 'upload_photo')
+    try:
+        await tg(bot.send_photo, message.chat.id, core.image_url(prompt), caption=f"🖼️ {prompt}")
+        core.send_log_to_channel(message.from_user, "IMAGE", prompt, "Image Generated")
+    except Exception: await tg(bot.reply_to, message, "❌ Error.")
+
+@bot.message_handler(commands=['quiz'])
+async def handle_quiz_command(message):
+    topic = message.text.replace("/quiz", "").strip() or "General Knowledge"
+    async def start():
+        await store(core.save_quiz_session, message.from_user.id, {'pending_topic': topic})
+        await tg(bot.reply_to, message, f"📚 **Topic: {topic}**\n\nApna Level select karein:", reply_markup=core.quiz_level_markup())
+    await lanes.run(message.from_user.id, start)
+    core.send_log_to_channel(message.from_user, "QUIZ START", topic, "Level Selection")
+
+# --- VOICE HANDLER ---
+@bot.message_handler(content_types=['voice', 'audio'])
+async def handle_voice_chat(message):
+    await lanes.run(message.from_user.id, runtime.run, core.voice_flow, message)
+
+# --- CALLBACKS ---
+@bot.callback_query_handler(func=lambda call: True)
+async def handle_callbacks(call):
+    await lanes.run(call.from_user.id, runtime.run, core.callback_flow, call)
+
+# --- TEXT HANDLER ---
+@bot.message_handler(func=lambda message: True)
+async def handle_text(message):
+    await lanes.run(message.from_user.id, text_reply, message)
+
+async def text_reply(message):
+    try:
+        user_id = message.from_user.id
+        session = await store(core.quiz_sessions.get, user_id)
+        if session and session.get('active'): return
+        user_text = message.text
+        if not user_text: return
+
+        # Route/JSON/cache/link ka faisla threaded mode wala hi hai
+        plan = await blocking(core.plan_text_reply, user_id, user_text)
+        ai_reply, source = plan.reply, plan.source
+
+        if ai_reply is None:
+            await tg(bot.send_chat_action, message.chat.id, 'typing')
+            try:
+                ai_reply = await (ask_gemini_search(plan.prompt) if plan.use_search else ask_gemini(plan.prompt))
+                # History aur session store likhta hai
+                await store(core.complete_text_reply, user_id, user_text, plan, ai_reply, runtime.in_lane)
+            except Exception as e:
+                ai_reply = core.BUSY_REPLY
+                print(f"AI Generation Error: {e}")
+
+        await reply_markdown(message, ai_reply)
+        core.REPLIES.inc(source=source)
+        core.send_log_to_channel(message.from_user, f"TEXT ({source}, {plan.route_label})", user_text, ai_reply)
+    except Exception as e:
+        print(f"Critical Handler Error: {e}")
+
+# --- WEB (health + metrics) ---
+core.metrics.collector("devbot_telegram_429_retries_total", "counter", "Bot API calls retried after 429", lambda: governor.retried_429)
+core.metrics.collector("devbot_async_tasks", "gauge", "Background tasks alive (timers, prefetch, summaries)", lambda: len(background_tasks))
+
+async def serve_web(port):
+    # Flask thread ki jagah isi loop par chhota aiohttp server
+    from aiohttp import web
+    async def index(request):
+        return web.Response(text="Dev Bot is Running!")
+    async def metrics_endpoint(request):
+        return web.Response(body=core.metrics.render().encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+    app = web.Application()
+    app.router.add_get("/", index)
+    app.router.add_get("/metrics", metrics_endpoint)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    return runner
+
+# --- RUN ---
+async def run():
+    print(core.startup.summary())
+    runtime.loop = asyncio.get_running_loop()
+    if core.LOG_CHANNEL_ID:
+        # tg() ka governor hi 429 retry karta hai
+        core.log_shipper = LogShipper(LoopBot(runtime.loop), core.LOG_CHANNEL_ID, max_retries=0)
+    if os.getenv("PORT"):
+        await serve_web(int(os.getenv("PORT")))
+    runtime.loop.run_in_executor(None, core.warm_up)
+    print("🤖 Async Bot Polling Started...")
+    await bot.infinity_polling(timeout=20)
+
+if __name__ == "__main__":
+    asyncio.run(run())
@@ -0,0 +1,318 @@
+"""
+Offline load test: asli handlers (handle_text, quiz callbacks, voice) ko fake Telegram
+aur fake Gemini ke saath chalata hai. Koi token ya network nahi chahiye.
+
+    python benchmark.py --users 100 --actions 10 --mix text=6,quiz=3,voice=1
+"""
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+
+BENCH_TEXTS = [
+    "hi", "hello", "kaise ho bhai", "thank you",
+    "python mein list aur tuple mein kya farak hai",
+    "mujhe ek motivational line do",
+    "who is the president of usa",
+    "aaj ka weather kaisa hai",
+]
+
+def percentile(data, p):
+    if not data: return None
+    data = sorted(data)
+    return data[min(len(data) - 1, int(p / 100 * len(data)))]
+
+def fake_reply(prompt):
+    # Quiz prompt par valid MCQ JSON, baaki par seedha text
+    m = re.search(r"Create (\d+) different", prompt)
+    if m:
+        return json.dumps([{
+            "q": f"Bench sawal {uuid.uuid4().hex[:10]} ka jawab kya hai?",
+            "o": ["Pehla", "Doosra", "Teesra", "Chautha"],
+            "a": i % 4,
+            "exp": "Bench explanation",
+        } for i in range(int(m.group(1)))])
+    return f"Theek hai bhai, ye raha jawab: {prompt[-60:].strip()}"
+
+class Recorder:
+    """
+    Har update kab bheja aur kab handler khatam hua, wo note karta hai.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}                 # update_id -> (kind, sent_at, Event)
+        self.latencies = defaultdict(list)
+        self.timeouts = defaultdict(int)
+        self._next_id = 1
+
+    def new_update_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def expect(self, update_id, kind):
+        done = threading.Event()
+        with self._lock:
+            self._pending[update_id] = (kind, time.perf_counter(), done)
+        return done
+
+    def finished(self, update_id):
+        with self._lock:
+            entry = self._pending.pop(update_id, None)
+        if entry is None: return
+        kind, sent_at, done = entry
+        with self._lock:
+            self.latencies[kind].append(time.perf_counter() - sent_at)
+        done.set()
+
+    def timed_out(self, update_id):
+        with self._lock:
+            entry = self._pending.pop(update_id, None)
+            if entry: self.timeouts[entry[0]] += 1
+
+class ResourceSampler:
+    # Threads aur RSS ka peak dekhne ke liye background sampling
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.max_threads = threading.active_count()
+        self.max_rss_mb = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.max_threads = max(self.max_threads, threading.active_count())
+            self.max_rss_mb = max(self.max_rss_mb, rss_mb())
+
+def rss_mb():
+    # Linux par /proc se current RSS, warna peak (ru_maxrss)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class BenchUser:
+    """
+    Ek nakli user: apne actions ek ke baad ek bhejta hai (pichla khatam hone ke baad agla).
+    """
+
+    def __init__(self, bench, user_id, kind, actions, think_time, seed):
+        self.bench = bench
+        self.user_id = user_id
+        self.kind = kind
+        self.actions = actions
+        self.think_time = think_time
+        self.rng = random.Random(seed)
+        self.chat = {"id": user_id, "type": "private"}
+        self.user = {"id": user_id, "is_bot": False, "first_name": f"Bench{user_id}"}
+
+    def _message(self, **fields):
+        msg = {"message_id": self.bench.recorder.new_update_id(), "date": int(time.time()),
+               "chat": self.chat, "from": self.user}
+        msg.update(fields)
+        return {"message": msg}
+
+    def _callback(self, data, message_id=1):
+        return {"callback_query": {
+            "id": str(uuid.uuid4().int)[:12], "from": self.user, "chat_instance": str(self.user_id), "data": data,
+            "message": {"message_id": message_id, "date": int(time.time()), "chat": self.chat, "text": "quiz"},
+        }}
+
+    def send(self, kind, body):
+        self.bench.send(kind, body)
+        if self.think_time:
+            time.sleep(self.rng.uniform(0, self.think_time))
+
+    def run(self):
+        if self.kind == "text":
+            for _ in range(self.actions):
+                # Kuch repeat hone wale, kuch naye sawal (cache miss)
+                text = self.rng.choice(BENCH_TEXTS) if self.rng.random() < 0.6 else f"explain topic number {self.rng.randint(1, 10 ** 6)}"
+                self.send("text", self._message(text=text))
+        elif self.kind == "quiz":
+            self.send("quiz_start", self._message(text="/quiz Bench GK"))
+            self.send("quiz_level", self._callback("qlvl_Basic"))
+            self.send("quiz_timer", self._callback("qtime_60"))
+            for _ in range(self.actions):
+                self.send("quiz_answer", self._callback(f"qz_ans_{self.rng.randint(0, 3)}"))
+            self.send("quiz_stop", self._callback("qz_stop"))
+        elif self.kind == "voice":
+            for _ in range(self.actions):
+                voice = {"file_id": f"voice-{self.user_id}", "file_unique_id": f"u{self.user_id}",
+                         "duration": 3, "mime_type": "audio/ogg", "file_size": 4096}
+                self.send("voice", self._message(voice=voice))
+
+class Benchmark:
+    def __init__(self, args):
+        self.args = args
+        self.recorder = Recorder()
+        self.main = None
+        self.core = None
+        self.api = None
+
+    def setup(self):
+        # Files (reply.json, quiz_bank.json, tts_cache) temp folder mein bante hain
+        repo_dir = os.path.dirname(os.path.abspath(__file__))
+        sys.path.insert(0, repo_dir)
+        os.chdir(tempfile.mkdtemp(prefix="devbot-bench-"))
+        os.environ.setdefault("GEMINI_BACKEND", "fake")
+        os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:BENCHMARK")
+        os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+        os.environ.setdefault("WORKER_THREADS", str(self.args.workers))
+        os.environ.setdefault("TG_GLOBAL_RATE", str(self.args.tg_rate))
+        os.environ.setdefault("TG_CHAT_RATE", str(self.args.tg_chat_rate))
+
+        from fake_backends import FakeModel, FakeTTS, FakeBotAPI
+        import main
+        import bot_core as core
+        self.main = main
+        self.core = core
+        a = self.args
+        latency = (a.gemini_latency, a.gemini_spread)
+        self.api = FakeBotAPI(latency=(a.tg_latency, 0.3), flood_rate=a.tg_flood, seed=1)
+        main.governor._session = self.api
+        main.bot.download_file = lambda file_path: b"OggS" + b"\0" * 4096
+        core.tts_service = FakeTTS(latency=(a.tts_latency, 0.4), seed=2)
+        primary = FakeModel("fake-primary", latency, a.gemini_failure, reply=fake_reply, seed=3)
+        fallback = FakeModel("fake-fallback", latency, a.gemini_failure, reply=fake_reply, seed=4)
+        core.model_basic = primary
+        core.model_search = FakeModel("fake-search", latency, a.gemini_failure, reply=fake_reply, seed=5)
+        core.model_router.set_candidates([("fake-primary", primary), ("fake-fallback", fallback)])
+
+        # Handler khatam hote hi latency note karo
+        handler = main.dispatcher.handler
+        def timed_handler(updates):
+            try: handler(updates)
+            finally:
+                for u in updates: self.recorder.finished(u.update_id)
+        main.dispatcher.handler = timed_handler
+
+    def send(self, kind, body):
+        update_id = self.recorder.new_update_id()
+        body["update_id"] = update_id
+        done = self.recorder.expect(update_id, kind)
+        update = self.main.types.Update.de_json(body)
+        self.main.bot.process_new_updates([update])
+        if not done.wait(self.args.timeout):
+            self.recorder.timed_out(update_id)
+
+    def population(self):
+        mix = []
+        for part in self.args.mix.split(","):
+            kind, _, weight = part.partition("=")
+            mix.append((kind.strip(), float(weight or 1)))
+        total = sum(w for _, w in mix)
+        # Largest remainder: har kind ko uska hissa, aur kul users theek --users jitne
+        shares = [self.args.users * w / total for _, w in mix]
+        counts = [int(s) for s in shares]
+        for i in sorted(range(len(mix)), key=lambda i: counts[i] - shares[i])[:self.args.users - sum(counts)]:
+            counts[i] += 1
+        users, uid = [], 10 ** 9
+        for (kind, _), count in zip(mix, counts):
+            for _ in range(count):
+                uid += 1
+                users.append(BenchUser(self, uid, kind, self.args.actions, self.args.think_time, seed=uid))
+        return users
+
+    def run(self):
+        self.setup()
+        users = self.population()
+        sampler = ResourceSampler()
+        sampler.start()
+        threads = [threading.Thread(target=u.run, name=f"bench-user-{u.user_id}", daemon=True) for u in users]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+            if self.args.ramp: time.sleep(self.args.ramp / max(1, len(threads)))
+        for t in threads: t.join()
+        elapsed = time.perf_counter() - t0
+        sampler.stop()
+        return self.report(len(users), elapsed, sampler)
+
+    def report(self, n_users, elapsed, sampler):
+        rows = {}
+        completed = 0
+        for kind, data in sorted(self.recorder.latencies.items()):
+            completed += len(data)
+            rows[kind] = {
+                "count": len(data),
+                "timeouts": self.recorder.timeouts.get(kind, 0),
+                "p50_ms": round(percentile(data, 50) * 1000, 1),
+                "p95_ms": round(percentile(data, 95) * 1000, 1),
+                "p99_ms": round(percentile(data, 99) * 1000, 1),
+            }
+        m = self.main
+        return {
+            "users": n_users,
+            "elapsed_s": round(elapsed, 2),
+            "updates": completed,
+            "throughput_per_s": round(completed / elapsed, 2) if elapsed else 0,
+            "latency": rows,
+            "max_threads": sampler.max_threads,
+            "max_rss_mb": round(sampler.max_rss_mb, 1),
+            "telegram": self.api.stats(),
+            "governor": m.governor.stats(),
+            "dispatcher": m.dispatcher.stats(),
+            "models": self.core.model_router.stats(),
+            "cache": self.core.response_cache.stats(),
+            "quiz_bank": self.core.quiz_bank.stats(),
+        }
+
+def print_report(r):
+    print(f"\n📊 Benchmark: {r['users']} users, {r['updates']} updates in {r['elapsed_s']}s "
+          f"=> {r['throughput_per_s']} updates/s")
+    print(f"{'kind':<14}{'count':>7}{'timeout':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for kind, row in r["latency"].items():
+        print(f"{kind:<14}{row['count']:>7}{row['timeouts']:>9}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+    print(f"🧵 Max threads: {r['max_threads']}  💾 Max RSS: {r['max_rss_mb']} MB")
+    print(f"📡 Telegram: {r['telegram']}")
+    print(f"🚦 Governor: {r['governor']}")
+    print(f"⏲️ Dispatcher: {r['dispatcher']}")
+    print(f"🧠 Models: {r['models']}")
+    print(f"📦 Cache: {r['cache']}")
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Dev Bot offline benchmark (fake Telegram + fake Gemini)")
+    p.add_argument("--users", type=int, default=50)
+    p.add_argument("--actions", type=int, default=5, help="har user ke messages / quiz answers")
+    p.add_argument("--mix", default="text=6,quiz=3,voice=1", help="user types aur unka hissa")
+    p.add_argument("--think-time", type=float, default=0.0, help="actions ke beech max random wait (s)")
+    p.add_argument("--ramp", type=float, default=1.0, help="itne seconds mein saare users shuru honge")
+    p.add_argument("--timeout", type=float, default=120.0, help="ek update ka max wait (s)")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--gemini-latency", type=float, default=0.8, help="median seconds")
+    p.add_argument("--gemini-spread", type=float, default=0.5, help="lognormal sigma")
+    p.add_argument("--gemini-failure", type=float, default=0.0)
+    p.add_argument("--tg-latency", type=float, default=0.05)
+    p.add_argument("--tg-flood", type=float, default=0.0, help="sends ka hissa jo 429 paata hai")
+    p.add_argument("--tg-rate", type=float, default=30)
+    p.add_argument("--tg-chat-rate", type=float, default=1)
+    p.add_argument("--tts-latency", type=float, default=0.3)
+    p.add_argument("--json", help="report is file mein JSON ke roop mein bhi likho")
+    return p.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.json: args.json = os.path.abspath(args.json)
+    result = Benchmark(args).run()
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
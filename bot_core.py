@@ -0,0 +1,898 @@
+"""
+Dono runtimes (threaded main.py aur async_main.py) ka saanjha hissa: config, stores, caches, models,
+prompts, quiz logic aur handlers ka control flow.
+Yahan koi bot, dispatcher, scheduler ya Flask nahi banta; wo har runtime khud banata hai.
+"""
+from startup import StartupReport, LazyModule, LazyObject, ModelSelectionCache
+startup = StartupReport()
+
+import os
+with startup.timed("import telebot"):
+    from telebot import types
+from dotenv import load_dotenv
+import threading
+import json
+import time
+import urllib.parse
+from datetime import datetime
+import io
+
+# Heavy modules pehli baar use hone par hi import honge
+genai = LazyModule("google.generativeai", startup, setup=lambda m: m.configure(api_key=API_KEY))
+pytz = LazyModule("pytz", startup)
+
+with startup.timed("import local modules"):
+    from reply_store import ReplyStore
+    from response_cache import ResponseCache, cache_text, is_time_sensitive
+    from singleflight import SingleFlight
+    from quiz_bank import QuestionBank
+    from tts_cache import AudioCache
+    from tts_engine import TTSService
+    from session_store import open_session_store, MemorySessionStore
+    from conversation import ConversationMemory
+    from markdown_format import format_markdown, strip_markdown
+    from model_router import ModelRouter
+    from query_router import QueryRouter, load_rules
+    from fake_backends import FakeModel
+    from metrics import MetricsRegistry
+
+# --- IMPORT OPTIONAL MODULES ---
+try:
+    with startup.timed("import web_tools"):
+        import web_tools
+except ImportError:
+    web_tools = None
+
+# --- 1. CONFIGURATION ---
+load_dotenv()
+
+API_KEY = os.getenv("GOOGLE_API_KEY")
+BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+OWNER_ID = 5804953849
+
+try:
+    LOG_CHANNEL_ID = int(os.getenv("LOG_CHANNEL_ID"))
+except:
+    LOG_CHANNEL_ID = None
+
+if not API_KEY or not BOT_TOKEN:
+    print("⚠️ Warning: Keys missing in .env file!")
+
+# --- 2. SETUP ---
+# Hot path metrics, /metrics par Prometheus text format mein
+metrics = MetricsRegistry()
+JSON_LOOKUP_SECONDS = metrics.histogram("devbot_json_lookup_seconds", "reply.json lookup time")
+GEMINI_SECONDS = metrics.histogram("devbot_gemini_seconds", "Gemini call time per model", ("model", "outcome"))
+TTS_SECONDS = metrics.histogram("devbot_tts_seconds", "TTS synthesis time (edge, gtts or error)", ("engine",))
+TELEGRAM_SECONDS = metrics.histogram("devbot_telegram_request_seconds", "Bot API call time incl. rate limit wait", ("method",))
+QUIZ_BATCH_SECONDS = metrics.histogram("devbot_quiz_batch_seconds", "Quiz batch generation time")
+QUIZ_PARSE_FAILURES = metrics.counter("devbot_quiz_parse_failures_total", "Quiz batches that were not valid JSON")
+REPLIES = metrics.counter("devbot_replies_total", "Text replies by source (JSON, CACHE, AI)", ("source",))
+MARKDOWN_FALLBACKS = metrics.counter("devbot_markdown_fallbacks_total", "Markdown failures resent as plain text", ("where",))
+RETRIES = metrics.counter("devbot_retries_total", "Retries by kind", ("kind",))
+
+# Log channel ka sender runtime banata hai (usi ke bot se bhejta hai)
+log_shipper = None
+
+JSON_FILE = "reply.json"
+if not os.path.exists(JSON_FILE):
+    with open(JSON_FILE, "w", encoding="utf-8") as f: json.dump({}, f)
+with startup.timed("load reply store"):
+    reply_store = ReplyStore(JSON_FILE, match_threshold=float(os.getenv("REPLY_MATCH_THRESHOLD", "0.75")))
+
+# Gemini answers ka cache (search wale jaldi purane hote hain)
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", "5000")),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MB", "16")) * 1024 * 1024,
+)
+CACHE_TTL_SEARCH = int(os.getenv("CACHE_TTL_SEARCH", "300"))
+CACHE_TTL_BASIC = int(os.getenv("CACHE_TTL_BASIC", "3600"))
+
+# Same prompt ki ek saath chal rahi Gemini calls ek mein merge hoti hain
+gemini_flight = SingleFlight()
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "60"))
+
+# Per-user chat history: fixed turns + token budget, purani baatein summary mein
+conversation = ConversationMemory(
+    max_turns=int(os.getenv("HISTORY_TURNS", "8")),
+    token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "1200")),
+    summary_budget=int(os.getenv("HISTORY_SUMMARY_TOKENS", "250")),
+    summarize=lambda old, text, budget: summarize_history(old, text, budget),
+)
+
+# Sessions: memory (default) ya sqlite (restart ke baad bhi bache, kai processes share karein)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_DB = os.getenv("SESSION_DB", "sessions.db")
+user_data = open_session_store("user", SESSION_BACKEND, SESSION_DB, idle_ttl=int(os.getenv("USER_SESSION_TTL", str(7 * 24 * 3600))))
+quiz_sessions = open_session_store("quiz", SESSION_BACKEND, SESSION_DB, idle_ttl=int(os.getenv("QUIZ_SESSION_TTL", "3600")))
+# Timer handles serialize nahi hote, ye hamesha memory mein rehte hain
+quiz_timers = MemorySessionStore(idle_ttl=3600)
+EDGE_VOICE_ID = "hi-IN-MadhurNeural"
+# Isse chhoti voice notes Gemini ko inline bhejte hain (request limit 20 MB hai)
+INLINE_AUDIO_LIMIT = int(os.getenv("INLINE_AUDIO_LIMIT", str(18 * 1024 * 1024)))
+# Bani hui voice files ka cache (same text dobara synthesize nahi hoga)
+audio_cache = AudioCache(
+    os.getenv("TTS_CACHE_DIR", "tts_cache"),
+    max_bytes=int(os.getenv("TTS_CACHE_MB", "200")) * 1024 * 1024,
+)
+# edge-tts process ke andar chalta hai (har reply par naya subprocess nahi)
+tts_service = TTSService(
+    EDGE_VOICE_ID,
+    max_concurrent=int(os.getenv("TTS_CONCURRENCY", "4")),
+    edge_budget=float(os.getenv("TTS_EDGE_BUDGET", "8")),
+)
+
+# --- 3. TIME ---
+def get_current_time():
+    IST = pytz.timezone('Asia/Kolkata')
+    now = datetime.now(IST)
+    return now.strftime("%d %B %Y, %I:%M %p")
+
+# --- 4. MODES & PROMPTS ---
+SECURITY_RULE = """
+SYSTEM RULES:
+1. Current Date: December 2025.
+2. US President: Donald Trump.
+3. Name: 'Dev'.
+4. HIDDEN INFO (Reveal ONLY if specifically asked):
+   - Creator: Raj Dev.
+   - LOCATION: Lumding (Assam).
+5. INSTRUCTION: Do NOT mention Creator Name or Location in normal greetings (Hi/Hello). Only answer these when user explicitly asks 'Who made you?' or 'Where are you from?' who his us president?'.
+"""
+
+
+RAW_MODES = {
+    "friendly": f"Friendly & Cool. Hinglish. {SECURITY_RULE}",
+    "study": f"Strict Teacher. No nonsense. {SECURITY_RULE}",
+    "dev": f"Tum Rost. {SECURITY_RULE}",
+    "gk": f"GK Expert. Factual. {SECURITY_RULE}",
+}
+
+# --- 5. UNIVERSAL MODEL LOADER ---
+# Chuna hua model disk par yaad rehta hai, restart par list_models() ka wait nahi
+model_cache = ModelSelectionCache(os.getenv("MODEL_CACHE_FILE", ".model_cache.json"), ttl=int(os.getenv("MODEL_CACHE_TTL", "86400")))
+
+def select_model_name():
+    # Network call: server se models ki list leke best choose karta hai
+    # Step 1: Server par available saare models ki list nikalo
+    available_models = []
+    for m in genai.list_models():
+        if 'generateContent' in m.supported_generation_methods:
+            available_models.append(m.name)
+
+    print(f"📋 Server Models Available: {available_models}")
+
+    # Agar list khali thi (Error case), toh default use karo
+    if not available_models:
+        raise RuntimeError("No models listed from API")
+
+    # Step 2: Best Model choose karo (Priority Order)
+    # Hum check karenge ki list mein kaunsa exist karta hai
+    priority_list = [
+        'models/gemini-1.5-flash',
+        'models/gemini-2.5-flash',
+        'models/gemini-pro',
+        'gemini-1.5-flash',
+        'gemini-pro'
+    ]
+
+    selected_model = "models/gemini-pro" # Fallback (Ye purana hai par sab jagah chalta hai)
+
+    for p in priority_list:
+        if p in available_models:
+            selected_model = p
+            break
+    return selected_model
+
+def make_model(name, **kwargs):
+    # GEMINI_BACKEND=fake par local fake model (testing ke liye, bina API key)
+    if GEMINI_BACKEND == "fake":
+        return FakeModel(name, latency=(float(os.getenv("FAKE_LATENCY", "0.8")), 0.5),
+                         failure_rate=float(os.getenv("FAKE_FAILURE_RATE", "0")))
+    # Models lazy bante hain: pehli call par hi genai import + init hoga
+    return LazyObject(lambda: genai.GenerativeModel(name, **kwargs), f"model {name}", startup)
+
+def build_models(name):
+    basic = make_model(name)
+    # Search Tool Config
+    search = make_model(name, tools='google_search') if "flash" in name else None
+    return basic, search
+
+def router_candidates(name, basic):
+    # Primary + fallback models (jo primary se alag hain)
+    fallbacks = [n.strip() for n in GEMINI_FALLBACK_MODELS.split(",") if n.strip() and n.strip() != name]
+    return [(name, basic)] + [(n, make_model(n)) for n in fallbacks]
+
+def refresh_model_selection():
+    # Background mein model list dobara check karo, badla ho to naya model lagao
+    global model_basic, model_search, active_model_name
+    try:
+        name = select_model_name()
+    except Exception as e:
+        print(f"⚠️ Model Refresh Error: {e}")
+        return
+    model_cache.save(name)
+    if name != active_model_name:
+        print(f"🔄 Model Changed: {active_model_name} -> {name}")
+        model_basic, model_search = build_models(name)
+        active_model_name = name
+        model_router.set_candidates(router_candidates(name, model_basic))
+
+def get_working_model():
+    print("🔄 Loading AI Models...")
+    if GEMINI_BACKEND == "fake": return "fake-model"
+    cached = os.getenv("GEMINI_MODEL") or model_cache.load()
+    if cached:
+        print(f"✅ CACHED MODEL: {cached} (refreshing in background)")
+        threading.Thread(target=refresh_model_selection, name="model-refresh", daemon=True).start()
+        return cached
+    try:
+        with startup.timed("select model (list_models)"):
+            selected_model = select_model_name()
+        model_cache.save(selected_model)
+    except Exception as e:
+        print(f"⚠️ Model Setup Critical Error: {e}")
+        # Agar sab fail ho jaye, to 'gemini-pro' try karo
+        selected_model = "gemini-pro"
+    print(f"✅ FINAL SELECTED: {selected_model}")
+    return selected_model
+
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini")
+GEMINI_FALLBACK_MODELS = os.getenv("GEMINI_FALLBACK_MODELS", "models/gemini-2.5-flash,models/gemini-pro")
+
+active_model_name = get_working_model()
+model_basic, model_search = build_models(active_model_name)
+
+# Basic calls router se jaati hain: latency track, circuit breaker, slow ho to hedge
+model_router = ModelRouter(
+    router_candidates(active_model_name, model_basic),
+    hedge_percentile=int(os.getenv("HEDGE_PERCENTILE", "95")),
+    default_hedge_delay=float(os.getenv("HEDGE_DEFAULT_DELAY", "6")),
+    observer=lambda name, ok, latency: GEMINI_SECONDS.observe(latency, model=name, outcome="ok" if ok else "error"),
+)
+
+# Text messages ka routing (rules JSON file se badal sakte hain)
+query_router = QueryRouter(load_rules(os.getenv("ROUTER_RULES_FILE")))
+ROUTER_TRACE = os.getenv("ROUTER_TRACE", "0") == "1"
+
+# Links wale messages: page ka text (pooled session, byte limit, ETag/Last-Modified cache)
+page_fetcher = web_tools.PageFetcher(
+    max_bytes=int(os.getenv("PAGE_MAX_KB", "2048")) * 1024,
+    max_chars=int(os.getenv("PAGE_MAX_CHARS", "8000")),
+    timeout=float(os.getenv("PAGE_TIMEOUT", "10")),
+    fresh_ttl=int(os.getenv("PAGE_FRESH_TTL", "60")),
+    backend=os.getenv("PAGE_PARSER", "auto"),
+) if web_tools else None
+
+# --- 6. HELPER FUNCTIONS ---
+def get_user_config(user_id):
+    return user_data.setdefault(user_id, {"mode": "friendly", "memory": True, "voice": "edge", "history": []})
+
+def save_user_config(user_id, config):
+    user_data[user_id] = config
+
+def save_quiz_session(user_id, session):
+    quiz_sessions[user_id] = session
+
+def get_reply_from_json(text):
+    try:
+        with JSON_LOOKUP_SECONDS.time(): return reply_store.get(text)
+    except: return None
+
+def save_to_json(question, answer):
+    try: reply_store.set(question, answer)
+    except: pass
+
+def timed_gemini(model_name, fn, *args):
+    # Router ke bahar wali Gemini calls (search, stream) ka time
+    t0 = time.perf_counter()
+    outcome = "error"
+    try:
+        result = fn(*args)
+        outcome = "ok"
+        return result
+    finally:
+        GEMINI_SECONDS.observe(time.perf_counter() - t0, model=model_name, outcome=outcome)
+
+def generate_text(model, model_name, prompt, timeout=GEMINI_TIMEOUT):
+    # Agar yahi prompt abhi kisi aur ke liye chal raha hai to usi ka result use karo
+    return gemini_flight.do((model_name, prompt), timed_gemini, model_name, lambda: model.generate_content(prompt).text, timeout=timeout)
+
+def ask_gemini(prompt, timeout=GEMINI_TIMEOUT, kind="chat", hedge=True):
+    # Basic model ke liye: same prompt coalesce + router (fallback/hedging). kind se router latency alag rakhta hai
+    return gemini_flight.do(("router", kind, prompt), model_router.generate, prompt, timeout, kind, hedge, timeout=timeout)
+
+def summarize_history(old_summary, evicted_text, max_tokens):
+    prompt = f"""
+    Merge this chat into a short running summary (max {max_tokens * 3} characters).
+    Keep names, facts and user preferences. Plain text only.
+    [Old Summary]: {old_summary or '-'}
+    [New Messages]:
+    {evicted_text}
+    """
+    # Background kaam hai, koi intezaar nahi kar raha: slow ho to hedge nahi, sirf fail par fallback
+    return ask_gemini(prompt, kind="summary", hedge=False)
+
+def apply_history_summary(user_id, summary):
+    config = get_user_config(user_id)
+    config['summary'] = summary
+    user_data[user_id] = config
+    conversation.summary_applied(user_id, summary)
+
+def remember_turn(user_id, config, user_text, ai_reply, in_lane):
+    """
+    Memory on ho tabhi history rakho; purane turns background mein summary ban jaate hain.
+    in_lane(user_id, fn, *args) runtime ka tareeka hai summary ko user ki lane mein lagane ka.
+    """
+    if not config['memory']: return
+    evicted = conversation.add_turn(config, user_text, ai_reply)
+    user_data[user_id] = config
+    if evicted:
+        conversation.summarize_async(
+            user_id, config.get('summary', ''), evicted,
+            lambda summary: in_lane(user_id, apply_history_summary, user_id, summary),
+        )
+
+def clean_markdown(text):
+    if not text: return ""
+    return text.replace("*", "").replace("_", "").replace("`", "").replace("[", "").replace("]", "")
+
+def clean_text_for_audio(text):
+    if not text: return ""
+    return clean_markdown(text)
+
+def synthesize_speech(text):
+    t0 = time.perf_counter()
+    try:
+        engine, data = tts_service.synthesize(text)
+    except Exception:
+        TTS_SECONDS.observe(time.perf_counter() - t0, engine="error")
+        raise
+    TTS_SECONDS.observe(time.perf_counter() - t0, engine=engine)
+    return engine, data
+
+def get_cached_audio(text):
+    return audio_cache.get(AudioCache.make_key("edge", EDGE_VOICE_ID, text)) or audio_cache.get(AudioCache.make_key("gtts", "hi", text))
+
+def cache_audio(text, engine, data):
+    voice = EDGE_VOICE_ID if engine == "edge" else "hi"
+    audio_cache.put_bytes(AudioCache.make_key(engine, voice, text), data)
+
+def generate_audio(text):
+    # Audio bytes deta hai (cache se ya naya bana ke cache mein rakh ke), fail ho to None
+    if not text or len(text.strip()) == 0: return None
+    cached = get_cached_audio(text)
+    if cached: return cached
+
+    try:
+        engine, data = synthesize_speech(text)
+        cache_audio(text, engine, data)
+        return data
+    except Exception as e:
+        print(f"TTS Error: {e}")
+        return None
+
+def generate_audio_bytes(text):
+    # Voice replies ek baar hi sune jaate hain: cache mein ho to wahi, warna sirf memory mein banao
+    if not text or len(text.strip()) == 0: return None
+    cached = get_cached_audio(text)
+    if cached: return cached
+    try:
+        return synthesize_speech(text)[1]
+    except Exception as e:
+        print(f"TTS Error: {e}")
+        return None
+
+def get_settings_markup(user_id):
+    config = get_user_config(user_id)
+    markup = types.InlineKeyboardMarkup(row_width=2)
+    for m in RAW_MODES.keys():
+        text = f"✅ {m.capitalize()}" if m == config['mode'] else f"❌ {m.capitalize()}"
+        markup.add(types.InlineKeyboardButton(text, callback_data=f"set_mode_{m}"))
+    markup.add(types.InlineKeyboardButton("🗑️ Clear Memory", callback_data="clear_json"))
+    return markup
+
+def send_log_to_channel(user, request_type, query, response):
+    if not log_shipper: return
+    clean_response = clean_markdown(response[:200]) + "..." if len(response) > 200 else clean_markdown(response)
+    log_text = (
+        f"📝 NEW LOG\n"
+        f"User: {user.first_name} (ID: {user.id})\n"
+        f"Type: {request_type}\n"
+        f"Input: {query}\n"
+        f"Reply: {clean_response}"
+    )
+    log_shipper.log(log_text)
+
+# --- 7. QUIZ SYSTEM ---
+QUIZ_LABELS = ["A", "B", "C", "D"]
+
+def quiz_level_markup():
+    markup = types.InlineKeyboardMarkup(row_width=2)
+    levels = [
+        ("Basic Level", "Basic"),
+        ("Junior (9-10)", "Class 9-10"),
+        ("Senior (11-12)", "Class 11-12"),
+        ("Science", "Science Stream"),
+        ("Commerce", "Commerce Stream"),
+        ("Arts", "Arts Stream"),
+        ("🔥 Pro Level", "Expert")
+    ]
+    for label, code in levels:
+        markup.add(types.InlineKeyboardButton(label, callback_data=f"qlvl_{code}"))
+    return markup
+
+def quiz_timer_markup():
+    markup = types.InlineKeyboardMarkup(row_width=3)
+    times = [("🚀 10s", "10"), ("⚡ 15s", "15"), ("⏱️ 30s", "30"), ("⏳ 45s", "45"), ("🐢 1 Min", "60")]
+    for label, sec in times:
+        markup.add(types.InlineKeyboardButton(label, callback_data=f"qtime_{sec}"))
+    return markup
+
+def new_quiz_session(topic, level, time_limit):
+    return {
+        'active': True, 'topic': topic, 'level': level, 'time_limit': int(time_limit),
+        'score': 0, 'total': 0, 'wrong': 0
+    }
+
+def build_question_message(session, data):
+    # Sawal session mein likhta hai aur (text, buttons) deta hai
+    safe_q = data['q']
+    safe_opts = data['o']
+    session['correct_idx'] = data['a']
+    session['explanation'] = data['exp']
+    session['question_text'] = safe_q
+    session['options'] = safe_opts
+
+    options_text = ""
+    for i, opt in enumerate(safe_opts):
+        options_text += f"**{QUIZ_LABELS[i]})** {opt}\n"
+
+    full_msg = f"🎮 **Quiz: {session['topic']}**\n⏳ **{session.get('time_limit', 15)} Seconds**\n\n❓ **{safe_q}**\n\n{options_text}\n👇 *Jaldi Jawab Do!*"
+
+    markup = types.InlineKeyboardMarkup(row_width=4)
+    btns = []
+    for i in range(len(safe_opts)):
+        btns.append(types.InlineKeyboardButton(f" {QUIZ_LABELS[i]} ", callback_data=f"qz_ans_{i}"))
+    markup.add(*btns)
+    markup.add(types.InlineKeyboardButton("🔊 Suno", callback_data="qz_speak"),
+               types.InlineKeyboardButton("❌ Stop", callback_data="qz_stop"))
+    return full_msg, markup
+
+def grade_quiz_answer(session, selected):
+    session['total'] += 1
+    if selected == session['correct_idx']:
+        session['score'] += 1
+        return f"✅ **Correct!** ({QUIZ_LABELS[session['correct_idx']]})"
+    session['wrong'] += 1
+    return f"❌ **Wrong!** ({QUIZ_LABELS[session['correct_idx']]})"
+
+def quiz_result_report(session):
+    score = session['score']
+    total = session['total']
+    wrong = session['wrong']
+    percent = int((score / total) * 100) if total > 0 else 0
+    if percent >= 90: emote = "🏆 **Genius!**"
+    elif percent >= 40: emote = "🙂 **Nice!**"
+    else: emote = "🥺 **Try Again!**"
+    return f"🛑 **Result:**\n✅ {score} | ❌ {wrong}\n📉 **{percent}%**\n{emote}"
+
+def quiz_speech_text(session):
+    q_text = session.get('question_text', '')
+    opts = session.get('options', [])
+    return clean_text_for_audio(f"Sawal: {q_text}... A: {opts[0]}... B: {opts[1]}... C: {opts[2]}... D: {opts[3]}")
+
+def fetch_quiz_batch(level, topic, count):
+    # Ek hi call mein kai MCQs mangwao (validation QuestionBank karta hai)
+    prompt = f"""
+    Create {count} different {level} level MCQ Questions about '{topic}'.
+    Reply ONLY with a JSON array:
+    [
+        {{
+            "q": "Question text?",
+            "o": ["Option 1", "Option 2", "Option 3", "Option 4"],
+            "a": 0,
+            "exp": "Short explanation"
+        }}
+    ]
+    Index 'a' is 0-3. NO MARKDOWN.
+    """
+    with QUIZ_BATCH_SECONDS.time():
+        text = ask_gemini(prompt, kind="quiz").strip().replace("```json", "").replace("```", "")
+    try:
+        data = json.loads(text)
+    except ValueError:
+        QUIZ_PARSE_FAILURES.inc()
+        raise
+    if isinstance(data, dict): data = [data]
+    return data
+
+# Disk par rehne wala shared question bank (restart ke baad bhi bacha rahega)
+with startup.timed("load quiz bank"):
+    quiz_bank = QuestionBank(
+        os.getenv("QUIZ_BANK_FILE", "quiz_bank.json"),
+        fetch_quiz_batch,
+        clean=clean_markdown,
+        batch_size=int(os.getenv("QUIZ_BATCH_SIZE", "10")),
+    )
+
+def fetch_quiz_question(user_id, level, topic):
+    return quiz_bank.next_question(user_id, topic, level, timeout=GEMINI_TIMEOUT)
+
+# --- 8. COMMAND TEXTS ---
+WELCOME_TEXT = "🔥 **Dev Bot Online!**\n\n✅ Voice Forwarding Active\n✅ Logs Active\n✅ Quiz Timer Active"
+# parse_mode="Markdown" ke saath jaata hai: legacy Markdown mein badlo ("**" aur "[topic]" waise nahi chalte)
+HELP_TEXT = format_markdown("""
+🤖 **Commands:**
+/raj - Status
+/debug - Check Logs
+/quiz [topic] - Play Quiz
+/img [prompt] - AI Image
+/settings - Settings
+**Voice:** Send audio to chat!
+    """)
+
+def debug_report(*runtime_lines):
+    # Runtime apni lines (dispatcher, governor...) khud deta hai
+    lines = [f"✅ Log Sent to ID: {LOG_CHANNEL_ID}", f"📦 Cache: {response_cache.stats()}", *runtime_lines,
+             f"🎮 Quiz Bank: {quiz_bank.stats()}", f"📝 Logs: {log_shipper.stats() if log_shipper else '-'}",
+             f"🧠 Models: {model_router.stats()}", f"🧭 Routes: {query_router.stats()}",
+             f"🌐 Pages: {page_fetcher.stats() if page_fetcher else '-'}", startup.summary()]
+    return "\n".join(lines)
+
+def image_url(prompt):
+    # --- CHANGES START HERE: Removed 'https' ---
+    return f"image.pollinations.ai/prompt/{urllib.parse.quote(prompt)}?nologo=true"
+    # --- CHANGES END HERE ---
+
+# --- 9. VOICE INPUT ---
+def voice_input(data, mime_type):
+    # Chhoti audio seedha request ke andar jaati hai, badi ho tabhi Files API
+    if len(data) <= INLINE_AUDIO_LIMIT:
+        return {"mime_type": mime_type, "data": data}
+    return genai.upload_file(io.BytesIO(data), mime_type=mime_type)
+
+def voice_prompt(config):
+    return f"Listen to this audio. Reply in spoken Hinglish style. {RAW_MODES[config['mode']]}"
+
+# --- 10. TEXT REPLY PLAN ---
+BUSY_REPLY = "⚠️ Abhi server busy hai, thodi der baad try karna."
+
+class TextReplyPlan:
+    # Ek text message ke liye faisla: kahan se jawab aayega aur AI ko kya bhejna hai
+    __slots__ = ("config", "decision", "page", "use_search", "cache_key", "context", "reply", "source", "prompt")
+
+    def __init__(self, config, decision, page, use_search, cache_key, context):
+        self.config = config
+        self.decision = decision
+        self.page = page
+        self.use_search = use_search
+        self.cache_key = cache_key
+        self.context = context
+        self.reply = None
+        self.source = "AI" # Default source
+        self.prompt = None
+
+    @property
+    def route_label(self):
+        return "link" if self.page else self.decision.route
+
+def build_text_prompt(config, user_text, context, page):
+    sys_prompt = f"""
+    [System]: Date: {get_current_time()}. Era: Late 2025.
+    [INSTRUCTION]: USE GOOGLE SEARCH for Facts/News.
+    [Persona]: {RAW_MODES.get(config['mode'])}
+    """
+    full_prompt = f"{sys_prompt}\n{context}\nUser: {user_text}" if context else f"{sys_prompt}\nUser: {user_text}"
+    if page:
+        full_prompt += f"\n\n[Page Content of {page.url}]:\n{page.text}\n\n[INSTRUCTION]: Answer using this page (summarize it if the user only shared the link)."
+    return full_prompt
+
+def plan_text_reply(user_id, user_text):
+    """
+    Route, link, JSON memory aur cache dekh ke plan banata hai. Blocking hai (link fetch, session store),
+    async mode ise thread mein chalata hai.
+    """
+    config = get_user_config(user_id)
+
+    # 2. Route decide karein (cache / basic / search), word boundary ke saath
+    decision = query_router.route(user_text)
+    force_search = decision.route == "search"
+    if ROUTER_TRACE: print(f"🧭 {user_id}: {decision.trace()}")
+
+    # Link bheja hai to page ka text lao (dobara aaye to sirf conditional request)
+    urls = web_tools.extract_urls(user_text) if page_fetcher else []
+    page = page_fetcher.fetch(urls[0]) if urls else None
+    if page and not page.text: page = None
+
+    # 3. Pehle JSON Memory check karein
+    saved_reply = get_reply_from_json(user_text) if not urls else None
+
+    # Page ka text mil gaya to search ki zarurat nahi
+    use_search = bool(model_search and force_search and not page)
+    cache_key = (config['mode'], "search" if use_search else "basic", cache_text(user_text))
+    if page:
+        # Page badle to key bhi badle, warna purana summary hi chalega
+        cache_key = (config['mode'], "link", page.url, page.version, cache_text(user_text))
+    elif is_time_sensitive(user_text):
+        # Prompt mein abhi ka time jaata hai; aise jawab cache se purane ho jaate
+        cache_key = None
+    # Pichli baat-cheet ka context (summary + recent turns, budget ke andar), memory on ho to hamesha.
+    # Sirf greetings jaise self-contained messages bina context ke, taaki wo cache se mil sakein
+    needs_context = config['memory'] and conversation.needs_context(config, decision.route)
+    context = conversation.build_context(config) if needs_context else ""
+    plan = TextReplyPlan(config, decision, page, use_search, cache_key, context)
+
+    if saved_reply and config['memory'] and not force_search:
+        plan.reply, plan.source = saved_reply, "JSON"
+    elif not context and cache_key:
+        # Context wale jawab us conversation ke hain, unhe shared cache se na do
+        cached_reply = response_cache.get(cache_key)
+        if cached_reply:
+            plan.reply, plan.source = cached_reply, "CACHE"
+    if plan.reply is None:
+        plan.prompt = build_text_prompt(config, user_text, context, page)
+    return plan
+
+def complete_text_reply(user_id, user_text, plan, ai_reply, in_lane):
+    # AI ka naya jawab: cache, history aur JSON memory mein daalo
+    if not plan.context and plan.cache_key:
+        response_cache.set(plan.cache_key, ai_reply, CACHE_TTL_SEARCH if plan.use_search else CACHE_TTL_BASIC)
+    remember_turn(user_id, plan.config, user_text, ai_reply, in_lane)
+
+    # Agar reply chhota hai to yaad kar le (Optional Memory Logic)
+    if len(user_text.split()) < 5 and len(ai_reply) < 60:
+        save_to_json(user_text, ai_reply)
+
+# --- 11. SHARED HANDLER FLOWS ---
+# Quiz, callbacks aur voice ka control flow ek hi jagah likha hai. Flow generator hai jo Step yield karta hai;
+# runtime us Step ko chalata hai (threaded: seedha call, async: await) aur result wapas bhejta hai.
+# Step fail ho to exception flow ke andar usi yield par uthta hai, isliye try/except normal code jaisa hai.
+#
+# Runtime ke ops:
+#   api(method, *args, **kw)           Bot API call (bot.<method>)
+#   work(fn, *args)                    blocking kaam (disk, quiz bank, Files API)
+#   store(fn, *args)                   user_data / quiz_sessions ka read-write (sqlite backend par blocking)
+#   generate(parts)                    Gemini basic model (router ke through)
+#   speech(text, keep)                 TTS bytes ya None; keep=True par cache mein bhi
+#   defer(user_id, delay, flow, *args) delay baad flow(*args) user ki lane mein; handle.cancel() deta hai
+#   cancel_timer(user_id)              user ka quiz timer roko
+#   take_prefetched(user_id, tag) / prefetch(user_id, tag) / drop_prefetch(user_id)
+class Step:
+    __slots__ = ("op", "args", "kwargs")
+
+    def __init__(self, op, *args, **kwargs):
+        self.op = op
+        self.args = args
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        return f"Step({self.op}, {self.args}, {self.kwargs})"
+
+def run_flow(runtime, flow):
+    # Threaded runtime ka driver
+    value, error = None, None
+    while True:
+        try:
+            step = flow.throw(error) if error is not None else flow.send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value, error = getattr(runtime, step.op)(*step.args, **step.kwargs), None
+        except Exception as e:
+            value, error = None, e
+
+async def run_flow_async(runtime, flow):
+    # Async runtime ka driver: har op ek coroutine hai
+    value, error = None, None
+    while True:
+        try:
+            step = flow.throw(error) if error is not None else flow.send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value, error = await getattr(runtime, step.op)(*step.args, **step.kwargs), None
+        except Exception as e:
+            value, error = None, e
+
+def quiz_timeout_flow(user_id, chat_id, msg_id):
+    session = yield Step("store", quiz_sessions.get, user_id)
+    if not (session and session.get('active') and session.get('msg_id') == msg_id): return
+    try:
+        yield Step("api", "edit_message_text", format_markdown("⏰ **Time Up!** ⌛\nYe galat mana jayega."), chat_id, msg_id, parse_mode="Markdown")
+        session['total'] += 1
+        session['wrong'] += 1
+        yield Step("store", save_quiz_session, user_id, session)
+        yield from send_question_flow(user_id, chat_id)
+    except Exception: pass
+
+def send_question_flow(user_id, chat_id):
+    session = yield Step("store", quiz_sessions.get, user_id)
+    if not session or not session.get('active'): return
+    if not model_basic:
+        yield Step("api", "send_message", chat_id, "⚠️ AI Model Connect Nahi Hua.")
+        return
+
+    level, topic = session['level'], session['topic']
+    try:
+        # Pehle se bana hua sawal ho to turant dikhao, warna abhi banao
+        data = yield Step("take_prefetched", user_id, (level, topic))
+        if data is None:
+            yield Step("api", "send_chat_action", chat_id, 'typing')
+            data = yield Step("work", fetch_quiz_question, user_id, level, topic)
+
+        full_msg, markup = build_question_message(session, data)
+        try:
+            msg = yield Step("api", "send_message", chat_id, format_markdown(full_msg), reply_markup=markup, parse_mode="Markdown")
+        except Exception:
+            MARKDOWN_FALLBACKS.inc(where="quiz")
+            msg = yield Step("api", "send_message", chat_id, strip_markdown(full_msg), reply_markup=markup)
+
+        session['msg_id'] = msg.message_id
+        yield Step("store", save_quiz_session, user_id, session)
+
+        # Timeout bhi isi user ki lane mein chalega, taaki answer ke saath race na ho
+        yield Step("cancel_timer", user_id)
+        quiz_timers[user_id] = yield Step("defer", user_id, float(session.get('time_limit', 15)),
+                                          quiz_timeout_flow, user_id, chat_id, msg.message_id)
+
+        # User soch raha hai tab tak agla sawal tayar karo
+        yield Step("prefetch", user_id, (level, topic))
+
+    except Exception as e:
+        print(f"Quiz Error: {e}")
+        RETRIES.inc(kind="quiz_question")
+        try:
+            yield Step("api", "send_message", chat_id, "⚠️ Retrying...")
+            yield Step("defer", user_id, 2, send_question_flow, user_id, chat_id)
+        except Exception:
+            session['active'] = False
+            yield Step("store", save_quiz_session, user_id, session)
+            quiz_bank.forget_user(user_id)
+
+def voice_flow(message):
+    try:
+        # 1. Forward Audio to Log Channel
+        if log_shipper:
+            log_shipper.forward(message.chat.id, message.message_id)
+        yield Step("api", "send_chat_action", message.chat.id, 'record_audio')
+
+        media = message.voice or message.audio
+        file_info = yield Step("api", "get_file", media.file_id)
+        downloaded_file = yield Step("api", "download_file", file_info.file_path)
+        mime_type = getattr(media, 'mime_type', None) or "audio/ogg"
+
+        if model_basic:
+            myfile = yield Step("work", voice_input, downloaded_file, mime_type)
+            prompt = voice_prompt((yield Step("store", get_user_config, message.from_user.id)))
+            try:
+                ai_reply = yield Step("generate", [prompt, myfile])
+            except Exception as e:
+                ai_reply = f"Audio samajh nahi aaya. Error: {e}"
+
+            clean_txt = clean_text_for_audio(ai_reply)
+            reply_audio = yield Step("speech", clean_txt, False)
+            if reply_audio:
+                yield Step("api", "send_voice", message.chat.id, io.BytesIO(reply_audio))
+            else:
+                yield Step("api", "reply_to", message, ai_reply)
+            send_log_to_channel(message.from_user, "VOICE REPLY", "Audio Processed", clean_txt)
+    except Exception as e:
+        print(f"Voice Error: {e}")
+        yield Step("api", "reply_to", message, "❌ Voice Error")
+
+def callback_flow(call):
+    user_id = call.from_user.id
+    chat_id, msg_id = call.message.chat.id, call.message.message_id
+
+    if call.data.startswith("set_mode_"):
+        new_mode = call.data.split("_")[2]
+        config = yield Step("store", get_user_config, user_id)
+        config['mode'] = new_mode
+        yield Step("store", save_user_config, user_id, config)
+        try:
+            markup = yield Step("store", get_settings_markup, user_id)
+            yield Step("api", "edit_message_reply_markup", chat_id=chat_id, message_id=msg_id, reply_markup=markup)
+            yield Step("api", "answer_callback_query", call.id, f"Mode: {new_mode}")
+        except Exception: pass
+        return
+
+    if call.data.startswith("qlvl_"):
+        session = yield Step("store", quiz_sessions.get, user_id)
+        if not session:
+            yield Step("api", "answer_callback_query", call.id, "Expired. Start again.")
+            return
+        session['pending_level'] = call.data.split("_")[1]
+        yield Step("store", save_quiz_session, user_id, session)
+        yield Step("api", "edit_message_text", format_markdown("⏱️ **Select Timer:**"), chat_id, msg_id,
+                   reply_markup=quiz_timer_markup(), parse_mode="Markdown")
+        return
+
+    if call.data.startswith("qtime_"):
+        session = yield Step("store", quiz_sessions.get, user_id)
+        if not session:
+            yield Step("api", "answer_callback_query", call.id, "Session Expired. Start again.")
+            return
+        seconds = call.data.split("_")[1]
+        topic, level = session['pending_topic'], session['pending_level']
+        yield Step("api", "edit_message_text", f"🚀 **Quiz Started!**\n{topic} | {level} | {seconds}s", chat_id, msg_id)
+        yield Step("store", save_quiz_session, user_id, new_quiz_session(topic, level, seconds))
+        yield from send_question_flow(user_id, chat_id)
+        return
+
+    if call.data.startswith("qz_"):
+        session = yield Step("store", quiz_sessions.get, user_id)
+        if not session or not session.get('active'):
+            yield Step("api", "answer_callback_query", call.id, "Ended.")
+            return
+        yield Step("cancel_timer", user_id)
+
+        if call.data == "qz_stop":
+            session['active'] = False
+            yield Step("store", save_quiz_session, user_id, session)
+            yield Step("drop_prefetch", user_id)
+            quiz_bank.forget_user(user_id)
+            try: yield Step("api", "edit_message_text", quiz_result_report(session), chat_id, msg_id, parse_mode="Markdown")
+            except Exception: pass
+            send_log_to_channel(call.from_user, "QUIZ END", session['topic'], f"Score: {session['score']}/{session['total']}")
+            return
+
+        if call.data == "qz_speak":
+            yield Step("api", "answer_callback_query", call.id, "🔊...")
+            audio = yield Step("speech", quiz_speech_text(session), True)
+            try:
+                if audio: yield Step("api", "send_voice", chat_id, io.BytesIO(audio))
+            except Exception as e: print(f"Voice Send Error: {e}")
+            return
+
+        if call.data.startswith("qz_ans_"):
+            result = grade_quiz_answer(session, int(call.data.split("_")[2]))
+            yield Step("store", save_quiz_session, user_id, session)
+            try:
+                yield Step("api", "edit_message_text", format_markdown(f"{result}\n💡 {session['explanation']}\n\n⏳ **Next...**"),
+                           chat_id, msg_id, parse_mode="Markdown")
+            except Exception:
+                MARKDOWN_FALLBACKS.inc(where="quiz")
+                yield Step("api", "edit_message_text", f"{result.replace('*', '')}\n\n⏳ Next...", chat_id, msg_id)
+
+            # Agla sawal prefetch ho chuka hai, to bina ruke dikha do
+            yield from send_question_flow(user_id, chat_id)
+        return
+
+    if call.data == "clear_json":
+        if user_id == OWNER_ID:
+            reply_store.clear()
+            yield Step("work", reply_store.flush)
+            yield Step("api", "answer_callback_query", call.id, "Cleared!")
+        else: yield Step("api", "answer_callback_query", call.id, "Admin Only!")
+
+    elif call.data == "speak_msg":
+        yield Step("api", "answer_callback_query", call.id, "🔊...")
+        audio = yield Step("speech", clean_text_for_audio(call.message.text), True)
+        try:
+            if audio: yield Step("api", "send_voice", chat_id, io.BytesIO(audio))
+        except Exception: pass
+
+# --- 12. METRICS COLLECTORS ---
+# Dusre objects ke stats scrape ke waqt padhe jaate hain
+metrics.collector("devbot_threads", "gauge", "Live threads", threading.active_count)
+metrics.collector("devbot_active_quiz_sessions", "gauge", "Quiz sessions waiting for an answer", lambda: len(quiz_timers))
+metrics.collector("devbot_response_cache_total", "counter", "Response cache lookups",
+                  lambda: {(("result", "hit"),): response_cache.hits, (("result", "miss"),): response_cache.misses})
+metrics.collector("devbot_audio_cache_total", "counter", "Audio cache lookups",
+                  lambda: {(("result", "hit"),): audio_cache.hits, (("result", "miss"),): audio_cache.misses})
+metrics.collector("devbot_tts_fallbacks_total", "counter", "edge-tts failures served by gTTS", lambda: getattr(tts_service, "fallbacks", None))
+metrics.collector("devbot_gemini_hedges_total", "counter", "Hedged Gemini requests", lambda: model_router.hedges)
+metrics.collector("devbot_quiz_rejected_questions_total", "counter", "Generated questions that failed validation", lambda: quiz_bank.rejected)
+metrics.collector("devbot_query_routes_total", "counter", "Text messages by route and rule tier",
+                  lambda: {(("route", r), ("tier", t)): n for (r, t), n in list(query_router.counts.items())})
+metrics.collector("devbot_log_dropped_total", "counter", "Log lines dropped", lambda: log_shipper.dropped if log_shipper else None)
+
+# --- 13. WARM-UP ---
+def warm_up():
+    # Pehle message se pehle hi genai import + model init background mein kar lo
+    try:
+        # Fake backend ke models lazy nahi hote
+        if hasattr(model_basic, "_load"): model_basic._load()
+    except Exception as e: print(f"Warm-up Error: {e}")
+    print(startup.summary())
@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Router ke ye routes (greetings, "kaise ho") khud mein poore hain, unhe pichli baat nahi chahiye
+SELF_CONTAINED_ROUTES = {"cache"}
+
+def estimate_tokens(text):
+    # Mota andaza: ~4 characters = 1 token
+    return len(text) // 4 + 1 if text else 0
+
+class ConversationMemory:
+    """
+    Har user ki baat-cheet: aakhri kuch turns (fixed capacity + token budget)
+    aur usse purani baaton ka chhota running summary.
+    Data user config ke 'history' aur 'summary' mein rehta hai (JSON safe).
+    """
+
+    def __init__(self, max_turns=8, token_budget=1200, summary_budget=250, summarize=None, max_workers=2):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.summarize = summarize          # (old_summary, evicted_text, max_tokens) -> new summary
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="history-summary")
+        self._lock = threading.Lock()
+        self._chains = {}                   # user key -> {'running', 'pending', 'summary'}
+
+    @staticmethod
+    def _turn_text(turn):
+        return f"User: {turn['u']}\nDev: {turn['b']}"
+
+    def _clip(self, text, budget):
+        limit = budget * 4
+        return text if len(text) <= limit else text[-limit:]
+
+    def add_turn(self, config, user_text, bot_text):
+        """
+        Naya turn jodta hai. Capacity/budget se bahar jaane par history aadhi karke
+        nikle hue purane turns return karta hai (warna har message par summary call hoti).
+        """
+        history = config.setdefault('history', [])
+        history.append({'u': self._clip(user_text, self.token_budget // 4), 'b': self._clip(bot_text, self.token_budget // 4)})
+        evicted = []
+        if len(history) > self.max_turns or self.history_tokens(history) > self.token_budget:
+            keep_turns, keep_tokens = max(1, self.max_turns // 2), self.token_budget // 2
+            while len(history) > 1 and (len(history) > keep_turns or self.history_tokens(history) > keep_tokens):
+                evicted.append(history.pop(0))
+        return evicted
+
+    def history_tokens(self, history):
+        return sum(estimate_tokens(t['u']) + estimate_tokens(t['b']) for t in history)
+
+    def fallback_summary(self, old_summary, evicted_text):
+        # Model na ho to bas purana + naya jod ke budget tak kaat do
+        return self._clip(f"{old_summary}\n{evicted_text}".strip(), self.summary_budget)
+
+    def _merge(self, old_summary, evicted):
+        evicted_text = "\n".join(self._turn_text(t) for t in evicted)
+        summary = None
+        if self.summarize:
+            try:
+                summary = self.summarize(old_summary, evicted_text, self.summary_budget)
+            except Exception as e:
+                print(f"History Summary Error: {e}")
+        return self._clip((summary or self.fallback_summary(old_summary, evicted_text)).strip(), self.summary_budget)
+
+    def summarize_async(self, key, old_summary, evicted, callback):
+        """
+        Evicted turns ko background mein summary mein merge karta hai, phir callback(new_summary).
+        Ek user ki ek hi job chalti hai; beech mein aaye turns usi ke result se aage jud jaate hain.
+        """
+        with self._lock:
+            state = self._chains.get(key)
+            if state is not None and state['running']:
+                state['pending'].extend(evicted)
+                return None
+            if state is not None:
+                # Pichli summary abhi config tak nahi pahunchi, wahi aage badhao
+                old_summary = state['summary']
+            self._chains[key] = {'running': True, 'pending': [], 'summary': old_summary}
+        return self._pool.submit(self._run_chain, key, old_summary, evicted, callback)
+
+    def _run_chain(self, key, old_summary, evicted, callback):
+        while True:
+            summary = self._merge(old_summary, evicted)
+            with self._lock:
+                state = self._chains[key]
+                state['summary'] = summary
+                evicted, state['pending'] = state['pending'], []
+                state['running'] = bool(evicted)
+            try:
+                callback(summary)
+            except Exception as e:
+                print(f"History Summary Callback Error: {e}")
+            if not evicted:
+                return summary
+            old_summary = summary
+
+    def summary_applied(self, key, summary):
+        # Summary config mein save ho gayi; ab aakhri wali thi to chain ki zarurat nahi
+        with self._lock:
+            state = self._chains.get(key)
+            if state is not None and not state['running'] and state['summary'] == summary:
+                del self._chains[key]
+
+    def pending_jobs(self):
+        with self._lock:
+            return len(self._chains)
+
+    def needs_context(self, config, route=None):
+        """
+        Prompt mein pichli baat-cheet jaaye ya nahi. Default haan ("why?", "aur 2020 mein?" jaise follow-up
+        kisi keyword se nahi pehchane jaate); sirf greetings jaise self-contained routes bina context ke,
+        jinka jawab shared cache se aa sakta hai.
+        """
+        if not config.get('history') and not config.get('summary'): return False
+        return route not in SELF_CONTAINED_ROUTES
+
+    def build_context(self, config):
+        """
+        Prompt mein jaane wala context: summary + recent turns (hamesha budget ke andar).
+        """
+        parts = []
+        if config.get('summary'):
+            parts.append(f"[Earlier Conversation Summary]: {config['summary']}")
+        history = config.get('history') or []
+        if history:
+            parts.append("[Recent Conversation]:\n" + "\n".join(self._turn_text(t) for t in history))
+        return "\n".join(parts)
@@ -0,0 +1,100 @@
+import threading
+from collections import deque
+
+class UpdateDispatcher:
+    """
+    Updates ko fixed-size worker pool par chalata hai.
+    Ek user ke updates hamesha order mein chalte hain, aur queue bhar jaye to naye updates drop hote hain.
+    """
+
+    def __init__(self, handler, scheduler, num_workers=8, max_queue=1000):
+        self.handler = handler
+        self.scheduler = scheduler
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._lanes = {}        # key -> deque of pending jobs
+        self._ready = deque()   # keys jinke paas kaam hai aur koi worker nahi chala raha
+        self._queued = 0
+        self.processed = 0
+        self.dropped = 0
+        self._workers = []
+        for i in range(num_workers):
+            t = threading.Thread(target=self._worker, name=f"dispatch-{i}", daemon=True)
+            t.start()
+            self._workers.append(t)
+
+    @staticmethod
+    def update_key(update):
+        for attr in ("message", "edited_message", "callback_query"):
+            obj = getattr(update, attr, None)
+            if obj is not None and getattr(obj, "from_user", None) is not None:
+                return obj.from_user.id
+        return update.update_id
+
+    def dispatch_updates(self, updates):
+        # bot.process_new_updates ki jagah yahi call hota hai
+        for update in updates:
+            if not self.submit(self.update_key(update), self.handler, [update]):
+                print(f"⚠️ Overloaded, update {update.update_id} dropped")
+
+    def submit(self, key, fn, *args, force=False):
+        """
+        Job ko user ki lane mein daalta hai. Queue full ho to False return karta hai.
+        force=True wale jobs (timers) max_queue ke bawajood hamesha queue hote hain.
+        """
+        with self._cond:
+            if self._queued >= self.max_queue and not force:
+                self.dropped += 1
+                return False
+            lane = self._lanes.get(key)
+            if lane is None:
+                # Lane nahi hai matlab is user ka koi kaam chal nahi raha
+                lane = self._lanes[key] = deque()
+                self._ready.append(key)
+                self._cond.notify()
+            lane.append((fn, args))
+            self._queued += 1
+            return True
+
+    def defer(self, key, delay, fn, *args):
+        """
+        delay seconds baad job submit karta hai, bina kisi worker ko sulaye.
+        Return hua handle .cancel() se roka ja sakta hai.
+        """
+        return self.scheduler.schedule(delay, self._submit_deferred, key, fn, *args)
+
+    def _submit_deferred(self, key, fn, *args):
+        # Quiz timeout jaisa timer drop hua to session kabhi khatam nahi hoga, isliye overload mein bhi queue karo
+        self.submit(key, fn, *args, force=True)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._ready:
+                    self._cond.wait()
+                key = self._ready.popleft()
+                fn, args = self._lanes[key].popleft()
+                self._queued -= 1
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Dispatcher Job Error: {e}")
+            with self._cond:
+                self.processed += 1
+                if self._lanes[key]:
+                    # Isi user ka agla kaam line ke end mein, taaki baaki users ko bhi mauka mile
+                    self._ready.append(key)
+                    self._cond.notify()
+                else:
+                    del self._lanes[key]
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queued": self._queued,
+                "active_users": len(self._lanes),
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "workers": len(self._workers),
+                "pending_timers": self.scheduler.pending(),
+            }
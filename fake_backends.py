@@ -0,0 +1,166 @@
+import json
+import time
+import asyncio
+import random
+import threading
+from collections import Counter
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModelError(Exception):
+    pass
+
+class FakeLatency:
+    # Fakes ka common hissa: latency (fixed ya lognormal) aur random failures
+    def _init_latency(self, latency, failure_rate, seed):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _sample_latency(self):
+        if isinstance(self.latency, (int, float)):
+            return float(self.latency)
+        median, spread = self.latency
+        with self._lock:
+            return median * self._rng.lognormvariate(0, spread)
+
+    def _should_fail(self):
+        with self._lock:
+            return self._rng.random() < self.failure_rate
+
+class FakeModel(FakeLatency):
+    """
+    Gemini GenerativeModel ki jagah local fake: latency aur failures config se.
+    Testing/benchmark ke liye, koi network ya API key nahi chahiye.
+    latency: seconds (number) ya (median, spread) lognormal ke liye.
+    """
+
+    def __init__(self, name="fake-model", latency=(0.8, 0.5), failure_rate=0.0, reply=None, seed=None):
+        self.model_name = name
+        self.reply = reply or (lambda prompt: f"[{name}] Theek hai bhai, jawab yeh raha: {prompt[-40:].strip()}")
+        self._init_latency(latency, failure_rate, seed)
+
+    def _prompt_text(self, contents):
+        if isinstance(contents, str): return contents
+        return " ".join(c for c in contents if isinstance(c, str))
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+        prompt = self._prompt_text(contents)
+        delay = self._sample_latency()
+        if stream:
+            return self._stream(prompt, delay)
+        time.sleep(delay)
+        if self._should_fail():
+            raise FakeModelError(f"429 Resource exhausted ({self.model_name})")
+        return FakeResponse(self.reply(prompt))
+
+    async def generate_content_async(self, contents, **kwargs):
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(self._sample_latency())
+        if self._should_fail():
+            raise FakeModelError(f"429 Resource exhausted ({self.model_name})")
+        return FakeResponse(self.reply(self._prompt_text(contents)))
+
+    def _stream(self, prompt, delay):
+        text = self.reply(prompt)
+        words = text.split(" ")
+        step = max(1, len(words) // 5)
+        time.sleep(delay / 2)
+        if self._should_fail():
+            raise FakeModelError(f"500 Internal error ({self.model_name})")
+        for i in range(0, len(words), step):
+            time.sleep(delay / 10)
+            yield FakeResponse(" ".join(words[i:i + step]) + " ")
+
+class FakeTTS(FakeLatency):
+    """
+    TTSService ki jagah: thodi der ruk ke nakli OGG bytes deta hai.
+    """
+
+    def __init__(self, latency=(0.3, 0.4), failure_rate=0.0, seed=None):
+        self._init_latency(latency, failure_rate, seed)
+
+    def synthesize(self, text, timeout=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self._sample_latency())
+        if self._should_fail():
+            raise FakeModelError("TTS failed")
+        return "edge", b"OggS" + text.encode("utf-8")[:2048]
+
+    async def synthesize_async(self, text, timeout=None):
+        with self._lock:
+            self.calls += 1
+        await asyncio.sleep(self._sample_latency())
+        if self._should_fail():
+            raise FakeModelError("TTS failed")
+        return "edge", b"OggS" + text.encode("utf-8")[:2048]
+
+class FakeHTTPResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = json.dumps(payload)
+        self.content = self.text.encode("utf-8")
+        self.reason = "OK" if status_code == 200 else "Too Many Requests"
+
+    def json(self):
+        return self._payload
+
+class FakeBotAPI(FakeLatency):
+    """
+    Telegram Bot API ka local fake. TelegramGovernor ke session ki jagah lagta hai,
+    to governor, telebot aur handlers sab asli code se chalte hain; sirf network nakli hai.
+    Har method ki calls ginta hai; flood_rate se kuch sends par 429 bhi aata hai.
+    """
+
+    def __init__(self, latency=(0.05, 0.3), flood_rate=0.0, retry_after=1, seed=None):
+        self._init_latency(latency, flood_rate, seed)
+        self.retry_after = retry_after
+        self.by_method = Counter()
+        self.floods = 0
+        self._next_id = 1000
+
+    def request(self, method, url, params=None, files=None, timeout=None, proxies=None):
+        method_name = url.rsplit("/", 1)[-1]
+        params = params or {}
+        with self._lock:
+            self.calls += 1
+            self.by_method[method_name] += 1
+        time.sleep(self._sample_latency())
+        if method_name.startswith("send") and method_name != "sendChatAction" and self._should_fail():
+            with self._lock: self.floods += 1
+            return FakeHTTPResponse(429, {"ok": False, "error_code": 429, "description": "Too Many Requests",
+                                          "parameters": {"retry_after": self.retry_after}})
+        return FakeHTTPResponse(200, {"ok": True, "result": self._result(method_name, params)})
+
+    def _message(self, params, message_id=None):
+        if message_id is None:
+            with self._lock:
+                self._next_id += 1
+                message_id = self._next_id
+        chat_id = int(params.get("chat_id") or 0)
+        return {"message_id": int(message_id), "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"}, "text": str(params.get("text") or params.get("caption") or "")}
+
+    def _result(self, method_name, params):
+        if method_name == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Dev", "username": "dev_bench_bot"}
+        if method_name == "getFile":
+            return {"file_id": params.get("file_id"), "file_unique_id": "u", "file_size": 4096, "file_path": "voice/bench.oga"}
+        if method_name in ("editMessageText", "editMessageReplyMarkup"):
+            return self._message(params, params.get("message_id"))
+        if method_name.startswith("send") and method_name != "sendChatAction" or method_name == "forwardMessage":
+            return self._message(params)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "floods": self.floods, "by_method": dict(self.by_method)}
@@ -0,0 +1,100 @@
+import time
+import queue
+import threading
+
+def retry_after_of(error):
+    """
+    Telegram ke 429 (flood control) error se retry_after seconds nikalta hai, warna None.
+    """
+    result = getattr(error, "result_json", None) or {}
+    params = result.get("parameters") or {}
+    if getattr(error, "error_code", None) == 429 or result.get("error_code") == 429:
+        return float(params.get("retry_after", 1))
+    return None
+
+class LogShipper:
+    """
+    Log channel ke liye ek hi background sender.
+    Logs bounded queue mein jaate hain, time/size window mein ek message mein jud jaate hain
+    aur channel limit se dheere bheje jaate hain.
+    Bot ki calls pehle se TelegramGovernor se jaati hon to max_retries=0 do, 429 ka retry wahi karta hai.
+    """
+
+    SEPARATOR = "\n\n➖➖➖\n\n"
+
+    def __init__(self, bot, chat_id, max_queue=1000, window=2.0, max_chars=3500,
+                 min_interval=3.0, max_retries=3):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.window = window
+        self.max_chars = max_chars
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._last_send = 0.0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+        self._thread.start()
+
+    def log(self, text):
+        self._put(("text", text))
+
+    def forward(self, from_chat_id, message_id):
+        self._put(("forward", (from_chat_id, message_id)))
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Logs user replies se zaroori nahi, queue bhari ho to chhod do
+            self.dropped += 1
+
+    def _run(self):
+        pending = None
+        while True:
+            item = pending or self._queue.get()
+            pending = None
+            if item[0] == "forward":
+                self._send(lambda: self.bot.forward_message(self.chat_id, *item[1]))
+                continue
+
+            # Window ke andar aaye saare text logs ek message mein jodo
+            parts, size = [item[1]], len(item[1])
+            deadline = time.monotonic() + self.window
+            while size < self.max_chars:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0: break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt[0] != "text" or size + len(self.SEPARATOR) + len(nxt[1]) > self.max_chars:
+                    pending = nxt
+                    break
+                parts.append(nxt[1])
+                size += len(self.SEPARATOR) + len(nxt[1])
+            text = self.SEPARATOR.join(parts)[:4096]
+            self._send(lambda: self.bot.send_message(self.chat_id, text), count=len(parts))
+
+    def _send(self, call, count=1):
+        for attempt in range(self.max_retries + 1):
+            # Channel par rate limit se neeche raho
+            wait = self._last_send + self.min_interval - time.monotonic()
+            if wait > 0: time.sleep(wait)
+            self._last_send = time.monotonic()
+            try:
+                call()
+                self.sent += count
+                return
+            except Exception as e:
+                retry_after = retry_after_of(e)
+                if retry_after is None or attempt == self.max_retries:
+                    self.failed += count
+                    print(f"Log Failed: {e}")
+                    return
+                time.sleep(retry_after)
+
+    def stats(self):
+        return {"queued": self._queue.qsize(), "sent": self.sent, "dropped": self.dropped, "failed": self.failed}
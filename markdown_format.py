@@ -0,0 +1,94 @@
+import re
+
+FENCE = "```"
+LINK_RE = re.compile(r"\[([^\]\n]+)\]\(((?:https?|tg)://[^\s)]+)\)")
+# Gemini standard Markdown likhta hai, Telegram legacy Markdown samajhta hai
+DOUBLE_BOLD_RE = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*")
+DOUBLE_ITALIC_RE = re.compile(r"(?<!\w)__(?=\S)(.+?)(?<=\S)__(?!\w)")
+BULLET_RE = re.compile(r"^(\s*)[*+-]\s+", re.MULTILINE)
+HEADING_RE = re.compile(r"^#{1,6}\s+(.+?)\s*#*$", re.MULTILINE)
+
+def _convert(text):
+    text = HEADING_RE.sub(lambda m: f"*{m.group(1).replace('*', '')}*", text)
+    text = BULLET_RE.sub(r"\1• ", text)
+    text = DOUBLE_BOLD_RE.sub(r"*\1*", text)
+    return DOUBLE_ITALIC_RE.sub(r"_\1_", text)
+
+def _is_word(ch):
+    return ch.isalnum() or ch == "_"
+
+def _escape_entities(text):
+    """
+    Telegram ke parser jaisa scan: har marker ya to poori entity banata hai ya escape hota hai.
+    Entity ke andar escape nahi maana jaata, isliye closer hamesha agla wahi marker hai.
+    """
+    out = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch == "\\" and i + 1 < n and text[i + 1] in "_*`[":
+            out.append(text[i:i + 2])
+            i += 2
+            continue
+        if ch in "*_":
+            end = text.find(ch, i + 1)
+            inner = text[i + 1:end] if end != -1 else ""
+            ok = end != -1 and inner.strip() and not inner[0].isspace() and not inner[-1].isspace()
+            if ok and ch == "_":
+                # snake_case jaise words mein _ italic nahi hai
+                before = text[i - 1] if i > 0 else " "
+                after = text[end + 1] if end + 1 < n else " "
+                ok = not _is_word(before) and not _is_word(after)
+            if ok:
+                out.append(text[i:end + 1])
+                i = end + 1
+            else:
+                out.append("\\" + ch)
+                i += 1
+            continue
+        if text.startswith(FENCE, i):
+            end = text.find(FENCE, i + 3)
+            if end == -1:
+                # Code block band nahi hua: aakhir mein band kar do
+                out.append(text[i:].rstrip("\n") + "\n" + FENCE)
+                break
+            out.append(text[i:end + 3])
+            i = end + 3
+            continue
+        if ch == "`":
+            end = text.find("`", i + 1)
+            if end > i + 1:
+                out.append(text[i:end + 1])
+                i = end + 1
+            else:
+                out.append("\\`")
+                i += 1
+            continue
+        if ch == "[":
+            m = LINK_RE.match(text, i)
+            if m:
+                out.append(m.group(0))
+                i = m.end()
+            else:
+                out.append("\\[")
+                i += 1
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+def format_markdown(text):
+    """
+    Model ka jawab Telegram (legacy) Markdown ke layak banata hai, taaki pehli send hi parse ho.
+    **bold**, # headings aur * bullets convert hote hain, adhoore markers escape, khula ``` band.
+    """
+    if not text: return text
+    # Conversion sirf code blocks ke bahar
+    parts = text.split(FENCE)
+    converted = FENCE.join(p if idx % 2 else _convert(p) for idx, p in enumerate(parts))
+    return _escape_entities(converted)
+
+def strip_markdown(text):
+    # Aakhri raasta: saare markers hata ke plain text
+    if not text: return ""
+    return text.replace("\\", "").replace("*", "").replace("_", "").replace("`", "")
@@ -0,0 +1,269 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class CircuitBreaker:
+    """
+    Lagataar fail hone wale model ko kuch der ke liye band (open) kar deta hai.
+    Cooldown ke baad ek probe request jaati hai (half-open); safal ho to wapas chalu.
+    """
+
+    def __init__(self, failure_threshold=5, error_rate=0.5, min_samples=10, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self._probe_running = False
+
+    def available(self, now):
+        # allow() jaisa jawab, par state nahi badalta (candidates list karne ke liye)
+        if self.state == "closed": return True
+        if self.state == "open": return now - self.opened_at >= self.cooldown
+        return not self._probe_running
+
+    def allow(self, now):
+        # Request launch karne se theek pehle hi bulao: half-open mein probe slot yahin lagta hai
+        if self.state == "closed": return True
+        if self.state == "open" and now - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+            self._probe_running = False
+        if self.state == "half_open" and not self._probe_running:
+            self._probe_running = True
+            return True
+        return False
+
+    def release(self):
+        # Probe launch hua par jawab aane se pehle cancel ho gaya: slot wapas do
+        if self.state == "half_open":
+            self._probe_running = False
+
+    def record(self, ok, recent_error_rate, samples, now):
+        if ok:
+            self.consecutive_failures = 0
+            if self.state != "closed":
+                self.state = "closed"
+            return
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold or \
+                (samples >= self.min_samples and recent_error_rate >= self.error_rate):
+            self.state = "open"
+            self.opened_at = now
+
+class ModelStats:
+    def __init__(self, window=200):
+        self.window = window
+        # Latency har call kind (chat, voice, quiz, summary) ki alag, warna lambe batch calls chat ka p95 bigaadte.
+        # Sirf successful calls. Error rate saare kinds ka saath (breaker model ka hai, kind ka nahi).
+        self.latencies = {}
+        self.outcomes = deque(maxlen=window)    # True = ok
+        self.calls = 0
+        self.errors = 0
+
+    def add_latency(self, kind, latency):
+        self.latencies.setdefault(kind, deque(maxlen=self.window)).append(latency)
+
+    def samples(self, kind):
+        return len(self.latencies.get(kind, ()))
+
+    def percentile(self, p, kind):
+        data = sorted(self.latencies.get(kind, ()))
+        if not data: return None
+        return data[min(len(data) - 1, int(p / 100 * len(data)))]
+
+    def error_rate(self):
+        if not self.outcomes: return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+class ModelRouter:
+    """
+    Kai Gemini models ke beech routing: har model + call kind ka rolling p50/p95, model ka error rate,
+    circuit breaker, aur primary slow ho to fallback par hedged request.
+    """
+
+    def __init__(self, candidates, hedge_percentile=95, min_hedge_delay=1.0, default_hedge_delay=6.0,
+                 min_samples=20, max_workers=32, breaker_factory=CircuitBreaker, observer=None):
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+        self.min_samples = min_samples
+        self.breaker_factory = breaker_factory
+        # observer(name, ok, latency) har call ke baad (metrics ke liye)
+        self.observer = observer
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-router")
+        self._stats = {}
+        self._breakers = {}
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.set_candidates(candidates)
+
+    def set_candidates(self, candidates):
+        """
+        candidates: [(name, model), ...] preference order mein.
+        """
+        with self._lock:
+            self._candidates = list(candidates)
+            for name, _ in self._candidates:
+                self._stats.setdefault(name, ModelStats())
+                self._breakers.setdefault(name, self.breaker_factory())
+
+    def _available(self):
+        # Sirf dekhna hai kaun chal sakta hai; breaker ki state yahan nahi badalti
+        now = time.monotonic()
+        with self._lock:
+            return [(n, m) for n, m in self._candidates if self._breakers[n].available(now)]
+
+    def _take(self, candidates, force=False):
+        """
+        candidates mein se agla model jise breaker abhi launch karne de (list se nikal ke).
+        force=True: koi na mile to bhi pehla model, jawab dena zaroori hai.
+        """
+        now = time.monotonic()
+        with self._lock:
+            while candidates:
+                name, model = candidates.pop(0)
+                if self._breakers[name].allow(now):
+                    return name, model
+            if force and self._candidates:
+                return self._candidates[0]
+        return None
+
+    def _hedge_delay(self, name, kind, hedge=True):
+        # hedge=False: slow hone par doosra model nahi, sirf fail hone par (background calls)
+        if not hedge: return float("inf")
+        with self._lock:
+            stats = self._stats[name]
+            if stats.samples(kind) < self.min_samples:
+                return self.default_hedge_delay
+            return max(self.min_hedge_delay, stats.percentile(self.hedge_percentile, kind))
+
+    def _run(self, name, model, prompt, kind):
+        t0 = time.monotonic()
+        try:
+            text = model.generate_content(prompt).text
+        except Exception:
+            self._record(name, kind, False, time.monotonic() - t0)
+            raise
+        self._record(name, kind, True, time.monotonic() - t0)
+        return text
+
+    def _record(self, name, kind, ok, latency):
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats[name]
+            stats.calls += 1
+            stats.outcomes.append(ok)
+            if ok: stats.add_latency(kind, latency)
+            else: stats.errors += 1
+            self._breakers[name].record(ok, stats.error_rate(), len(stats.outcomes), now)
+        if self.observer: self.observer(name, ok, latency)
+
+    def generate(self, prompt, timeout=60, kind="chat", hedge=True):
+        """
+        Prompt ka text jawab deta hai. Primary us kind ke p95 se zyada le to fallback bhi chala deta hai,
+        jo pehle safal ho wahi jeet-ta hai. Sab fail hon to aakhri error raise hota hai.
+        """
+        deadline = time.monotonic() + timeout
+        backups = self._available()
+        primary_name, primary = self._take(backups, force=True)
+        futures = {self._pool.submit(self._run, primary_name, primary, prompt, kind): primary_name}
+        hedge_at = time.monotonic() + self._hedge_delay(primary_name, kind, hedge)
+        last_error = None
+
+        while futures:
+            now = time.monotonic()
+            if now >= deadline:
+                raise TimeoutError(f"No model answered in {timeout}s")
+            wait_until = min(deadline, hedge_at) if backups else deadline
+            done, _ = wait(list(futures), timeout=max(0, wait_until - now), return_when=FIRST_COMPLETED)
+            for f in done:
+                name = futures.pop(f)
+                try:
+                    text = f.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if name != primary_name:
+                    self.hedge_wins += 1
+                return text
+            # Primary slow hai ya fail hua: agla model bhi chalao
+            nxt = self._take(backups) if backups and (time.monotonic() >= hedge_at or not futures) else None
+            if nxt:
+                name, model = nxt
+                if futures: self.hedges += 1
+                futures[self._pool.submit(self._run, name, model, prompt, kind)] = name
+                hedge_at = time.monotonic() + self._hedge_delay(name, kind, hedge)
+        raise last_error or RuntimeError("All models failed")
+
+    async def _run_async(self, name, model, prompt, kind):
+        t0 = time.monotonic()
+        try:
+            text = (await model.generate_content_async(prompt)).text
+        except asyncio.CancelledError:
+            # Haarne wala hedge cancel hua: na success na failure, bas probe slot chhodo
+            with self._lock: self._breakers[name].release()
+            raise
+        except Exception:
+            self._record(name, kind, False, time.monotonic() - t0)
+            raise
+        self._record(name, kind, True, time.monotonic() - t0)
+        return text
+
+    async def generate_async(self, prompt, timeout=60, kind="chat", hedge=True):
+        """
+        generate() ka asyncio roop: hedging tasks se hoti hai, koi thread nahi lagta.
+        Jeetne wale ke baad baaki calls cancel ho jaati hain.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        backups = self._available()
+        primary_name, primary = self._take(backups, force=True)
+        tasks = {asyncio.ensure_future(self._run_async(primary_name, primary, prompt, kind)): primary_name}
+        hedge_at = loop.time() + self._hedge_delay(primary_name, kind, hedge)
+        last_error = None
+        try:
+            while tasks:
+                now = loop.time()
+                if now >= deadline:
+                    raise TimeoutError(f"No model answered in {timeout}s")
+                wait_until = min(deadline, hedge_at) if backups else deadline
+                done, _ = await asyncio.wait(list(tasks), timeout=max(0, wait_until - now), return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    name = tasks.pop(t)
+                    try:
+                        text = t.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    if name != primary_name:
+                        self.hedge_wins += 1
+                    return text
+                nxt = self._take(backups) if backups and (loop.time() >= hedge_at or not tasks) else None
+                if nxt:
+                    name, model = nxt
+                    if tasks: self.hedges += 1
+                    tasks[asyncio.ensure_future(self._run_async(name, model, prompt, kind))] = name
+                    hedge_at = loop.time() + self._hedge_delay(name, kind, hedge)
+            raise last_error or RuntimeError("All models failed")
+        finally:
+            for t in tasks: t.cancel()
+
+    def stats(self):
+        with self._lock:
+            out = {}
+            for name, s in self._stats.items():
+                out[name] = {
+                    "latency": {kind: {"p50": round(s.percentile(50, kind), 2), "p95": round(s.percentile(95, kind), 2)}
+                                for kind in sorted(s.latencies)},
+                    "error_rate": round(s.error_rate(), 3),
+                    "calls": s.calls,
+                    "breaker": self._breakers[name].state,
+                }
+            out["hedges"] = self.hedges
+            out["hedge_wins"] = self.hedge_wins
+            return out
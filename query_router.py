@@ -0,0 +1,81 @@
+import os
+import re
+import json
+import threading
+from collections import Counter
+
+# Rules priority order mein: pehla match hone wala tier jeet-ta hai
+DEFAULT_RULES = [
+    # Taza jaankari chahiye: hamesha search
+    ("search", ["news", "weather", "mausam", "price", "rate", "president", "winner", "live", "score",
+                "movie", "film", "release", "aayegi", "latest", "today", "aaj ka", "stock", "election"]),
+    # Greetings / chit-chat: bina conversation context ke, JSON memory ya shared cache se jawab
+    ("cache", ["hi", "hello", "hey", "kaise ho", "kya haal", "kya kar rahe ho", "good morning", "good night",
+               "thanks", "thank you", "shukriya", "tumhara naam", "kaun ho", "bye"]),
+    # Sawal wale words: kuch aur match na ho to search
+    ("search", ["who", "what", "where", "when", "kab", "kahan", "kaun", "kitna", "kitne"]),
+]
+
+class RouteDecision:
+    __slots__ = ("route", "tier", "matched")
+
+    def __init__(self, route, tier, matched):
+        self.route = route
+        self.tier = tier          # kaunsa rule tier laga (-1 = default)
+        self.matched = matched    # [(term, tier), ...] saare matches
+
+    def trace(self):
+        terms = ", ".join(f"{t}@{i}" for t, i in self.matched) or "-"
+        return f"route={self.route} tier={self.tier} matched=[{terms}]"
+
+class QueryRouter:
+    """
+    Message ko cache / basic / search route par bhejta hai.
+    "cache" route wale messages (greetings) bina context ke jaate hain, taaki JSON/shared cache hit par model na lage.
+    Saare rules ek hi compiled regex mein hain (word boundary ke saath), to "who" ab "whole" se match nahi hota.
+    """
+
+    def __init__(self, rules=None, default_route="basic"):
+        self.default_route = default_route
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self.set_rules(rules or DEFAULT_RULES)
+
+    def set_rules(self, rules):
+        parts = []
+        for tier, (_, terms) in enumerate(rules):
+            # Lambe phrases pehle, taaki "kaise ho" poora match ho
+            alts = "|".join(r"\s+".join(map(re.escape, t.split())) for t in sorted(terms, key=len, reverse=True))
+            parts.append(f"(?P<t{tier}>{alts})")
+        self._rules = [(route, list(terms)) for route, terms in rules]
+        self._regex = re.compile(r"\b(?:" + "|".join(parts) + r")\b", re.IGNORECASE)
+
+    def route(self, text):
+        # Saare matches trace/metrics ke liye, route sabse chhote tier ka
+        matched = []
+        for m in self._regex.finditer(text or ""):
+            matched.append((m.group(0).lower(), int(m.lastgroup[1:])))
+        best = min((tier for _, tier in matched), default=None)
+        if best is None:
+            decision = RouteDecision(self.default_route, -1, matched)
+        else:
+            decision = RouteDecision(self._rules[best][0], best, matched)
+        with self._lock:
+            self.counts[(decision.route, decision.tier)] += 1
+        return decision
+
+    def stats(self):
+        with self._lock:
+            return {f"{route}@{tier}": n for (route, tier), n in self.counts.items()}
+
+def load_rules(path):
+    """
+    JSON file se rules: [["search", ["news", ...]], ["cache", [...]], ...]. File na ho to defaults.
+    """
+    if not path or not os.path.exists(path): return DEFAULT_RULES
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return [(route, terms) for route, terms in json.load(f)]
+    except Exception as e:
+        print(f"Router Rules Load Error: {e}")
+        return DEFAULT_RULES
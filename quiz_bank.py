@@ -0,0 +1,165 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from reply_matcher import normalize, ReplyIndex
+from reply_store import atomic_write_json
+from singleflight import SingleFlight
+
+def validate_question(item, clean=lambda s: s):
+    """
+    Gemini ka ek MCQ check karta hai (q, o, a, exp). Sahi ho to saaf dict, warna None.
+    """
+    if not isinstance(item, dict): return None
+    q, opts, ans = item.get('q'), item.get('o'), item.get('a')
+    if not isinstance(q, str) or not q.strip(): return None
+    if not isinstance(opts, list) or len(opts) != 4: return None
+    if not all(isinstance(o, (str, int, float)) and str(o).strip() for o in opts): return None
+    if isinstance(ans, str) and ans.strip().isdigit(): ans = int(ans)
+    if not isinstance(ans, int) or isinstance(ans, bool) or not 0 <= ans < 4: return None
+    exp = item.get('exp', '')
+    return {
+        'q': clean(q.strip()),
+        'o': [clean(str(o).strip()) for o in opts],
+        'a': ans,
+        'exp': clean(exp) if isinstance(exp, str) else '',
+    }
+
+class QuestionBank:
+    """
+    (topic, level) ke hisaab se MCQs ka shared bank.
+    Ek Gemini call se kai sawal aate hain; duplicate sawal hat jaate hain
+    aur har user ko wahi sawal milte hain jo usne abhi tak nahi dekhe.
+    """
+
+    def __init__(self, path, generate_batch, clean=lambda s: s, batch_size=10, low_water=3,
+                 max_per_bucket=500, dup_threshold=0.85, max_users=10000):
+        self.path = path
+        self.generate_batch = generate_batch   # (level, topic, n) -> list of raw dicts
+        self.clean = clean
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.max_per_bucket = max_per_bucket
+        self.dup_threshold = dup_threshold
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        # Ek waqt mein sirf ek save; warna purana snapshot naye ke upar likh sakta hai
+        self._save_lock = threading.Lock()
+        self._buckets = {}                     # "level|topic" -> list of questions
+        self._indexes = {}                     # "level|topic" -> ReplyIndex (near-duplicate check)
+        self._seen = OrderedDict()             # user_id -> question ids (LRU, max_users tak)
+        self._refills = SingleFlight(max_workers=4)
+        self.generated = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self._load()
+
+    @staticmethod
+    def _bucket_key(topic, level):
+        return f"{level.strip().lower()}|{normalize(topic) or topic.strip().lower()}"
+
+    @staticmethod
+    def _question_id(q):
+        return hashlib.sha1(normalize(q).encode("utf-8")).hexdigest()[:16]
+
+    def _load(self):
+        if not os.path.exists(self.path): return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for key, items in data.items():
+                for item in items:
+                    self._add(key, item)
+        except Exception as e:
+            print(f"Quiz Bank Load Error: {e}")
+
+    def _save(self):
+        with self._save_lock:
+            with self._lock:
+                snapshot = {k: list(v) for k, v in self._buckets.items()}
+            try:
+                atomic_write_json(self.path, snapshot)
+            except Exception as e:
+                print(f"Quiz Bank Save Error: {e}")
+
+    def _add(self, key, item):
+        # Lock lene ki zimmedari caller ki hai
+        bucket = self._buckets.setdefault(key, [])
+        index = self._indexes.setdefault(key, ReplyIndex(threshold=self.dup_threshold))
+        if index.lookup(item['q']) is not None:
+            self.duplicates += 1
+            return False
+        item = dict(item, id=item.get('id') or self._question_id(item['q']))
+        bucket.append(item)
+        index.add(item['q'])
+        if len(bucket) > self.max_per_bucket:
+            old = bucket.pop(0)
+            index.remove(old['q'])
+        return True
+
+    def _refill(self, key, topic, level):
+        raw_items = self.generate_batch(level, topic, self.batch_size)
+        added = 0
+        with self._lock:
+            for raw in raw_items or []:
+                item = validate_question(raw, self.clean)
+                if item is None:
+                    self.rejected += 1
+                    continue
+                if self._add(key, item):
+                    added += 1
+            self.generated += added
+        if added:
+            self._save()
+        return added
+
+    def _unseen(self, key, user_id):
+        seen = self._seen.get(user_id, ())
+        return [q for q in self._buckets.get(key, ()) if q['id'] not in seen]
+
+    def _mark_seen(self, user_id, question_id):
+        # Lock caller ke paas hai. Quiz beech mein chhodne wale users ke sets bhi hamesha na rahein
+        seen = self._seen.get(user_id)
+        if seen is None:
+            seen = self._seen[user_id] = set()
+        self._seen.move_to_end(user_id)
+        seen.add(question_id)
+        while len(self._seen) > self.max_users:
+            self._seen.popitem(last=False)
+
+    def next_question(self, user_id, topic, level, timeout=None):
+        """
+        User ke liye ek naya (unseen) sawal deta hai. Bank khali ho to batch generate karta hai.
+        """
+        key = self._bucket_key(topic, level)
+        for _ in range(2):
+            with self._lock:
+                fresh = self._unseen(key, user_id)
+                if fresh:
+                    item = fresh[0]
+                    self._mark_seen(user_id, item['id'])
+            if fresh:
+                # Stock kam ho raha hai to background mein agla batch mangwa lo
+                if len(fresh) - 1 < self.low_water:
+                    self._refills.submit(key, self._refill, key, topic, level)
+                return item
+            self._refills.do(key, self._refill, key, topic, level, timeout=timeout)
+        raise ValueError(f"No new questions for {topic} / {level}")
+
+    def forget_user(self, user_id):
+        # Quiz khatam: is user ke dekhe hue sawal bhool jao
+        with self._lock:
+            self._seen.pop(user_id, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "buckets": len(self._buckets),
+                "questions": sum(len(b) for b in self._buckets.values()),
+                "generated": self.generated,
+                "duplicates": self.duplicates,
+                "rejected": self.rejected,
+                "refill_calls": self._refills.calls,
+                "tracked_users": len(self._seen),
+            }
@@ -1,9 +1,10 @@
 import json
 from telebot import types
+from session_store import MemorySessionStore
 
-# Temporary memory to store correct answers
+# Temporary memory to store correct answers (1 ghante baad apne aap hat jaate hain)
 # Format: {message_id: correct_option_index}
-quiz_state = {}
+quiz_state = MemorySessionStore(idle_ttl=3600, max_entries=20000)
 
 def generate_quiz(bot, message, model_basic):
     """
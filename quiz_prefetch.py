@@ -0,0 +1,47 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class QuizPrefetcher:
+    """
+    Active quiz ka agla sawal background mein pehle se bana ke rakhta hai.
+    """
+
+    def __init__(self, max_workers=4):
+        self._lock = threading.Lock()
+        self._pending = {}   # user_id -> (tag, future)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quiz-prefetch")
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, user_id, tag, fn, *args):
+        # tag se pata chalta hai sawal kis quiz (level, topic) ke liye bana hai
+        with self._lock:
+            old = self._pending.pop(user_id, None)
+            if old: old[1].cancel()
+            self._pending[user_id] = (tag, self._pool.submit(fn, *args))
+
+    def take(self, user_id, tag, timeout=None):
+        """
+        Prefetch hua sawal deta hai agar wo isi tag ke liye bana tha.
+        Tayar na ho to timeout tak rukta hai; fail hone par None.
+        """
+        with self._lock:
+            entry = self._pending.pop(user_id, None)
+        if entry is None or entry[0] != tag:
+            if entry: entry[1].cancel()
+            self.misses += 1
+            return None
+        try:
+            result = entry[1].result(timeout=timeout)
+            self.hits += 1
+            return result
+        except Exception as e:
+            print(f"Quiz Prefetch Error: {e}")
+            self.misses += 1
+            return None
+
+    def drop(self, user_id):
+        # Stop dabane par bana hua/banta hua sawal phenk do
+        with self._lock:
+            entry = self._pending.pop(user_id, None)
+        if entry: entry[1].cancel()
@@ -0,0 +1,185 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+# Hinglish ki alag alag spellings ko ek hi form mein laate hain.
+# Asli English words ("me", "he", "h", "thick", "hay") yahan nahi, warna English sawal Hinglish jawab se mil jaate.
+HINGLISH_MAP = {
+    "kese": "kaise", "kaise": "kaise", "kaisay": "kaise", "kesy": "kaise", "kaisa": "kaisa", "kesa": "kaisa",
+    "kya": "kya", "kia": "kya", "kyaa": "kya", "ky": "kya",
+    "hai": "hai", "hain": "hai", "hei": "hai",
+    "ho": "ho", "hoo": "ho",
+    "nhi": "nahi", "nahi": "nahi", "nai": "nahi", "nahin": "nahi", "ni": "nahi",
+    "tum": "tum", "tm": "tum", "tu": "tu",
+    "aap": "aap", "ap": "aap", "aapka": "aapka", "apka": "aapka",
+    "mai": "main", "mein": "main", "main": "main",
+    "kr": "kar", "kar": "kar", "karo": "karo", "kro": "karo",
+    "rhe": "rahe", "rahe": "rahe", "rahi": "rahi", "rhi": "rahi",
+    "thik": "theek", "thk": "theek", "theek": "theek",
+    "acha": "accha", "achha": "accha", "accha": "accha", "acchha": "accha",
+    "kaun": "kaun", "kon": "kaun", "kaon": "kaun",
+    "kahan": "kahan", "kaha": "kahan", "kha": "kahan",
+    "naam": "naam", "nam": "naam",
+    "hlo": "hello", "helo": "hello", "hello": "hello", "hllo": "hello",
+    "hii": "hi", "hi": "hi", "hey": "hi",
+    "gm": "good morning", "gn": "good night",
+    "u": "you", "r": "are", "ur": "your", "pls": "please", "plz": "please",
+}
+
+# Ye words matlab nahi badalte, sirf "bhai", "yaar" jaisa filler hain
+FILLER_WORDS = {"bhai", "bhaiya", "bro", "yaar", "yar", "ji", "dost", "re", "please"}
+# Inke hone/na hone se jawab ulta ho jaata hai, isliye fuzzy match mein bhi exact chahiye
+NEGATION_WORDS = {"nahi", "na", "mat", "not", "no", "never", "dont"}
+# Ye chhoot jayein to sawal wahi rehta hai ("naam kya hai" ~ "naam kya")
+SOFT_WORDS = {"hai", "ho", "hoon", "is", "are", "am", "the", "a", "an", "to", "toh"}
+OPERATORS = "+-*/=%^<>"
+
+# Operators aur numbers ke beech ka "." bhi matlab rakhte hain ("2+2", "2.5"), baaki punctuation hatao
+_PUNCT_RE = re.compile(r"(?!(?<=\d)\.(?=\d))[^\w\s+\-*/=%^<>]", re.UNICODE)
+_OPERATOR_RE = re.compile(r"([+\-*/=%^<>])")
+_SPACE_RE = re.compile(r"\s+")
+_REPEAT_RE = re.compile(r"(.)\1{2,}")
+
+def normalize(text):
+    """
+    Text ko matching ke liye saaf karta hai: punctuation hatao (operators rakho), spaces collapse karo,
+    Hinglish spellings ek jaisi karo aur filler words hatao.
+    """
+    if not text: return ""
+    text = unicodedata.normalize("NFKC", text).lower().replace("n't", " not")
+    text = _PUNCT_RE.sub(" ", text).replace("_", " ")
+    text = _OPERATOR_RE.sub(r" \1 ", text)
+    text = _REPEAT_RE.sub(r"\1", text)
+    tokens = []
+    for tok in _SPACE_RE.split(text.strip()):
+        if not tok: continue
+        tok = HINGLISH_MAP.get(tok, tok)
+        if tok in FILLER_WORDS: continue
+        tokens.append(tok)
+    return " ".join(tokens)
+
+def _is_strict(tok):
+    # Number, operator, negation: sirf exact match chalega
+    return tok in NEGATION_WORDS or tok in OPERATORS or any(ch.isdigit() for ch in tok)
+
+def _edit_distance(a, b, limit):
+    # Levenshtein, limit se upar jaate hi ruk jaata hai
+    if abs(len(a) - len(b)) > limit: return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit: return limit + 1
+        prev = cur
+    return prev[-1]
+
+def is_spelling_variant(a, b):
+    """
+    Do words ek hi word ki alag spelling hain ya nahi ("kaisee" ~ "kaise").
+    Chhote words aur alag shuru hone wale words (cm/pm, ravi/raj) variant nahi maane jaate.
+    """
+    if a == b: return True
+    if _is_strict(a) or _is_strict(b): return False
+    shorter = min(len(a), len(b))
+    if shorter < 4 or a[0] != b[0]: return False
+    return _edit_distance(a, b, 2) <= (1 if shorter < 8 else 2)
+
+def tokens_compatible(query, candidate):
+    """
+    Fuzzy match tabhi maanya hai jab dono ke words sirf spelling mein alag hon.
+    Numbers, operators aur negations exact milne chahiye; bacha hua har word SOFT_WORDS mein ho.
+    """
+    q_left = query.split()
+    c_left = candidate.split()
+    for tok in list(q_left):
+        if tok in c_left:
+            q_left.remove(tok)
+            c_left.remove(tok)
+    for tok in list(q_left):
+        match = next((c for c in c_left if is_spelling_variant(tok, c)), None)
+        if match is not None:
+            q_left.remove(tok)
+            c_left.remove(match)
+    return all(t in SOFT_WORDS for t in q_left + c_left)
+
+def _grams(norm, n=3):
+    padded = f" {norm} "
+    if len(padded) <= n: return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+class ReplyIndex:
+    """
+    Saved questions par character trigram index.
+    Lookup sirf unhi keys ko score karta hai jo query ke saath grams share karti hain.
+    """
+
+    def __init__(self, threshold=0.75, max_postings=5000, max_candidates=50):
+        self.threshold = threshold
+        self.max_postings = max_postings
+        self.max_candidates = max_candidates
+        self.clear()
+
+    def clear(self):
+        self._exact = {}                    # normalized -> original key
+        self._grams = {}                    # normalized -> gram set
+        self._postings = defaultdict(set)   # gram -> normalized keys
+
+    def __len__(self):
+        return len(self._exact)
+
+    def add(self, key):
+        norm = normalize(key)
+        if not norm: return
+        if norm in self._exact:
+            self._exact[norm] = key
+            return
+        grams = _grams(norm)
+        self._exact[norm] = key
+        self._grams[norm] = grams
+        for g in grams:
+            self._postings[g].add(norm)
+
+    def remove(self, key):
+        norm = normalize(key)
+        if self._exact.get(norm) != key: return
+        del self._exact[norm]
+        for g in self._grams.pop(norm, ()):
+            bucket = self._postings.get(g)
+            if bucket is None: continue
+            bucket.discard(norm)
+            if not bucket: del self._postings[g]
+
+    def lookup(self, text):
+        """
+        Best matching saved key return karta hai (ya None).
+        """
+        norm = normalize(text)
+        if not norm: return None
+        if norm in self._exact:
+            return self._exact[norm]
+        # Bahut chhote text par fuzzy match bharosemand nahi hota
+        if len(norm) < 3: return None
+
+        q_grams = _grams(norm)
+        postings = [self._postings[g] for g in q_grams if g in self._postings]
+        # Bahut common grams (jaise " ka") har key mein hote hain, unhe skip karo
+        selective = [p for p in postings if len(p) <= self.max_postings]
+        if not selective: return None
+
+        counts = defaultdict(int)
+        for p in selective:
+            for cand in p:
+                counts[cand] += 1
+
+        # Dice >= threshold ke liye kam se kam itne grams common hone chahiye
+        min_shared = self.threshold * len(q_grams) / 2
+        ranked = sorted((c for c in counts.items() if c[1] >= min_shared), key=lambda c: -c[1])
+
+        best_key, best_score = None, self.threshold
+        for cand, _ in ranked[:self.max_candidates]:
+            c_grams = self._grams[cand]
+            score = 2 * len(q_grams & c_grams) / (len(q_grams) + len(c_grams))
+            if score >= best_score and tokens_compatible(norm, cand):
+                best_key, best_score = cand, score
+        return self._exact[best_key] if best_key else None
@@ -0,0 +1,138 @@
+import os
+import json
+import stat
+import time
+import threading
+import tempfile
+import atexit
+from reply_matcher import ReplyIndex
+
+def atomic_write_json(path, data):
+    # Temp file mein likh ke rename karo, taaki adhoori file kabhi na bane
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=folder)
+    try:
+        # mkstemp 0600 file banata hai; purani file ka mode hi rakho
+        try: mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError: mode = 0o644
+        os.chmod(tmp_path, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+
+class ReplyStore:
+    """
+    reply.json ko ek baar load karke memory se replies deta hai.
+    Changes background mein batch karke atomic write se save hote hain.
+    Exact match na mile to normalized/fuzzy index se milta-julta sawal dhoondta hai.
+    """
+
+    def __init__(self, path, flush_interval=5.0, match_threshold=0.75):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        # Snapshot aur write ek saath: purana snapshot naye ke upar kabhi na likha jaye
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._closed = False
+        self._data = self._load()
+        self._index = ReplyIndex(threshold=match_threshold)
+        for key in self._data:
+            self._index.add(key)
+        self._writer = threading.Thread(target=self._write_loop, name="reply-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            print(f"Reply Store Load Error: {e}")
+            return {}
+
+    @staticmethod
+    def _key(text):
+        return text.lower().strip()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, text):
+        # Exact dict lookup ke liye lock ki zaroorat nahi (GIL safe)
+        reply = self._data.get(self._key(text))
+        if reply is not None:
+            return reply
+        with self._cond:
+            key = self._index.lookup(text)
+            return self._data.get(key) if key is not None else None
+
+    def set(self, question, answer):
+        key = self._key(question)
+        with self._cond:
+            self._data[key] = answer
+            self._index.add(key)
+            self._mark_dirty()
+
+    def clear(self):
+        with self._cond:
+            self._data = {}
+            self._index.clear()
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._dirty = True
+        self._cond.notify()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while not self._dirty and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Thoda rukte hain taaki ek saath aaye saare changes ek hi write mein jayein.
+                # Deadline fixed hai: beech ke notify() se intezaar chhota nahi hota
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._cond:
+                if not self._dirty:
+                    return
+                self._dirty = False
+                snapshot = dict(self._data)
+            try:
+                atomic_write_json(self.path, snapshot)
+            except Exception as e:
+                with self._cond:
+                    self._dirty = True
+                print(f"Reply Store Save Error: {e}")
+
+    def close(self):
+        # Shutdown par jo bhi pending hai, turant disk par likh do
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join(timeout=2)
+        self.flush()
@@ -0,0 +1,94 @@
+import re
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+# Aaj/abhi/date wale sawalon ka jawab waqt ke saath badalta hai, unhe cache nahi karte
+TIME_SENSITIVE_RE = re.compile(
+    r"\b(?:aaj|aj|abhi|kal|parso|today|tonight|tomorrow|yesterday|now|time|date|day|tarikh|tareekh|"
+    r"samay|baje|din|week|hafte|month|mahina|mahine|year|saal|current|latest|news)\b",
+    re.IGNORECASE,
+)
+
+def cache_text(text):
+    """
+    Cache key ke liye sirf case aur spaces ek jaise karta hai.
+    Punctuation/operators rehte hain: "2+2" aur "2-2" alag keys hain.
+    """
+    return " ".join((text or "").lower().split())
+
+def is_time_sensitive(text):
+    return bool(TIME_SENSITIVE_RE.search(text or ""))
+
+class ResponseCache:
+    """
+    Gemini answers ke liye chhota TTL + LRU cache.
+    Entries ki ginti aur lagbhag memory (bytes) dono par limit hai.
+    """
+
+    def __init__(self, max_entries=5000, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items = OrderedDict()   # key -> (expires_at, value, size)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size_of(key, value):
+        parts = key if isinstance(key, tuple) else (key,)
+        return sys.getsizeof(value) + sum(sys.getsizeof(p) for p in parts)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value, size = entry
+            if expires_at <= now:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl):
+        size = self._size_of(key, value)
+        if size > self.max_bytes: return
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            self._items[key] = (time.monotonic() + ttl, value, size)
+            self._bytes += size
+            # Sabse purani (least recently used) entries pehle hatao
+            while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._items))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key):
+        _, _, size = self._items.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
@@ -0,0 +1,89 @@
+import heapq
+import itertools
+import threading
+import time
+
+class TimerHandle:
+    __slots__ = ("when", "fn", "args", "cancelled", "_scheduler")
+
+    def __init__(self, when, fn, args, scheduler):
+        self.when = when
+        self.fn = fn
+        self.args = args
+        self.cancelled = False
+        self._scheduler = scheduler
+
+    def cancel(self):
+        # O(1): sirf mark karte hain, heap se entry baad mein nikalti hai
+        self._scheduler._cancel(self)
+
+class TimerScheduler:
+    """
+    Saare timers ke liye ek hi thread (min-heap par).
+    Schedule O(log n), cancel O(1) hai.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._live = 0
+        self._cancelled = 0
+        self.fired = 0
+        self._thread = threading.Thread(target=self._run, name="timer-scheduler", daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay, fn, *args):
+        """
+        delay seconds baad fn(*args) chalata hai. Cancel karne ke liye handle deta hai.
+        """
+        handle = TimerHandle(time.monotonic() + delay, fn, args, self)
+        with self._cond:
+            heapq.heappush(self._heap, (handle.when, next(self._seq), handle))
+            self._live += 1
+            # Naya timer sabse pehle ka hai to thread ko jaga do
+            if self._heap[0][2] is handle:
+                self._cond.notify()
+        return handle
+
+    def _cancel(self, handle):
+        # Check aur mark dono lock ke andar: _run ke fire karne se race na ho
+        with self._cond:
+            if handle.cancelled:
+                return
+            handle.cancelled = True
+            self._live -= 1
+            self._cancelled += 1
+            # Bahut saare cancelled timers jama ho jayein to heap saaf kar do
+            if self._cancelled > 64 and self._cancelled > len(self._heap) // 2:
+                self._heap = [e for e in self._heap if not e[2].cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+
+    def pending(self):
+        with self._cond:
+            return self._live
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                        self._cancelled -= 1
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                _, _, handle = heapq.heappop(self._heap)
+                # Fire hone ke baad cancel() se ginti na bigde
+                handle.cancelled = True
+                self._live -= 1
+                self.fired += 1
+            try:
+                handle.fn(*handle.args)
+            except Exception as e:
+                print(f"Timer Error: {e}")
@@ -0,0 +1,232 @@
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+
+class SessionStore(ABC):
+    """
+    User sessions ke liye common interface (dict jaisa).
+    Note: value badalne ke baad store[key] = value dobara likhna zaroori hai,
+    kyunki SQLite backend har get par nayi copy deta hai.
+    """
+
+    @abstractmethod
+    def get(self, key, default=None): ...
+
+    @abstractmethod
+    def __setitem__(self, key, value): ...
+
+    @abstractmethod
+    def __delitem__(self, key): ...
+
+    @abstractmethod
+    def __len__(self): ...
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None: raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def pop(self, key, default=None):
+        value = self.get(key)
+        if value is None: return default
+        del self[key]
+        return value
+
+    def setdefault(self, key, default):
+        value = self.get(key)
+        if value is None:
+            self[key] = default
+            return default
+        return value
+
+class MemorySessionStore(SessionStore):
+    """
+    In-memory store: sharded locks, idle TTL ke baad eviction, aur entries ki max limit.
+    """
+
+    def __init__(self, idle_ttl=24 * 3600, max_entries=100000, shards=16):
+        self.idle_ttl = idle_ttl
+        self._per_shard = max(1, max_entries // shards)
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self.evicted = 0
+
+    def _shard(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def _expire(self, items, now):
+        # OrderedDict last-access order mein hai, to sirf shuru ki entries check karni hain
+        while items:
+            key, (_, stamp) = next(iter(items.items()))
+            if now - stamp <= self.idle_ttl and len(items) <= self._per_shard: break
+            del items[key]
+            self.evicted += 1
+
+    def get(self, key, default=None):
+        lock, items = self._shard(key)
+        now = time.monotonic()
+        with lock:
+            entry = items.get(key)
+            if entry is None: return default
+            if now - entry[1] > self.idle_ttl:
+                del items[key]
+                self.evicted += 1
+                return default
+            items[key] = (entry[0], now)
+            items.move_to_end(key)
+            return entry[0]
+
+    def __setitem__(self, key, value):
+        lock, items = self._shard(key)
+        now = time.monotonic()
+        with lock:
+            items[key] = (value, now)
+            items.move_to_end(key)
+            self._expire(items, now)
+
+    def __delitem__(self, key):
+        lock, items = self._shard(key)
+        with lock:
+            del items[key]
+
+    # pop/setdefault ek hi lock ke andar, taaki do threads ek saath na padhein-likhein
+    def pop(self, key, default=None):
+        lock, items = self._shard(key)
+        now = time.monotonic()
+        with lock:
+            entry = items.pop(key, None)
+            if entry is None or now - entry[1] > self.idle_ttl: return default
+            return entry[0]
+
+    def setdefault(self, key, default):
+        lock, items = self._shard(key)
+        now = time.monotonic()
+        with lock:
+            entry = items.get(key)
+            value = entry[0] if entry is not None and now - entry[1] <= self.idle_ttl else default
+            items[key] = (value, now)
+            items.move_to_end(key)
+            self._expire(items, now)
+            return value
+
+    def __len__(self):
+        # Idle TTL se purani entries ginti mein nahi aati (pehle unhe hata do)
+        now = time.monotonic()
+        total = 0
+        for lock, items in self._shards:
+            with lock:
+                self._expire(items, now)
+                total += len(items)
+        return total
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite (WAL mode) par sessions. Kai processes ek hi file share kar sakte hain
+    aur restart ke baad bhi data bacha rehta hai. Values JSON mein save hoti hain.
+    """
+
+    def __init__(self, path, namespace, idle_ttl=24 * 3600, sweep_every=500):
+        self.path = path
+        self.namespace = namespace
+        self.idle_ttl = idle_ttl
+        self.sweep_every = sweep_every
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated REAL NOT NULL,"
+            " PRIMARY KEY (ns, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (ns, updated)")
+
+    def _conn(self):
+        # sqlite connection threads ke beech share nahi hota, har thread ka apna
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; transactions khud BEGIN IMMEDIATE se kholte hain (_transaction)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE: write lock shuru mein hi, taaki read-modify-write ke beech koi aur na likhe
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _read(self, conn, key):
+        row = conn.execute(
+            "SELECT value, updated FROM sessions WHERE ns = ? AND key = ?", (self.namespace, str(key))
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.idle_ttl:
+            return None
+        return json.loads(row[0])
+
+    def _write(self, conn, key, value):
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (ns, key, value, updated) VALUES (?, ?, ?, ?)",
+            (self.namespace, str(key), json.dumps(value, ensure_ascii=False), time.time()),
+        )
+
+    def get(self, key, default=None):
+        value = self._read(self._conn(), key)
+        return default if value is None else value
+
+    def __setitem__(self, key, value):
+        with self._transaction() as conn:
+            self._write(conn, key, value)
+        self._writes += 1
+        if self._writes % self.sweep_every == 0:
+            self.sweep()
+
+    def __delitem__(self, key):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM sessions WHERE ns = ? AND key = ?", (self.namespace, str(key)))
+
+    def pop(self, key, default=None):
+        with self._transaction() as conn:
+            value = self._read(conn, key)
+            conn.execute("DELETE FROM sessions WHERE ns = ? AND key = ?", (self.namespace, str(key)))
+        return default if value is None else value
+
+    def setdefault(self, key, default):
+        with self._transaction() as conn:
+            value = self._read(conn, key)
+            if value is None:
+                value = default
+                self._write(conn, key, value)
+        return value
+
+    def __len__(self):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM sessions WHERE ns = ? AND updated >= ?", (self.namespace, time.time() - self.idle_ttl)
+        ).fetchone()[0]
+
+    def sweep(self):
+        # Purane (idle) sessions delete karo
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM sessions WHERE ns = ? AND updated < ?", (self.namespace, time.time() - self.idle_ttl))
+
+def open_session_store(namespace, backend="memory", path="sessions.db", idle_ttl=24 * 3600, max_entries=100000):
+    """
+    SESSION_BACKEND ke hisaab se memory ya sqlite store banata hai.
+    """
+    if backend == "sqlite":
+        return SQLiteSessionStore(path, namespace, idle_ttl=idle_ttl)
+    return MemorySessionStore(idle_ttl=idle_ttl, max_entries=max_entries)
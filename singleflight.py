@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class SingleFlight:
+    """
+    Ek hi (model, prompt) ki ek saath aayi requests ko ek call mein jodta hai.
+    Pehla caller call chalata hai, baaki usi future ka intezaar karte hain.
+    """
+
+    def __init__(self, max_workers=16):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="singleflight")
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, timeout=None, **kwargs):
+        """
+        fn(*args, **kwargs) ka result deta hai. Har caller ka apna timeout hota hai;
+        fn ka error har waiting caller tak pahunchta hai.
+        """
+        return self.submit(key, fn, *args, **kwargs).result(timeout=timeout)
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        do() jaisa, par intezaar kiye bina future return karta hai.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.shared += 1
+                return future
+            self.calls += 1
+            future = self._pool.submit(fn, *args, **kwargs)
+            self._inflight[key] = future
+        # Lock ke bahar lagao: future pehle hi done ho to callback turant isi thread mein chalta hai
+        future.add_done_callback(lambda f, k=key: self._forget(k, f))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def pending(self):
+        with self._lock:
+            return len(self._inflight)
+
+class AsyncSingleFlight:
+    """
+    SingleFlight ka asyncio roop: ek hi key ki ek saath aayi coroutines ek hi task ka result paati hain.
+    Ek loop par chalta hai, isliye lock nahi chahiye.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key, coro_fn, *args):
+        """
+        coro_fn(*args) ka result. Kisi ek caller ke cancel hone se baaki callers ka task nahi rukta.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.calls += 1
+            task = self._inflight[key] = asyncio.ensure_future(coro_fn(*args))
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def pending(self):
+        return len(self._inflight)
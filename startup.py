@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import importlib
+import threading
+from contextlib import contextmanager
+
+class StartupReport:
+    """
+    Startup ke har step (imports, init) ka time note karta hai.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timed(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.steps.append((name, time.perf_counter() - t0))
+
+    def summary(self):
+        with self._lock:
+            steps = list(self.steps)
+        lines = [f"  {name}: {sec * 1000:.0f} ms" for name, sec in steps]
+        lines.append(f"  total (since start): {(time.perf_counter() - self.started) * 1000:.0f} ms")
+        return "⏱️ Startup Report:\n" + "\n".join(lines)
+
+class LazyModule:
+    """
+    Module tabhi import hota hai jab pehli baar uska koi attribute use ho.
+    setup(module) import ke turant baad ek baar chalta hai (jaise genai.configure).
+    """
+
+    def __init__(self, name, report=None, setup=None):
+        self._name = name
+        self._report = report
+        self._setup = setup
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    if self._report:
+                        with self._report.timed(f"lazy import {self._name}"):
+                            module = importlib.import_module(self._name)
+                    else:
+                        module = importlib.import_module(self._name)
+                    if self._setup: self._setup(module)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+class LazyObject:
+    """
+    factory() se object pehli baar use hone par banta hai (jaise GenerativeModel).
+    """
+
+    def __init__(self, factory, name="object", report=None):
+        self._factory = factory
+        self._name = name
+        self._report = report
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._obj is None:
+            with self._lock:
+                if self._obj is None:
+                    if self._report:
+                        with self._report.timed(f"init {self._name}"):
+                            self._obj = self._factory()
+                    else:
+                        self._obj = self._factory()
+        return self._obj
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+class ModelSelectionCache:
+    """
+    Chuna hua Gemini model disk par TTL ke saath yaad rakhta hai,
+    taaki restart par list_models() ka network call na karna pade.
+    """
+
+    def __init__(self, path, ttl=24 * 3600):
+        self.path = path
+        self.ttl = ttl
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if time.time() - data.get("saved_at", 0) > self.ttl: return None
+            return data.get("model")
+        except (OSError, ValueError):
+            return None
+
+    def save(self, model_name):
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"model": model_name, "saved_at": time.time()}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Model Cache Save Error: {e}")
@@ -0,0 +1,125 @@
+import time
+from markdown_format import format_markdown, strip_markdown
+
+TELEGRAM_LIMIT = 4096
+MARKERS = ("```", "`", "*", "_")
+
+def is_markdown_balanced(text):
+    """
+    Telegram (legacy) Markdown ke markers ki ginti even hai ya nahi.
+    Code ke andar wale * aur _ nahi gine jaate.
+    """
+    open_marker = None
+    i = 0
+    while i < len(text):
+        if text[i] == "\\":
+            i += 2
+            continue
+        for m in MARKERS:
+            if text.startswith(m, i):
+                if open_marker is None:
+                    open_marker = m
+                elif open_marker == m:
+                    open_marker = None
+                elif open_marker in ("```", "`"):
+                    # Code ke andar baaki markers literal hain
+                    pass
+                i += len(m)
+                break
+        else:
+            i += 1
+    return open_marker is None
+
+def safe_cut(text, limit):
+    """
+    limit tak ka sabse lamba prefix jo newline/space par khatam ho aur Markdown balanced ho.
+    """
+    if len(text) <= limit and is_markdown_balanced(text):
+        return len(text)
+    window = text[:limit]
+    for sep in ("\n\n", "\n", " "):
+        pos = window.rfind(sep)
+        while pos > 0:
+            if is_markdown_balanced(text[:pos]):
+                return pos + len(sep)
+            pos = window.rfind(sep, 0, pos)
+    return limit
+
+def split_message(text, limit=TELEGRAM_LIMIT):
+    parts = []
+    while len(text) > limit:
+        cut = safe_cut(text, limit)
+        parts.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text.strip(): parts.append(text)
+    return parts
+
+class StreamingReply:
+    """
+    Gemini ke stream chunks ko Telegram message mein dheere dheere edit karta hai.
+    Pehla chunk aate hi message jaata hai, phir throttle karke edits; 4096 se lamba ho to naya message.
+    """
+
+    def __init__(self, bot, message, min_interval=1.5, min_growth=60, limit=TELEGRAM_LIMIT):
+        self.bot = bot
+        self.message = message
+        self.min_interval = min_interval
+        self.min_growth = min_growth
+        self.limit = limit
+        self.text = ""            # poora jawab ab tak
+        self._done_offset = 0     # itna text purane (finalized) messages mein ja chuka
+        self._msg = None
+        self._shown = ""
+        self._last_edit = 0.0
+        self._markdown = True
+        self.edits = 0
+        self.markdown_fallbacks = 0
+
+    def feed(self, chunk):
+        if not chunk: return
+        self.text += chunk
+        # Current message limit se bada ho gaya: safe jagah par kaat ke naya message shuru
+        while len(self.text) - self._done_offset > self.limit:
+            current = self.text[self._done_offset:]
+            cut = safe_cut(current, self.limit)
+            self._show(current[:cut].rstrip(), final=True)
+            self._done_offset += cut
+            self._msg, self._shown = None, ""
+        current = self.text[self._done_offset:]
+        if self._msg is None:
+            if current.strip(): self._show(current, final=False)
+            return
+        if time.monotonic() - self._last_edit >= self.min_interval and len(current) - len(self._shown) >= self.min_growth:
+            self._show(current, final=False)
+
+    def finish(self):
+        current = self.text[self._done_offset:]
+        if current.strip():
+            self._show(current, final=True)
+        return self.text
+
+    def _show(self, text, final):
+        if not final:
+            # Beech ke edits mein sirf balanced hissa dikhao, taaki Markdown parse na toote
+            text = text[:safe_cut(text, len(text))] or text
+        if text == self._shown: return
+        # Local formatter se escape karke bhejo, taaki edit pehli baar mein hi parse ho
+        formatted = format_markdown(text) if self._markdown else None
+        use_md = formatted is not None and len(formatted) <= TELEGRAM_LIMIT
+        try:
+            self._send(formatted if use_md else strip_markdown(text), "Markdown" if use_md else None)
+        except Exception as e:
+            if not use_md: raise
+            print(f"Stream Markdown Failed, plain text: {e}")
+            self._markdown = False
+            self.markdown_fallbacks += 1
+            self._send(strip_markdown(text), None)
+        self._shown = text
+        self._last_edit = time.monotonic()
+
+    def _send(self, text, parse_mode):
+        if self._msg is None:
+            self._msg = self.bot.reply_to(self.message, text, parse_mode=parse_mode)
+        else:
+            self.bot.edit_message_text(text, self._msg.chat.id, self._msg.message_id, parse_mode=parse_mode)
+            self.edits += 1
@@ -0,0 +1,278 @@
+import time
+import asyncio
+import itertools
+import threading
+from contextlib import contextmanager
+import requests
+
+from log_shipper import retry_after_of
+
+PRIORITY_INTERACTIVE = 0   # user ko direct replies
+PRIORITY_BULK = 1          # quiz edits, markup updates
+PRIORITY_LOG = 2           # log channel
+
+# In methods ka chat flood limit se lena dena nahi hai
+EXEMPT_METHODS = {
+    "getUpdates", "getMe", "getFile", "setWebhook", "deleteWebhook", "getWebhookInfo",
+    "answerCallbackQuery", "sendChatAction", "downloadFile",
+}
+BULK_METHODS = {"editMessageText", "editMessageReplyMarkup", "editMessageCaption", "deleteMessage"}
+
+def rewind(streams):
+    # Retry par file dobara shuru se padhni chahiye, warna khaali upload jaata hai
+    for stream in streams:
+        if hasattr(stream, "seek"):
+            try: stream.seek(0)
+            except Exception: pass
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "stamp", "blocked_until")
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.stamp = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_time(self, now):
+        # Token milne mein kitna time baaki hai (0 = abhi mil sakta hai)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+class _Buckets:
+    """
+    Dono governors ka saanjha hissa: global + per-chat buckets, priorities aur agla kaun jaaye.
+    Locking (thread ya asyncio) subclass ka kaam hai.
+    """
+
+    def __init__(self, global_rate=30, chat_rate=1.0, chat_burst=3, group_rate=20 / 60,
+                 group_burst=3, max_retries=3):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats = {}
+        self._chat_priority = {}
+        self._waiters = {}          # (priority, seq) -> chat_id
+        self._seq = itertools.count()
+        self.sent = 0
+        self.retried_429 = 0
+
+    def set_chat_priority(self, chat_id, priority):
+        if chat_id is not None:
+            self._chat_priority[str(chat_id)] = priority
+
+    def _default_priority(self, method_name, chat_id):
+        if chat_id in self._chat_priority: return self._chat_priority[chat_id]
+        if method_name in BULK_METHODS: return PRIORITY_BULK
+        return PRIORITY_INTERACTIVE
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Groups/channels (negative id) ki limit 20 msg/min hai
+            if chat_id.startswith("-"):
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            if len(self._chats) > 10000:
+                self._prune()
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _prune(self):
+        # Jo buckets bhar chuke hain (idle chats), unhe memory se hata do
+        now = time.monotonic()
+        for cid, b in list(self._chats.items()):
+            b.refill(now)
+            if b.tokens >= b.capacity and now >= b.blocked_until:
+                del self._chats[cid]
+
+    def _next_ready(self, now):
+        """
+        Priority order mein pehla waiter jise abhi token mil sakta hai: (ticket, None),
+        warna (None, kitna sona hai). Oonchi priority wale pehle jaate hain.
+        """
+        self._global.refill(now)
+        sleep_for = None
+        for t in sorted(self._waiters):
+            g_wait = self._global.wait_time(now)
+            if g_wait > 0:
+                return None, g_wait
+            cid = self._waiters[t]
+            if cid is None:
+                return t, None
+            bucket = self._chat_bucket(cid)
+            bucket.refill(now)
+            c_wait = bucket.wait_time(now)
+            if c_wait == 0:
+                return t, None
+            sleep_for = c_wait if sleep_for is None else min(sleep_for, c_wait)
+        return None, sleep_for
+
+    def _consume(self, chat_id):
+        self._global.tokens -= 1
+        if chat_id is not None:
+            self._chat_bucket(chat_id).tokens -= 1
+
+    def _block_bucket(self, chat_id, retry_after):
+        until = time.monotonic() + retry_after
+        bucket = self._chat_bucket(chat_id) if chat_id is not None else self._global
+        bucket.blocked_until = max(bucket.blocked_until, until)
+
+    def _stats(self):
+        depth = {}
+        for (priority, _) in self._waiters:
+            depth[priority] = depth.get(priority, 0) + 1
+        return {"queued": depth, "sent": self.sent, "retried_429": self.retried_429, "chats": len(self._chats)}
+
+class TelegramGovernor(_Buckets):
+    """
+    Bot API ki saari outbound calls ke liye ek darwaza.
+    Global aur per-chat token buckets, priority (replies > quiz edits > logs),
+    aur 429 par retry_after ke hisaab se ruk kar dobara koshish.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._session = requests.Session()
+
+    @contextmanager
+    def lane(self, priority):
+        """
+        with governor.lane(PRIORITY_BULK): ... — is thread ki calls ki priority badal deta hai.
+        """
+        prev = getattr(self._local, "priority", None)
+        self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = prev
+
+    def _priority_for(self, method_name, chat_id):
+        override = getattr(self._local, "priority", None)
+        if override is not None: return override
+        return self._default_priority(method_name, chat_id)
+
+    def acquire(self, chat_id, priority):
+        """
+        Global + chat token milne tak rukta hai. Oonchi priority wale pehle jaate hain.
+        """
+        with self._cond:
+            ticket = (priority, next(self._seq))
+            self._waiters[ticket] = chat_id
+            try:
+                while True:
+                    chosen, sleep_for = self._next_ready(time.monotonic())
+                    if chosen == ticket:
+                        self._consume(chat_id)
+                        return
+                    if chosen is not None:
+                        self._cond.notify_all()
+                    self._cond.wait(timeout=sleep_for if sleep_for is not None else 0.05)
+            finally:
+                del self._waiters[ticket]
+                self._cond.notify_all()
+
+    def _block(self, chat_id, retry_after):
+        with self._cond:
+            self._block_bucket(chat_id, retry_after)
+
+    def send_request(self, method, url, params=None, files=None, timeout=None, proxies=None):
+        """
+        telebot.apihelper.CUSTOM_REQUEST_SENDER ke roop mein lagaya jata hai.
+        """
+        method_name = url.rsplit("/", 1)[-1]
+        if method_name in EXEMPT_METHODS:
+            return self._session.request(method, url, params=params, files=files, timeout=timeout, proxies=proxies)
+
+        chat_id = params.get("chat_id") if params else None
+        chat_id = str(chat_id) if chat_id is not None else None
+        priority = self._priority_for(method_name, chat_id)
+        for attempt in range(self.max_retries + 1):
+            self.acquire(chat_id, priority)
+            rewind(f[1] if isinstance(f, tuple) else f for f in (files or {}).values())
+            response = self._session.request(method, url, params=params, files=files, timeout=timeout, proxies=proxies)
+            if response.status_code != 429 or attempt == self.max_retries:
+                self.sent += 1
+                return response
+            try:
+                retry_after = float(response.json().get("parameters", {}).get("retry_after", 1))
+            except Exception:
+                retry_after = 1.0
+            self.retried_429 += 1
+            print(f"⚠️ Flood control on {method_name} ({chat_id}), waiting {retry_after}s")
+            self._block(chat_id, retry_after)
+        return response
+
+    def stats(self):
+        with self._cond:
+            return self._stats()
+
+class AsyncTelegramGovernor(_Buckets):
+    """
+    AsyncTeleBot ke liye wahi governor (wo CUSTOM_REQUEST_SENDER use nahi karta).
+    Ek hi event loop par chalta hai: token ka wait asyncio.sleep jaisa, koi thread block nahi hota.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cond = asyncio.Condition()
+
+    async def acquire(self, chat_id, priority):
+        async with self._cond:
+            ticket = (priority, next(self._seq))
+            self._waiters[ticket] = chat_id
+            try:
+                while True:
+                    chosen, sleep_for = self._next_ready(time.monotonic())
+                    if chosen == ticket:
+                        self._consume(chat_id)
+                        return
+                    if chosen is not None:
+                        self._cond.notify_all()
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), sleep_for if sleep_for is not None else 0.05)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                del self._waiters[ticket]
+                self._cond.notify_all()
+
+    async def call(self, method_name, chat_id, send, streams=()):
+        """
+        send() coroutine ko rate limit ke andar chalata hai; 429 aaye to retry_after tak chat rok ke dobara.
+        method_name Bot API wala naam hai (sendMessage), chat_id None ho sakta hai.
+        streams: call mein jaane wali files (BytesIO), har attempt se pehle shuru par laayi jaati hain.
+        """
+        if method_name in EXEMPT_METHODS:
+            return await send()
+        chat_id = str(chat_id) if chat_id is not None else None
+        priority = self._default_priority(method_name, chat_id)
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(chat_id, priority)
+            rewind(streams)
+            try:
+                result = await send()
+            except Exception as e:
+                retry_after = retry_after_of(e)
+                if retry_after is None or attempt == self.max_retries: raise
+                self.retried_429 += 1
+                print(f"⚠️ Flood control on {method_name} ({chat_id}), waiting {retry_after}s")
+                self._block_bucket(chat_id, retry_after)
+                continue
+            self.sent += 1
+            return result
+
+    def stats(self):
+        return self._stats()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules repo ki root par hain (package nahi), isliye root ko path mein daalo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = textwrap.dedent("""
+    import asyncio, gc, io, json, sys, threading
+    from types import SimpleNamespace
+    sys.path.insert(0, {root!r})
+    import async_main as am
+    from fake_backends import FakeTTS
+
+    out = {{
+        "main_imported": "main" in sys.modules or "flask" in sys.modules,
+        "runtime_threads": sorted(t.name for t in threading.enumerate() if t.name.startswith(("dispatch-", "timer-scheduler"))),
+    }}
+
+    message = SimpleNamespace(chat=SimpleNamespace(id=42))
+    out["chats"] = [
+        am.chat_of(am.bot.send_message, (5, "hi"), {{}}),
+        am.chat_of(am.bot.edit_message_text, ("t", 6, 1), {{}}),
+        am.chat_of(am.bot.edit_message_reply_markup, (), {{"chat_id": 8, "message_id": 1}}),
+        am.chat_of(am.bot.reply_to, (message, "hi"), {{}}),
+        am.chat_of(am.bot.get_file, ("file",), {{}}),
+    ]
+
+    async def main():
+        # later() ke tasks ka ref rehta hai jab tak wo chal rahe hain
+        fired = []
+        async def job(x): fired.append(x)
+        task = am.later(0.05, job, 1)
+        gc.collect()
+        alive = task in am.background_tasks
+        await asyncio.sleep(0.1)
+        out["later"] = [alive, fired, task in am.background_tasks]
+
+        # keep=True wali audio cache mein jaati hai, voice reply (keep=False) nahi
+        am.core.tts_service = FakeTTS(latency=0)
+        await am.speech_bytes("quiz sawal", keep=True)
+        await am.speech_bytes("voice jawab")
+        out["cached"] = [bool(am.core.get_cached_audio("quiz sawal")), bool(am.core.get_cached_audio("voice jawab"))]
+
+        # History summary kisi dusre thread se user ki lane mein
+        am.runtime.loop = asyncio.get_running_loop()
+        seen = []
+        threading.Thread(target=am.runtime.in_lane, args=(9, seen.append, "summary")).start()
+        await asyncio.sleep(0.1)
+        out["in_lane"] = seen
+
+        # 429 ke baad send_voice dobara poori file bhejta hai
+        class Flood(Exception):
+            result_json = {{"error_code": 429, "parameters": {{"retry_after": 0.01}}}}
+        uploads = []
+        async def send_voice(chat_id, voice):
+            uploads.append(voice.read().decode())
+            if len(uploads) == 1: raise Flood()
+        await am.tg(send_voice, 5, io.BytesIO(b"OggS"))
+        out["voice_uploads"] = uploads
+
+        # Same prompt ek saath: Gemini ki ek hi call (threaded ask_gemini jaisa)
+        prompts = []
+        async def generate_async(prompt, timeout, kind):
+            prompts.append(prompt)
+            await asyncio.sleep(0.05)
+            return "jawab"
+        am.core.model_router.generate_async = generate_async
+        replies = await asyncio.gather(*(am.ask_gemini("capital of france") for _ in range(5)))
+        out["coalesced"] = [replies, prompts]
+
+        # Session store: memory backend loop par, sqlite apne threads par
+        out["store_thread"] = await am.store(lambda: threading.current_thread().name)
+
+    asyncio.run(main())
+    print("RESULT " + json.dumps(out))
+""")
+
+def run_async_main(tmp_path, **env):
+    env = dict(os.environ, GEMINI_BACKEND="fake", TELEGRAM_BOT_TOKEN="123:abc", GOOGLE_API_KEY="x", LOG_CHANNEL_ID="", **env)
+    proc = subprocess.run([sys.executable, "-c", SCRIPT.format(root=ROOT)], cwd=tmp_path, env=env,
+                          capture_output=True, text=True, timeout=120)
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            result = json.loads(line[len("RESULT "):])
+    assert result is not None, proc.stderr
+    return result
+
+def test_async_runtime(tmp_path):
+    result = run_async_main(tmp_path)
+    assert result["main_imported"] is False
+    assert result["runtime_threads"] == []
+    assert result["chats"] == [5, 6, 8, 42, None]
+    assert result["later"] == [True, [1], False]
+    assert result["cached"] == [True, False]
+    assert result["in_lane"] == ["summary"]
+    assert result["voice_uploads"] == ["OggS", "OggS"]
+    assert result["coalesced"] == [["jawab"] * 5, ["capital of france"]]
+    assert result["store_thread"] == "MainThread"
+
+def test_sqlite_store_runs_off_the_loop(tmp_path):
+    result = run_async_main(tmp_path, SESSION_BACKEND="sqlite", SESSION_DB=str(tmp_path / "sessions.db"))
+    assert result["store_thread"].startswith("session-store")
@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_small_benchmark_run(tmp_path):
+    out = tmp_path / "report.json"
+    env = dict(os.environ, LOG_CHANNEL_ID="", PORT="")
+    proc = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "benchmark.py"), "--users", "4", "--actions", "1", "--gemini-latency", "0.02",
+         "--tts-latency", "0.01", "--tg-latency", "0.001", "--timeout", "30", "--json", str(out)],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=180,
+    )
+    assert proc.returncode == 0, proc.stderr
+    report = json.loads(out.read_text())
+    assert report["users"] == 4
+    assert report["updates"] > 0
+    assert all(v["timeouts"] == 0 for v in report["latency"].values())
+    assert report["dispatcher"]["dropped"] == 0
+
+def test_population_matches_user_count():
+    from benchmark import Benchmark, parse_args
+    for n in (1, 3, 4, 7, 50):
+        bench = Benchmark(parse_args(["--users", str(n), "--mix", "text=6,quiz=3,voice=1"]))
+        users = bench.population()
+        assert len(users) == n
+        assert len({u.user_id for u in users}) == n
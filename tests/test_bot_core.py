@@ -0,0 +1,211 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# bot_core import par files (reply.json, quiz bank, tts cache) banata hai, isliye alag process mein
+SCRIPT = textwrap.dedent("""
+    import asyncio, json, sys, threading
+    from types import SimpleNamespace
+    sys.path.insert(0, {root!r})
+    import bot_core as core
+
+    QUESTION = {{"q": "2+2?", "o": ["3", "4", "5", "6"], "a": 1, "exp": "Simple"}}
+
+    class Guarded:
+        # Session store sirf "store" Step ke andar chhua jaye (async mode mein wahi loop se bahar jaata hai)
+        inside = False
+        def __init__(self, inner): self.inner, self.direct = inner, []
+        def _use(self, name):
+            if not Guarded.inside: self.direct.append(name)
+        def get(self, *a): self._use("get"); return self.inner.get(*a)
+        def setdefault(self, *a): self._use("setdefault"); return self.inner.setdefault(*a)
+        def __setitem__(self, k, v): self._use("set"); self.inner[k] = v
+
+    sessions, users = core.quiz_sessions, core.user_data
+    core.quiz_sessions, core.user_data = Guarded(sessions), Guarded(users)
+
+    class FakeRuntime:
+        # Flow ke Steps note karta hai; fail wale Bot API methods exception dete hain
+        def __init__(self, fail=None):
+            self.ops, self.fail, self.sent, self.markdown = [], dict(fail or {{}}), 0, []
+
+        def api(self, method, *args, **kwargs):
+            self.ops.append(method)
+            if kwargs.get("parse_mode") == "Markdown":
+                self.markdown.append(args[0] if method == "edit_message_text" else args[1])
+            if self.fail.get(method):
+                self.fail[method] -= 1
+                raise RuntimeError(method)
+            if method == "send_message":
+                self.sent += 1
+                return SimpleNamespace(message_id=100 + self.sent)
+            if method == "get_file": return SimpleNamespace(file_path="voice.ogg")
+            if method == "download_file": return b"OggS"
+
+        def store(self, fn, *args):
+            Guarded.inside = True
+            try: return fn(*args)
+            finally: Guarded.inside = False
+
+        def work(self, fn, *args):
+            self.ops.append("work:" + fn.__name__)
+            return QUESTION if fn is core.fetch_quiz_question else fn(*args)
+
+        def generate(self, parts):
+            self.ops.append("generate")
+            raise RuntimeError("model down")
+
+        def speech(self, text, keep):
+            self.ops.append(f"speech:{{keep}}")
+            return None
+
+        def defer(self, user_id, delay, flow_fn, *args):
+            self.ops.append(f"defer:{{flow_fn.__name__}}:{{delay}}")
+            return "timer"
+
+        def cancel_timer(self, user_id):
+            self.ops.append("cancel_timer")
+            core.quiz_timers.pop(user_id)
+
+        def take_prefetched(self, user_id, tag):
+            self.ops.append("take_prefetched")
+
+        def prefetch(self, user_id, tag):
+            self.ops.append("prefetch")
+
+        def drop_prefetch(self, user_id):
+            self.ops.append("drop_prefetch")
+
+    class AsyncFake:
+        # Wahi runtime, har op coroutine ke roop mein
+        def __init__(self, rt): self.rt = rt
+        def __getattr__(self, name):
+            fn = getattr(self.rt, name)
+            async def call(*args, **kwargs): return fn(*args, **kwargs)
+            return call
+
+    def call(data, user=7):
+        return SimpleNamespace(id="cb", data=data, from_user=SimpleNamespace(id=user, first_name="A"),
+                               message=SimpleNamespace(chat=SimpleNamespace(id=user), message_id=50, text="hello"))
+
+    def quiz_run(rt, drive):
+        sessions[7] = {{"pending_topic": "GK", "pending_level": "Basic"}}
+        drive(rt, core.callback_flow(call("qtime_10")))
+        started = list(rt.ops)
+        rt.ops.clear()
+        drive(rt, core.callback_flow(call("qz_ans_1")))
+        answered = list(rt.ops)
+        s = sessions.get(7)
+        return started, answered, [s["score"], s["total"], s["msg_id"], core.quiz_timers.get(7)]
+
+    out = {{}}
+    out["no_runtime"] = {{
+        "modules": sorted(m for m in ("main", "flask", "dispatcher", "scheduler") if m in sys.modules),
+        "threads": sorted(t.name for t in threading.enumerate() if t.name.startswith(("dispatch-", "timer-scheduler"))),
+    }}
+    out["sync"] = quiz_run(FakeRuntime(), core.run_flow)
+    out["async"] = quiz_run(FakeRuntime(), lambda rt, flow: asyncio.run(core.run_flow_async(AsyncFake(rt), flow)))
+
+    # Timeout sirf usi sawal ke liye jo abhi dikh raha hai
+    rt = FakeRuntime()
+    core.run_flow(rt, core.quiz_timeout_flow(7, 7, 999))
+    stale = list(rt.ops)
+    core.run_flow(rt, core.quiz_timeout_flow(7, 7, sessions.get(7)["msg_id"]))
+    s = sessions.get(7)
+    out["timeout"] = {{"stale": stale, "wrong": s["wrong"], "total": s["total"], "ops": rt.ops[:2]}}
+
+    # parse_mode="Markdown" wale har text mein legacy Markdown, "**" nahi
+    sessions[8] = {{"pending_topic": "GK"}}
+    core.run_flow(rt, core.callback_flow(call("qlvl_Basic", user=8)))
+    out["raw_bold"] = [t for t in rt.markdown + [core.HELP_TEXT] if "**" in t]
+    out["markdown_sends"] = len(rt.markdown)
+
+    rt = FakeRuntime()
+    core.run_flow(rt, core.callback_flow(call("qz_speak")))
+    core.run_flow(rt, core.callback_flow(call("qz_stop")))
+    out["stop"] = {{"ops": rt.ops, "active": sessions.get(7)["active"]}}
+
+    # Markdown aur plain dono send fail: "Retrying" ke baad defer; woh bhi fail to quiz band
+    s["active"] = True
+    sessions[7] = s
+    rt = FakeRuntime(fail={{"send_message": 2}})
+    core.run_flow(rt, core.send_question_flow(7, 7))
+    retried = [op for op in rt.ops if op.startswith(("send_message", "defer"))]
+    rt = FakeRuntime(fail={{"send_message": 3}})
+    core.run_flow(rt, core.send_question_flow(7, 7))
+    out["send_fails"] = {{"retried": retried, "gave_up": rt.ops.count("send_message"),
+                         "active": sessions.get(7)["active"]}}
+
+    # Voice: model fail ho to error text, audio na bane to text reply
+    rt = FakeRuntime()
+    voice = SimpleNamespace(voice=SimpleNamespace(file_id="f", mime_type=None), audio=None, message_id=3,
+                            chat=SimpleNamespace(id=7), from_user=SimpleNamespace(id=7, first_name="A"))
+    core.run_flow(rt, core.voice_flow(voice))
+    out["voice"] = rt.ops
+    core.run_flow(FakeRuntime(), core.callback_flow(call("set_mode_coder")))
+    out["direct_store_access"] = core.quiz_sessions.direct + core.user_data.direct
+    out["voice_inline"] = core.voice_input(b"OggS", "audio/ogg")["mime_type"]
+    print("RESULT " + json.dumps(out))
+""")
+
+def run_script(tmp_path, script=SCRIPT):
+    env = dict(os.environ, GEMINI_BACKEND="fake", TELEGRAM_BOT_TOKEN="123:abc", GOOGLE_API_KEY="x", LOG_CHANNEL_ID="")
+    proc = subprocess.run([sys.executable, "-c", script.format(root=ROOT)], cwd=tmp_path, env=env,
+                          capture_output=True, text=True, timeout=120)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise AssertionError(proc.stderr)
+
+def test_shared_flows(tmp_path):
+    out = run_script(tmp_path)
+    assert out["no_runtime"] == {"modules": [], "threads": []}
+
+    started, answered, state = out["sync"]
+    assert started == ["edit_message_text", "take_prefetched", "send_chat_action", "work:fetch_quiz_question",
+                       "send_message", "cancel_timer", "defer:quiz_timeout_flow:10.0", "prefetch"]
+    assert answered[:2] == ["cancel_timer", "edit_message_text"]
+    assert answered[2:] == started[1:]
+    assert state == [1, 1, 102, "timer"]
+    # Dono drivers ek hi flow ko ek jaisa chalate hain
+    assert out["async"] == out["sync"]
+
+    assert out["timeout"] == {"stale": [], "wrong": 1, "total": 2, "ops": ["edit_message_text", "take_prefetched"]}
+    assert out["raw_bold"] == []
+    assert out["markdown_sends"] == 3        # Time Up, agla sawal, Select Timer
+    assert out["send_fails"] == {"retried": ["send_message", "send_message", "send_message", "defer:send_question_flow:2"],
+                                 "gave_up": 3, "active": False}
+    assert out["stop"]["ops"] == ["cancel_timer", "answer_callback_query", "speech:True",
+                                  "cancel_timer", "drop_prefetch", "edit_message_text"]
+    assert out["stop"]["active"] is False
+    assert out["voice"] == ["send_chat_action", "get_file", "download_file", "work:voice_input",
+                            "generate", "speech:False", "reply_to"]
+    assert out["voice_inline"] == "audio/ogg"
+    # Flows session store ko seedha nahi chhoote, sab "store" Step se
+    assert out["direct_store_access"] == []
+
+PLAN_SCRIPT = textwrap.dedent("""
+    import json, sys
+    sys.path.insert(0, {root!r})
+    import bot_core as core
+    config = core.get_user_config(5)
+    config['history'] = [{{'u': "who won in 2016", 'b': "..."}}]
+    core.user_data[5] = config
+    long_reply = "x" * 80     # 60 se lamba, JSON memory mein nahi jaata
+    out = {{}}
+    for text in ("thank you so much", "why?"):
+        first = core.plan_text_reply(5, text)
+        core.complete_text_reply(5, text, first, long_reply, lambda *a: None)
+        again = core.plan_text_reply(5, text)
+        out[text] = [first.decision.route, bool(first.context), again.source]
+    print("RESULT " + json.dumps(out))
+""")
+
+def test_cache_route_skips_context_and_model(tmp_path):
+    out = run_script(tmp_path, PLAN_SCRIPT)
+    # Greeting: bina context, doosri baar shared cache se; follow-up hamesha context ke saath model par
+    assert out == {"thank you so much": ["cache", False, "CACHE"], "why?": ["basic", True, "AI"]}
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from conversation import ConversationMemory, estimate_tokens
+from query_router import QueryRouter
+
+def test_history_is_trimmed_to_half_in_one_batch():
+    memory = ConversationMemory(max_turns=8, token_budget=10000)
+    config = {}
+    evictions = [memory.add_turn(config, f"q{i}", f"a{i}") for i in range(9)]
+    assert evictions[:8] == [[]] * 8
+    assert [t['u'] for t in evictions[8]] == ["q0", "q1", "q2", "q3", "q4"]
+    assert len(config['history']) == 4
+    # Agli kuch messages par koi summary nahi
+    assert [memory.add_turn(config, "x", "y") for _ in range(4)] == [[]] * 4
+
+def test_token_budget_keeps_latest_turn():
+    memory = ConversationMemory(max_turns=8, token_budget=100)
+    config = {}
+    memory.add_turn(config, "a" * 150, "b" * 150)
+    evicted = memory.add_turn(config, "c" * 150, "d" * 150)
+    assert evicted and config['history'][-1]['u'].startswith("c")
+    assert memory.history_tokens(config['history']) <= 100
+
+def test_one_summary_job_per_user_and_chaining():
+    calls = []
+    gate = threading.Event()
+
+    def summarize(old, text, budget):
+        calls.append((old, text))
+        gate.wait(1)
+        return f"{old}+{text.count('User:')}"
+
+    memory = ConversationMemory(summarize=summarize, max_workers=4)
+    applied = []
+    done = threading.Event()
+
+    def apply(summary):
+        applied.append(summary)
+        if len(applied) == 2: done.set()
+
+    turn = {'u': "q", 'b': "a"}
+    memory.summarize_async(1, "S", [turn], apply)
+    time.sleep(0.05)
+    memory.summarize_async(1, "S", [turn, turn], apply)   # pehli job chal rahi hai: jud jayega
+    memory.summarize_async(1, "S", [turn], apply)
+    gate.set()
+    assert done.wait(2)
+    # Doosri job pehli ke result se shuru hui, koi turn nahi khoya
+    assert calls == [("S", "User: q\nDev: a"), ("S+1", "\n".join(["User: q\nDev: a"] * 3))]
+    assert applied == ["S+1", "S+1+3"]
+    memory.summary_applied(1, "S+1")
+    assert memory.pending_jobs() == 1
+    memory.summary_applied(1, "S+1+3")
+    assert memory.pending_jobs() == 0
+
+def test_unapplied_summary_is_used_as_base():
+    memory = ConversationMemory(summarize=lambda old, text, budget: f"{old}|new")
+    done = threading.Event()
+    memory.summarize_async(1, "old", [{'u': "q", 'b': "a"}], lambda s: done.set())
+    assert done.wait(1)
+    time.sleep(0.01)
+    second = memory.summarize_async(1, "old", [{'u': "q", 'b': "a"}], lambda s: None)
+    assert second.result(1) == "old|new|new"
+
+def test_fallback_summary_without_model():
+    memory = ConversationMemory(summary_budget=10)
+    summary = memory.summarize_async(1, "", [{'u': "hello", 'b': "world"}], lambda s: None).result(1)
+    assert "world" in summary
+    assert estimate_tokens(summary) <= 11
+
+def test_needs_context():
+    memory = ConversationMemory()
+    empty, chatty = {}, {'history': [{'u': "q", 'b': "a"}]}
+    assert not memory.needs_context(empty, "basic")
+    assert memory.needs_context({'summary': "pehle baat hui"}, "basic")
+    # Greetings khud mein poore hain
+    assert not memory.needs_context(chatty, "cache")
+    assert memory.needs_context(chatty, "search")
+
+@pytest.mark.parametrize("text", ["why?", "how?", "explain", "and in 2020?", "kyon", "details do"])
+def test_follow_ups_get_context(text):
+    # Bina kisi keyword wale follow-up bhi pichli baat ke saath jaate hain
+    chatty = {'history': [{'u': "who won the 2016 election", 'b': "..."}]}
+    assert ConversationMemory().needs_context(chatty, QueryRouter().route(text).route)
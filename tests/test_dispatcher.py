@@ -0,0 +1,52 @@
+import threading
+import time
+
+from dispatcher import UpdateDispatcher
+from scheduler import TimerScheduler
+
+def wait_until(cond, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond(): return True
+        time.sleep(0.01)
+    return False
+
+def test_jobs_of_one_user_run_in_order():
+    seen = []
+    d = UpdateDispatcher(None, TimerScheduler(), num_workers=4)
+    for i in range(50):
+        d.submit("u1", lambda i=i: (time.sleep(0.001), seen.append(i)))
+    assert wait_until(lambda: len(seen) == 50)
+    assert seen == list(range(50))
+
+def test_full_queue_drops_new_jobs():
+    gate = threading.Event()
+    d = UpdateDispatcher(None, TimerScheduler(), num_workers=1, max_queue=2)
+    d.submit("busy", gate.wait)
+    assert wait_until(lambda: d.stats()["queued"] == 0)
+    assert d.submit("a", lambda: None)
+    assert d.submit("b", lambda: None)
+    assert not d.submit("c", lambda: None)
+    assert d.dropped == 1
+    gate.set()
+
+def test_deferred_job_is_not_dropped_when_full():
+    gate = threading.Event()
+    fired = threading.Event()
+    d = UpdateDispatcher(None, TimerScheduler(), num_workers=1, max_queue=1)
+    d.submit("busy", gate.wait)
+    assert wait_until(lambda: d.stats()["queued"] == 0)
+    d.submit("x", lambda: None)           # queue ab full hai
+    d.defer("quiz", 0.05, fired.set)
+    time.sleep(0.15)
+    assert d.dropped == 0
+    gate.set()
+    assert fired.wait(2)
+
+def test_deferred_job_can_be_cancelled():
+    fired = threading.Event()
+    d = UpdateDispatcher(None, TimerScheduler(), num_workers=1)
+    handle = d.defer("u", 0.05, fired.set)
+    handle.cancel()
+    assert not fired.wait(0.15)
+    assert d.stats()["pending_timers"] == 0
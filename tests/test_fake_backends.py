@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmark import fake_reply, percentile
+from fake_backends import FakeBotAPI, FakeModel, FakeModelError, FakeTTS
+
+URL = "https://api.telegram.org/bot123:abc/"
+
+def test_fake_model_text_stream_and_async():
+    model = FakeModel("m", latency=0, reply=lambda p: "one two three four five six")
+    assert model.generate_content("hi").text == "one two three four five six"
+    chunks = [c.text for c in model.generate_content(["hi", b"audio"], stream=True)]
+    assert "".join(chunks).split() == "one two three four five six".split()
+    assert asyncio.run(model.generate_content_async("hi")).text.startswith("one")
+    assert model.calls == 3
+
+def test_fake_model_failures():
+    model = FakeModel("m", latency=0, failure_rate=1.0)
+    with pytest.raises(FakeModelError):
+        model.generate_content("hi")
+
+def test_fake_tts():
+    tts = FakeTTS(latency=0)
+    assert tts.synthesize("namaste") == ("edge", b"OggSnamaste")
+    assert asyncio.run(tts.synthesize_async("x"))[1] == b"OggSx"
+
+def test_fake_bot_api_results_and_floods():
+    api = FakeBotAPI(latency=0, seed=1)
+    sent = api.request("post", URL + "sendMessage", params={"chat_id": 5, "text": "hi"}).json()["result"]
+    assert sent["chat"]["id"] == 5 and sent["text"] == "hi"
+    edited = api.request("post", URL + "editMessageText", params={"chat_id": 5, "message_id": sent["message_id"]})
+    assert edited.json()["result"]["message_id"] == sent["message_id"]
+    assert api.request("post", URL + "getMe").json()["result"]["is_bot"]
+
+    flood = FakeBotAPI(latency=0, flood_rate=1.0, retry_after=3, seed=1)
+    response = flood.request("post", URL + "sendMessage", params={"chat_id": 5})
+    assert response.status_code == 429
+    assert response.json()["parameters"]["retry_after"] == 3
+    assert flood.request("post", URL + "sendChatAction", params={"chat_id": 5}).status_code == 200
+    assert flood.stats()["floods"] == 1
+
+def test_fake_reply_builds_valid_quiz_batches():
+    items = json.loads(fake_reply("Create 4 different Basic level MCQ Questions about 'Space'."))
+    assert len(items) == 4
+    assert all(len(i["o"]) == 4 and 0 <= i["a"] < 4 for i in items)
+    assert not fake_reply("hello").startswith("[")
+
+def test_percentile():
+    assert percentile([], 50) is None
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(100)), 99) == 99
@@ -0,0 +1,70 @@
+import time
+
+from log_shipper import LogShipper, retry_after_of
+
+class FloodError(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Too Many Requests")
+        self.error_code = 429
+        self.result_json = {"error_code": 429, "parameters": {"retry_after": retry_after}}
+
+class FakeBot:
+    def __init__(self, floods=0):
+        self.sent = []
+        self.forwarded = []
+        self.floods = floods
+
+    def send_message(self, chat_id, text):
+        if self.floods:
+            self.floods -= 1
+            raise FloodError(0.01)
+        self.sent.append(text)
+
+    def forward_message(self, chat_id, from_chat_id, message_id):
+        self.forwarded.append((from_chat_id, message_id))
+
+def wait_until(cond, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond(): return True
+        time.sleep(0.01)
+    return False
+
+def test_retry_after_of():
+    assert retry_after_of(FloodError(7)) == 7.0
+    assert retry_after_of(ValueError("x")) is None
+
+def test_logs_in_one_window_are_batched():
+    bot = FakeBot()
+    shipper = LogShipper(bot, -100, window=0.2, min_interval=0)
+    for i in range(5):
+        shipper.log(f"log {i}")
+    assert wait_until(lambda: shipper.sent == 5)
+    assert len(bot.sent) == 1
+    assert bot.sent[0].count(LogShipper.SEPARATOR) == 4
+
+def test_forward_and_flood_retry():
+    bot = FakeBot(floods=2)
+    shipper = LogShipper(bot, -100, window=0.01, min_interval=0)
+    shipper.forward(1, 2)
+    shipper.log("after flood")
+    assert wait_until(lambda: shipper.sent == 2)
+    assert bot.forwarded == [(1, 2)]
+    assert bot.sent == ["after flood"]
+    assert shipper.failed == 0
+
+def test_no_own_retry_behind_governor():
+    # Governor ne 429 ke retry kar liye, phir bhi fail hua to shipper dobara nahi bhejta
+    bot = FakeBot(floods=1)
+    shipper = LogShipper(bot, -100, window=0, min_interval=0, max_retries=0)
+    shipper.log("flooded")
+    shipper.log("next")
+    assert wait_until(lambda: shipper.failed == 1 and shipper.sent == 1)
+    assert bot.sent == ["next"]
+
+def test_full_queue_drops_logs():
+    bot = FakeBot()
+    shipper = LogShipper(bot, -100, max_queue=1, window=0.5, min_interval=1)
+    for i in range(20):
+        shipper.log("x")
+    assert shipper.dropped > 0
@@ -0,0 +1,36 @@
+from markdown_format import format_markdown, strip_markdown
+
+
+def test_converts_standard_markdown():
+    text = "# Title\n**bold** and __italic__\n- one\n* two"
+    assert format_markdown(text) == "*Title*\n*bold* and _italic_\n• one\n• two"
+
+
+def test_balanced_entities_kept():
+    assert format_markdown("*a* _b_ `c` [d](https://x.org)") == "*a* _b_ `c` [d](https://x.org)"
+
+
+def test_unbalanced_markers_escaped():
+    assert format_markdown("2 * 3 = 6") == "2 \\* 3 = 6"
+    assert format_markdown("price `5") == "price \\`5"
+    assert format_markdown("see [note") == "see \\[note"
+
+
+def test_snake_case_not_italic():
+    assert format_markdown("use my_var_name here") == "use my\\_var\\_name here"
+
+
+def test_code_block_untouched_and_closed():
+    text = "```\n**x** my_var\n```"
+    assert format_markdown(text) == text
+    assert format_markdown("```\nprint(1)\n") == "```\nprint(1)\n```"
+
+
+def test_non_http_links_escaped():
+    assert format_markdown("[x](javascript:alert)") == "\\[x](javascript:alert)"
+
+
+def test_empty_and_strip():
+    assert format_markdown("") == ""
+    assert strip_markdown(None) == ""
+    assert strip_markdown("*a* \\_b\\_ `c`") == "a b c"
@@ -0,0 +1,71 @@
+import pytest
+
+from metrics import MetricsRegistry
+
+
+def test_counter_and_gauge_render():
+    reg = MetricsRegistry()
+    hits = reg.counter("bot_hits_total", "Cache hits", ("route",))
+    depth = reg.gauge("bot_queue_depth", "Queue depth")
+    hits.inc(route="search")
+    hits.inc(2, route="search")
+    hits.inc(route="chat")
+    depth.set(7)
+    depth.set(3)
+    text = reg.render()
+    assert "# HELP bot_hits_total Cache hits\n# TYPE bot_hits_total counter\n" in text
+    assert 'bot_hits_total{route="search"} 3\n' in text
+    assert 'bot_hits_total{route="chat"} 1\n' in text
+    assert "# TYPE bot_queue_depth gauge\nbot_queue_depth 3\n" in text
+    assert text.endswith("\n")
+
+
+def test_labels_must_match_labelnames():
+    reg = MetricsRegistry()
+    hits = reg.counter("bot_hits_total", "Cache hits", ("route",))
+    with pytest.raises(ValueError):
+        hits.inc()
+    with pytest.raises(ValueError):
+        hits.inc(route="a", extra="b")
+
+
+def test_label_values_are_escaped():
+    reg = MetricsRegistry()
+    reg.counter("c", "h", ("q",)).inc(q='a"b\\c\nd')
+    assert 'c{q="a\\"b\\\\c\\nd"} 1' in reg.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = MetricsRegistry()
+    lat = reg.histogram("lat_seconds", "Latency", ("stage",), buckets=(0.1, 1))
+    for v in (0.05, 0.1, 0.5, 5):
+        lat.observe(v, stage="llm")
+    lines = reg.render().splitlines()
+    assert 'lat_seconds_bucket{stage="llm",le="0.1"} 2' in lines
+    assert 'lat_seconds_bucket{stage="llm",le="1"} 3' in lines
+    assert 'lat_seconds_bucket{stage="llm",le="+Inf"} 4' in lines
+    assert 'lat_seconds_sum{stage="llm"} 5.65' in lines
+    assert 'lat_seconds_count{stage="llm"} 4' in lines
+
+
+def test_histogram_time_observes_on_error():
+    reg = MetricsRegistry()
+    lat = reg.histogram("t", "h")
+    with pytest.raises(RuntimeError):
+        with lat.time():
+            raise RuntimeError("boom")
+    assert "t_count 1" in reg.render().splitlines()
+
+
+def test_collectors_and_failing_collector(capsys):
+    reg = MetricsRegistry()
+    reg.collector("cache_entries", "gauge", "Entries", lambda: 12)
+    reg.collector("broken", "gauge", "Broken", lambda: 1 / 0)
+    reg.collector("routes_total", "counter", "Routes",
+                  lambda: {(("route", "search"),): 5, (("route", "chat"),): None})
+    text = reg.render()
+    assert "cache_entries 12\n" in text
+    assert "broken" not in text
+    assert 'routes_total{route="search"} 5\n' in text
+    assert "chat" not in text
+    assert "Metrics Collector Error (broken)" in capsys.readouterr().out
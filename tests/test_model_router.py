@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+import pytest
+
+from fake_backends import FakeModel, FakeModelError
+from model_router import CircuitBreaker, ModelRouter
+
+def breaker():
+    return CircuitBreaker(failure_threshold=2, cooldown=0.1)
+
+def make_router(primary, backup, **kwargs):
+    kwargs.setdefault("default_hedge_delay", 5)
+    return ModelRouter([("primary", primary), ("backup", backup)], breaker_factory=breaker, **kwargs)
+
+def test_breaker_states():
+    b = breaker()
+    b.record(False, 1.0, 1, now=0)
+    b.record(False, 1.0, 2, now=0)
+    assert b.state == "open"
+    assert not b.available(0.05)
+    assert b.available(0.2)
+    assert b.state == "open"          # available() state nahi badalta
+    assert b.allow(0.2)
+    assert b.state == "half_open"
+    assert not b.available(0.2)
+    assert not b.allow(0.2)           # probe pehle se chal raha hai
+    b.release()
+    assert b.allow(0.2)
+    b.record(True, 0.0, 3, now=0.3)
+    assert b.state == "closed"
+
+def test_fallback_on_primary_error():
+    router = make_router(FakeModel("p", latency=0, failure_rate=1.0), FakeModel("b", latency=0))
+    assert router.generate("hi").startswith("[b]")
+
+def test_hedge_when_primary_is_slow():
+    router = make_router(FakeModel("p", latency=1.0), FakeModel("b", latency=0), default_hedge_delay=0.05)
+    t0 = time.monotonic()
+    assert router.generate("hi").startswith("[b]")
+    assert time.monotonic() - t0 < 0.5
+    assert router.hedges == 1
+    assert router.hedge_wins == 1
+
+def test_half_open_backup_recovers_after_listing():
+    primary = FakeModel("p", latency=0)
+    backup = FakeModel("b", latency=0, failure_rate=1.0)
+    router = make_router(primary, backup)
+    # Backup ka breaker kholo
+    router._record("backup", "chat", False, 0.1)
+    router._record("backup", "chat", False, 0.1)
+    assert router.stats()["backup"]["breaker"] == "open"
+    time.sleep(0.15)
+    # Primary theek hai: in calls mein backup launch hi nahi hota, to uska probe slot bhi nahi lagna chahiye
+    for _ in range(5):
+        assert router.generate("hi").startswith("[p]")
+    backup.failure_rate = 0.0
+    primary.failure_rate = 1.0
+    assert router.generate("hi").startswith("[b]")
+    assert router.stats()["backup"]["breaker"] == "closed"
+
+def test_all_open_still_tries_first_model():
+    router = make_router(FakeModel("p", latency=0, failure_rate=1.0), FakeModel("b", latency=0, failure_rate=1.0))
+    for _ in range(2):
+        with pytest.raises(FakeModelError):
+            router.generate("hi")
+    assert router._available() == []
+    with pytest.raises(FakeModelError):
+        router.generate("hi")
+    assert router.stats()["primary"]["calls"] == 3
+
+def test_cancelled_async_probe_releases_slot():
+    primary = FakeModel("p", latency=0.01)
+    backup = FakeModel("b", latency=1.0)
+    router = make_router(primary, backup, default_hedge_delay=0.01)
+    router._record("backup", "chat", False, 0.1)
+    router._record("backup", "chat", False, 0.1)
+    time.sleep(0.15)
+
+    async def go():
+        primary.latency = 0.2       # primary slow: backup probe hedge mein chalega, phir haar ke cancel
+        backup.latency = 1.0
+        return await router.generate_async("hi", timeout=5)
+
+    assert asyncio.run(go()).startswith("[p]")
+    assert router.hedges == 1
+    assert router._breakers["backup"].available(time.monotonic())
+
+def test_hedge_delay_is_per_call_kind():
+    router = make_router(FakeModel("p"), FakeModel("b"), min_samples=3, min_hedge_delay=0.01)
+    for _ in range(3):
+        router._record("primary", "chat", True, 0.5)
+        router._record("primary", "quiz", True, 8.0)
+    # Lambe quiz batch calls chat ka delay nahi badhate, aur chat wala delay quiz par nahi lagta
+    assert router._hedge_delay("primary", "chat") == 0.5
+    assert router._hedge_delay("primary", "quiz") == 8.0
+    assert router._hedge_delay("primary", "voice") == 5
+    assert router.stats()["primary"]["latency"] == {"chat": {"p50": 0.5, "p95": 0.5}, "quiz": {"p50": 8.0, "p95": 8.0}}
+
+def test_no_hedge_for_background_calls():
+    router = make_router(FakeModel("p", latency=0.2), FakeModel("b", latency=0), default_hedge_delay=0.01)
+    assert router.generate("hi", kind="summary", hedge=False).startswith("[p]")
+    assert router.hedges == 0
+    # Fail hone par fallback phir bhi
+    router._candidates[0][1].failure_rate = 1.0
+    assert router.generate("hi", kind="summary", hedge=False).startswith("[b]")
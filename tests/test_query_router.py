@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from query_router import DEFAULT_RULES, QueryRouter, load_rules
+
+@pytest.mark.parametrize("text, route, tier", [
+    ("aaj ka mausam kaisa hai", "search", 0),
+    ("hello bhai kaise ho", "cache", 1),
+    ("who is the pm", "search", 2),
+    ("the whole thing", "basic", -1),          # "who" sirf poore word par
+    ("Kaise   ho", "cache", 1),
+    ("hi, latest news batao", "search", 0),    # chhota tier jeet-ta hai
+    ("hi, who won the election", "search", 0),
+    ("", "basic", -1),
+])
+def test_routes(text, route, tier):
+    decision = QueryRouter().route(text)
+    assert (decision.route, decision.tier) == (route, tier)
+
+def test_trace_and_counts():
+    router = QueryRouter()
+    decision = router.route("hello, who are you")
+    assert decision.trace() == "route=cache tier=1 matched=[hello@1, who@2]"
+    router.route("random words")
+    assert router.stats() == {"cache@1": 1, "basic@-1": 1}
+
+def test_all_matches_kept_after_tier_zero():
+    # Tier 0 mil jaane ke baad bhi baaki matches trace mein
+    decision = QueryRouter().route("news: who won, hi")
+    assert decision.matched == [("news", 0), ("who", 2), ("hi", 1)]
+    assert decision.route == "search"
+
+def test_load_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([["search", ["cricket"]]]))
+    router = QueryRouter(load_rules(str(path)))
+    assert router.route("cricket update").route == "search"
+    assert router.route("news").route == "basic"
+    assert load_rules(str(tmp_path / "missing.json")) is DEFAULT_RULES
+    path.write_text("{broken")
+    assert load_rules(str(path)) is DEFAULT_RULES
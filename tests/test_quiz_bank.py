@@ -0,0 +1,70 @@
+import threading
+import time
+
+import quiz_bank as quiz_bank_module
+from quiz_bank import QuestionBank, validate_question
+
+def mcq(i):
+    return {"q": f"Question number {i} about planet {i * 7}?", "o": ["a", "b", "c", "d"], "a": i % 4, "exp": "x"}
+
+def make_bank(tmp_path, **kwargs):
+    calls = []
+
+    def generate(level, topic, n):
+        start = len(calls) * n
+        calls.append((level, topic, n))
+        return [mcq(start + i) for i in range(n)]
+
+    bank = QuestionBank(str(tmp_path / "bank.json"), generate, batch_size=5, low_water=0, **kwargs)
+    return bank, calls
+
+def test_validate_question():
+    assert validate_question(mcq(1))["a"] == 1
+    assert validate_question(dict(mcq(1), a="2"))["a"] == 2
+    assert validate_question(dict(mcq(1), a=4)) is None
+    assert validate_question(dict(mcq(1), o=["a", "b"])) is None
+    assert validate_question("nope") is None
+
+def test_users_get_unseen_questions_from_one_batch(tmp_path):
+    bank, calls = make_bank(tmp_path)
+    first = [bank.next_question(1, "Space", "Basic")["id"] for _ in range(5)]
+    assert len(set(first)) == 5
+    assert len(calls) == 1
+    # Dusra user usi batch se shuru karta hai
+    assert bank.next_question(2, "space", "basic")["id"] == first[0]
+    assert len(calls) == 1
+
+def test_bank_survives_restart(tmp_path):
+    bank, _ = make_bank(tmp_path)
+    bank.next_question(1, "Space", "Basic")
+    again, calls = make_bank(tmp_path)
+    assert again.stats()["questions"] == 5
+    again.next_question(1, "Space", "Basic")
+    assert calls == []
+
+def test_forget_user_and_seen_cap(tmp_path):
+    bank, _ = make_bank(tmp_path, max_users=3)
+    for user in range(10):
+        bank.next_question(user, "Space", "Basic")
+    assert bank.stats()["tracked_users"] == 3
+    bank.forget_user(9)
+    assert bank.stats()["tracked_users"] == 2
+
+def test_saves_are_serialized(tmp_path, monkeypatch):
+    bank, _ = make_bank(tmp_path)
+    writes = []
+    first = threading.Event()
+
+    def slow_write(path, data):
+        if not first.is_set():
+            first.set()
+            time.sleep(0.2)
+        writes.append(sum(len(v) for v in data.values()))
+
+    monkeypatch.setattr(quiz_bank_module, "atomic_write_json", slow_write)
+    t = threading.Thread(target=bank._refill, args=("basic|space", "Space", "Basic"))
+    t.start()
+    first.wait(1)
+    bank._refill("basic|space", "Space", "Basic")
+    t.join()
+    assert writes[-1] == max(writes)
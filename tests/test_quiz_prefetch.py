@@ -0,0 +1,39 @@
+import threading
+import time
+
+from quiz_prefetch import QuizPrefetcher
+
+def test_take_returns_prefetched_question():
+    p = QuizPrefetcher()
+    p.start(1, ("Basic", "Space"), lambda: {"q": "next"})
+    assert p.take(1, ("Basic", "Space"), timeout=1) == {"q": "next"}
+    assert p.hits == 1
+    # Ek baar liya hua sawal dobara nahi milta
+    assert p.take(1, ("Basic", "Space"), timeout=1) is None
+
+def test_tag_mismatch_is_a_miss():
+    p = QuizPrefetcher()
+    p.start(1, ("Basic", "Space"), lambda: {"q": "next"})
+    assert p.take(1, ("Expert", "Space"), timeout=1) is None
+    assert p.misses == 1
+
+def test_failed_prefetch_returns_none():
+    p = QuizPrefetcher()
+
+    def boom():
+        raise RuntimeError("gemini down")
+
+    p.start(1, "t", boom)
+    assert p.take(1, "t", timeout=1) is None
+
+def test_drop_discards_pending_question():
+    p = QuizPrefetcher(max_workers=1)
+    gate = threading.Event()
+    p.start(1, "t", gate.wait, 1)
+    ran = []
+    p.start(2, "t", ran.append, "queued")
+    p.drop(2)               # abhi queue mein tha, ab chalega hi nahi
+    gate.set()
+    time.sleep(0.05)
+    assert ran == []
+    assert p.take(2, "t") is None
@@ -0,0 +1,71 @@
+import pytest
+
+from reply_matcher import ReplyIndex, normalize, is_spelling_variant, tokens_compatible
+
+SAVED = ["2+2", "kya tum theek ho", "capital of india", "pm", "5 ka table", "class 9", "raj kaun hai",
+         "raj", "kaise ho", "tumhara naam kya hai", "lumding pin code"]
+
+@pytest.fixture
+def index():
+    idx = ReplyIndex(threshold=0.75)
+    for key in SAVED:
+        idx.add(key)
+    return idx
+
+def test_normalize_keeps_operators_and_decimals():
+    assert normalize("What is 2*2?") == "what is 2 * 2"
+    assert normalize("2-2") == "2 - 2"
+    assert normalize("2.5+3") == "2.5 + 3"
+    assert normalize("Kese ho bhai!!!") == "kaise ho"
+
+@pytest.mark.parametrize("query", [
+    "what is 2*2", "2-2", "2+3",
+    "kya tum theek nahi ho",
+    "capital of indiana",
+    "cm",
+    "6 ka table",
+    "class 10",
+    "ravi",
+])
+def test_no_wrong_answer(index, query):
+    assert index.lookup(query) is None
+
+@pytest.mark.parametrize("query, expected", [
+    ("2 + 2", "2+2"),
+    ("Kya tum thik ho?", "kya tum theek ho"),
+    ("kaisee ho yaar", "kaise ho"),
+    ("tumhara naam kya", "tumhara naam kya hai"),
+    ("lumding pincode", None),
+    ("lumdingg pin code", "lumding pin code"),
+])
+def test_spelling_variants_still_match(index, query, expected):
+    assert index.lookup(query) == expected
+
+def test_english_words_not_mapped_to_hinglish():
+    assert normalize("Tell me about him") == "tell me about him"
+    assert normalize("is he thick") == "is he thick"
+    idx = ReplyIndex(threshold=0.75)
+    for key in ("mai theek hoon", "main"):
+        idx.add(key)
+    # "me"/"thick" pehle "main"/"theek" ban kar in jawabon se mil jaate the
+    assert idx.lookup("me thick") is None
+    assert idx.lookup("me") is None
+    assert idx.lookup("mein") == "main"
+
+def test_spelling_variant_rules():
+    assert is_spelling_variant("kaisee", "kaise")
+    assert not is_spelling_variant("cm", "pm")
+    assert not is_spelling_variant("ravi", "raj")
+    assert not is_spelling_variant("indiana", "india")
+    assert not is_spelling_variant("10", "9")
+    assert not is_spelling_variant("nahi", "nah")
+
+def test_tokens_compatible_requires_same_content():
+    assert tokens_compatible("kya tum theek ho", "kya tum theek")
+    assert not tokens_compatible("kya tum theek nahi ho", "kya tum theek ho")
+    assert not tokens_compatible("what is 2 * 2", "2 + 2")
+
+def test_remove(index):
+    index.remove("kaise ho")
+    assert index.lookup("kaise ho") is None
+    assert len(index) == len(SAVED) - 1
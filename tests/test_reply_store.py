@@ -0,0 +1,79 @@
+import json
+import os
+import stat
+import threading
+import time
+
+import reply_store
+from reply_store import ReplyStore, atomic_write_json
+
+def make_store(tmp_path, data=None, **kwargs):
+    path = tmp_path / "reply.json"
+    if data is not None:
+        path.write_text(json.dumps(data), encoding="utf-8")
+    return ReplyStore(str(path), **kwargs), path
+
+def test_get_set_and_flush(tmp_path):
+    store, path = make_store(tmp_path, {"hello": "hi"}, flush_interval=60)
+    try:
+        assert store.get("  HELLO ") == "hi"
+        store.set("Bye", "tata")
+        store.flush()
+        assert json.loads(path.read_text(encoding="utf-8")) == {"hello": "hi", "bye": "tata"}
+    finally:
+        store.close()
+
+def test_close_writes_pending_changes(tmp_path):
+    store, path = make_store(tmp_path, flush_interval=60)
+    store.set("a", "1")
+    store.close()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": "1"}
+
+def test_writer_batches_changes_until_deadline(tmp_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr(reply_store, "atomic_write_json", lambda path, data: writes.append(dict(data)))
+    store, _ = make_store(tmp_path, flush_interval=0.4)
+    try:
+        # Har set notify karta hai; isse writer ka intezaar chhota nahi hona chahiye
+        for i in range(6):
+            store.set(f"q{i}", str(i))
+            time.sleep(0.03)
+        assert writes == []
+        time.sleep(0.6)
+        assert len(writes) == 1
+        assert len(writes[0]) == 6
+    finally:
+        store.close()
+
+def test_concurrent_flush_never_writes_stale_snapshot(tmp_path, monkeypatch):
+    writes = []
+    first = threading.Event()
+
+    def slow_write(path, data):
+        if not first.is_set():
+            first.set()
+            time.sleep(0.2)    # pehla writer purana snapshot lekar atak gaya
+        writes.append(dict(data))
+
+    monkeypatch.setattr(reply_store, "atomic_write_json", slow_write)
+    store, _ = make_store(tmp_path, flush_interval=60)
+    try:
+        store.set("k", "old")
+        t = threading.Thread(target=store.flush)
+        t.start()
+        first.wait(1)
+        store.set("k", "new")
+        store.flush()
+        t.join()
+        assert writes[-1] == {"k": "new"}
+    finally:
+        store.close()
+
+def test_atomic_write_keeps_file_mode(tmp_path):
+    path = tmp_path / "reply.json"
+    path.write_text("{}", encoding="utf-8")
+    os.chmod(path, 0o640)
+    atomic_write_json(str(path), {"a": 1})
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+    assert json.loads(path.read_text(encoding="utf-8")) == {"a": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["reply.json"]
@@ -0,0 +1,43 @@
+import time
+
+from response_cache import ResponseCache, cache_text, is_time_sensitive
+
+def test_hit_miss_and_expiry():
+    cache = ResponseCache()
+    cache.set("k", "v", ttl=0.05)
+    assert cache.get("k") == "v"
+    time.sleep(0.06)
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_lru_eviction_by_entries():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1", ttl=60)
+    cache.set("b", "2", ttl=60)
+    cache.get("a")                  # a ab recently used hai
+    cache.set("c", "3", ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+def test_byte_limit():
+    cache = ResponseCache(max_bytes=2000)
+    cache.set("big", "x" * 5000, ttl=60)
+    assert cache.get("big") is None
+    for i in range(10):
+        cache.set(i, "y" * 300, ttl=60)
+    assert cache.stats()["bytes"] <= 2000
+
+def test_cache_text_folds_only_case_and_spaces():
+    assert cache_text("  Kaise   HO ") == "kaise ho"
+    assert cache_text("2+2") != cache_text("2-2")
+    assert cache_text("2*2") != cache_text("2 2")
+    assert cache_text("theek ho?") != cache_text("theek ho")
+
+def test_time_sensitive_queries():
+    assert is_time_sensitive("aaj kya date hai")
+    assert is_time_sensitive("What time is it now")
+    assert is_time_sensitive("kal ka mausam")
+    assert not is_time_sensitive("capital of india")
+    assert not is_time_sensitive("2+2")
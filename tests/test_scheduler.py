@@ -0,0 +1,67 @@
+import threading
+import time
+
+from scheduler import TimerScheduler
+
+def test_timers_fire_in_deadline_order():
+    s = TimerScheduler()
+    seen = []
+    done = threading.Event()
+    s.schedule(0.08, lambda: (seen.append("c"), done.set()))
+    s.schedule(0.02, seen.append, "a")
+    s.schedule(0.05, seen.append, "b")
+    assert done.wait(2)
+    assert seen == ["a", "b", "c"]
+    assert s.fired == 3
+    assert s.pending() == 0
+
+def test_cancel_is_idempotent_and_counted_once():
+    s = TimerScheduler()
+    fired = threading.Event()
+    h = s.schedule(0.05, fired.set)
+    assert s.pending() == 1
+    h.cancel()
+    h.cancel()
+    assert s.pending() == 0
+    assert not fired.wait(0.1)
+
+def test_cancel_after_fire_does_not_skew_pending():
+    s = TimerScheduler()
+    fired = threading.Event()
+    h = s.schedule(0, fired.set)
+    assert fired.wait(1)
+    h.cancel()
+    assert s.pending() == 0
+
+def test_concurrent_cancel_and_fire():
+    s = TimerScheduler()
+    handles = [s.schedule(0.001 * (i % 5), lambda: None) for i in range(500)]
+    threads = [threading.Thread(target=lambda hs=handles[i::4]: [h.cancel() for h in hs]) for i in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    time.sleep(0.05)
+    assert s.pending() == 0
+    assert s.fired <= 500
+
+def test_earlier_timer_wakes_sleeping_thread():
+    s = TimerScheduler()
+    s.schedule(5, lambda: None)
+    fired = threading.Event()
+    time.sleep(0.02)    # thread ab 5s wale timer par so raha hai
+    s.schedule(0.02, fired.set)
+    assert fired.wait(1)
+
+def test_failing_callback_does_not_stop_scheduler(capsys):
+    s = TimerScheduler()
+    fired = threading.Event()
+    s.schedule(0, lambda: 1 / 0)
+    s.schedule(0.02, fired.set)
+    assert fired.wait(1)
+    assert "Timer Error" in capsys.readouterr().out
+
+def test_many_cancels_compact_the_heap():
+    s = TimerScheduler()
+    handles = [s.schedule(60, lambda: None) for _ in range(200)]
+    for h in handles[:150]: h.cancel()
+    assert s.pending() == 50
+    assert len(s._heap) < 200
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from session_store import SessionStore, MemorySessionStore, SQLiteSessionStore, open_session_store
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return open_session_store("test", request.param, str(tmp_path / "sessions.db"), idle_ttl=60)
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        SessionStore()
+
+def test_dict_interface(store):
+    store[1] = {"mode": "friend"}
+    assert store[1] == {"mode": "friend"}
+    assert 1 in store
+    assert len(store) == 1
+    assert store.pop(1) == {"mode": "friend"}
+    assert store.pop(1, "gone") == "gone"
+    assert 1 not in store
+    with pytest.raises(KeyError):
+        store[1]
+
+def test_setdefault_keeps_existing(store):
+    assert store.setdefault("u", {"n": 1}) == {"n": 1}
+    assert store.setdefault("u", {"n": 2}) == {"n": 1}
+
+def test_concurrent_setdefault_has_one_winner(store):
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker(i):
+        barrier.wait()
+        results.append(store.setdefault("race", {"owner": i}))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len({r["owner"] for r in results}) == 1
+    assert store["race"] == results[0]
+
+def test_concurrent_pop_returns_value_once(store):
+    store["k"] = "v"
+    results = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        results.append(store.pop("k"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert results.count("v") == 1
+
+def test_len_skips_expired_entries(tmp_path):
+    for store in (MemorySessionStore(idle_ttl=0.05), SQLiteSessionStore(str(tmp_path / "s.db"), "x", idle_ttl=0.05)):
+        store["a"] = 1
+        store["b"] = 2
+        assert len(store) == 2
+        time.sleep(0.1)
+        store["c"] = 3
+        assert len(store) == 1
+        assert store.get("a") is None
+
+def test_memory_store_max_entries():
+    store = MemorySessionStore(max_entries=4, shards=1)
+    for i in range(10):
+        store[i] = i
+    assert len(store) == 4
+    assert store.get(0) is None
+    assert store.get(9) == 9
+
+def test_sqlite_store_survives_reopen(tmp_path):
+    path = str(tmp_path / "s.db")
+    SQLiteSessionStore(path, "user")["1"] = {"memory": True}
+    again = SQLiteSessionStore(path, "user")
+    assert again.get("1") == {"memory": True}
+    assert SQLiteSessionStore(path, "quiz").get("1") is None
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import pytest
+
+from singleflight import AsyncSingleFlight, SingleFlight
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight(max_workers=4)
+    calls = []
+    gate = threading.Event()
+
+    def slow(x):
+        calls.append(x)
+        gate.wait(1)
+        return x * 2
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flight.do, "k", slow, 21, timeout=2) for _ in range(8)]
+        time.sleep(0.1)
+        gate.set()
+        results = [f.result() for f in futures]
+    assert results == [42] * 8
+    assert calls == [21]
+    assert flight.calls == 1
+    assert flight.shared == 7
+    assert flight.pending() == 0
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+
+    def boom():
+        time.sleep(0.05)
+        raise ValueError("nope")
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(flight.do, "k", boom, timeout=2) for _ in range(3)]
+        for f in futures:
+            with pytest.raises(ValueError):
+                f.result()
+
+def test_fast_function_does_not_deadlock():
+    # Future lock pakadte hi done ho sakta hai; callback lock ke bahar chalna chahiye
+    flight = SingleFlight(max_workers=2)
+    for i in range(200):
+        assert flight.do(i, lambda v=i: v, timeout=2) == i
+    assert flight.pending() == 0
+
+def test_caller_timeout_is_independent():
+    flight = SingleFlight()
+    gate = threading.Event()
+    with pytest.raises(TimeoutError):
+        flight.do("k", gate.wait, 1, timeout=0.05)
+    # Call abhi bhi chal raha hai; naya caller usi ko share karta hai
+    future = flight.submit("k", gate.wait, 1)
+    assert flight.shared == 1
+    gate.set()
+    assert future.result(timeout=1) is True
+
+def test_new_call_after_completion():
+    flight = SingleFlight()
+    assert flight.do("k", lambda: 1) == 1
+    time.sleep(0.01)
+    assert flight.do("k", lambda: 2) == 2
+    assert flight.calls == 2
+
+def test_async_callers_share_one_task():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow(x):
+        calls.append(x)
+        await asyncio.sleep(0.05)
+        return x * 2
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("k", slow, 21) for _ in range(8)))
+        return results, flight.pending()
+
+    assert asyncio.run(run()) == ([42] * 8, 0)
+    assert calls == [21]
+    assert (flight.calls, flight.shared) == (1, 7)
+
+def test_async_cancelled_caller_does_not_cancel_others():
+    flight = AsyncSingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", slow))
+        second = asyncio.ensure_future(flight.do("k", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "ok"
+
+def test_async_error_reaches_every_waiter():
+    flight = AsyncSingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("nope")
+
+    async def run():
+        return await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+
+    assert [type(e) for e in asyncio.run(run())] == [ValueError] * 3
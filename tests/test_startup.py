@@ -0,0 +1,41 @@
+import json
+import sys
+import time
+
+from startup import LazyModule, LazyObject, ModelSelectionCache, StartupReport
+
+def test_lazy_module_imports_on_first_use():
+    sys.modules.pop("colorsys", None)
+    report = StartupReport()
+    calls = []
+    mod = LazyModule("colorsys", report=report, setup=calls.append)
+    assert "colorsys" not in sys.modules
+    assert mod.rgb_to_hsv(1, 0, 0)[0] == 0
+    assert mod.rgb_to_hsv(0, 1, 0)
+    assert len(calls) == 1
+    assert report.steps[0][0] == "lazy import colorsys"
+
+def test_lazy_object_builds_once():
+    built = []
+    obj = LazyObject(lambda: built.append(1) or "value", name="thing")
+    assert obj.upper() == "VALUE"
+    assert obj.lower() == "value"
+    assert built == [1]
+
+def test_report_summary():
+    report = StartupReport()
+    with report.timed("step"):
+        pass
+    assert "step:" in report.summary()
+    assert "total (since start)" in report.summary()
+
+def test_model_selection_cache(tmp_path):
+    path = tmp_path / "model.json"
+    cache = ModelSelectionCache(str(path), ttl=60)
+    assert cache.load() is None
+    cache.save("models/gemini-2.5-flash")
+    assert cache.load() == "models/gemini-2.5-flash"
+    path.write_text(json.dumps({"model": "old", "saved_at": time.time() - 120}))
+    assert cache.load() is None
+    path.write_text("not json")
+    assert cache.load() is None
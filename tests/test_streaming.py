@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+from streaming import StreamingReply, is_markdown_balanced, safe_cut, split_message
+
+class FakeBot:
+    def __init__(self, reject_markdown=False):
+        self.messages = []          # [text, parse_mode]
+        self.reject_markdown = reject_markdown
+
+    def reply_to(self, message, text, parse_mode=None):
+        self._check(parse_mode)
+        self.messages.append([text, parse_mode])
+        return SimpleNamespace(chat=SimpleNamespace(id=1), message_id=len(self.messages) - 1)
+
+    def edit_message_text(self, text, chat_id, message_id, parse_mode=None):
+        self._check(parse_mode)
+        self.messages[message_id] = [text, parse_mode]
+
+    def _check(self, parse_mode):
+        if parse_mode and self.reject_markdown:
+            raise RuntimeError("can't parse entities")
+
+def test_markdown_balance():
+    assert is_markdown_balanced("*bold* and `code`")
+    assert not is_markdown_balanced("*open")
+    assert is_markdown_balanced("```\n* not a marker\n```")
+    assert is_markdown_balanced(r"\*escaped")
+
+def test_safe_cut_never_splits_an_entity():
+    text = "intro line\n*bold text that is long* end"
+    cut = safe_cut(text, 20)
+    assert is_markdown_balanced(text[:cut])
+
+def test_split_message_respects_limit():
+    text = "\n".join(f"line {i} *b*" for i in range(100))
+    parts = split_message(text, limit=100)
+    assert all(len(p) <= 100 for p in parts)
+    assert all(is_markdown_balanced(p) for p in parts)
+    assert "".join(parts).replace("\n", "") == text.replace("\n", "")
+
+def test_stream_first_chunk_then_throttled_edits():
+    bot = FakeBot()
+    reply = StreamingReply(bot, message=None, min_interval=0, min_growth=5)
+    reply.feed("Hello ")
+    assert len(bot.messages) == 1
+    reply.feed("wor")                   # growth kam hai, edit nahi
+    assert reply.edits == 0
+    reply.feed("ld, **done**")
+    assert reply.finish() == "Hello world, **done**"
+    assert bot.messages == [["Hello world, *done*", "Markdown"]]
+
+def test_long_stream_rolls_over_to_new_message():
+    bot = FakeBot()
+    reply = StreamingReply(bot, message=None, min_interval=0, min_growth=1, limit=50)
+    for i in range(20):
+        reply.feed(f"word{i} ")
+    reply.finish()
+    assert len(bot.messages) > 1
+    assert all(len(text) <= 50 for text, _ in bot.messages)
+
+def test_markdown_rejected_falls_back_to_plain_text():
+    bot = FakeBot(reject_markdown=True)
+    reply = StreamingReply(bot, message=None)
+    reply.feed("**hi** there")
+    reply.finish()
+    assert bot.messages == [["hi there", None]]
+    assert reply.markdown_fallbacks == 1
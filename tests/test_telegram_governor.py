@@ -0,0 +1,158 @@
+import asyncio
+import io
+import threading
+import time
+
+from fake_backends import FakeBotAPI, FakeHTTPResponse
+from telegram_governor import AsyncTelegramGovernor, TelegramGovernor, TokenBucket, PRIORITY_BULK, PRIORITY_LOG
+
+URL = "https://api.telegram.org/bot123:abc/"
+
+class FloodOnce:
+    def __init__(self):
+        self.calls = 0
+
+    def request(self, method, url, params=None, files=None, timeout=None, proxies=None):
+        self.calls += 1
+        if self.calls == 1:
+            return FakeHTTPResponse(429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.2}})
+        return FakeHTTPResponse(200, {"ok": True, "result": True})
+
+def make_governor(**kwargs):
+    gov = TelegramGovernor(**kwargs)
+    gov._session = FakeBotAPI(latency=(0, 0), seed=1)
+    return gov
+
+def test_token_bucket_refill_and_wait():
+    b = TokenBucket(rate=2, capacity=1)
+    now = b.stamp
+    b.tokens -= 1
+    assert b.wait_time(now) == 0.5
+    b.refill(now + 0.5)
+    assert b.wait_time(now + 0.5) == 0
+    b.blocked_until = now + 3
+    assert b.wait_time(now + 1) == 2
+
+def test_chat_rate_limit_is_enforced():
+    gov = make_governor(chat_rate=10, chat_burst=2)
+    t0 = time.monotonic()
+    for _ in range(5):
+        gov.send_request("post", URL + "sendMessage", params={"chat_id": 7, "text": "x"})
+    # 2 burst mein, baaki 3 ko 0.1s ke gap se
+    assert time.monotonic() - t0 >= 0.25
+    assert gov.sent == 5
+
+def test_exempt_methods_skip_buckets():
+    gov = make_governor(chat_rate=0.001, chat_burst=1)
+    t0 = time.monotonic()
+    for _ in range(5):
+        gov.send_request("post", URL + "sendChatAction", params={"chat_id": 7, "action": "typing"})
+    assert time.monotonic() - t0 < 0.5
+    assert gov.sent == 0
+
+def test_429_blocks_chat_and_retries():
+    gov = TelegramGovernor(chat_rate=100, chat_burst=10)
+    gov._session = FloodOnce()
+    t0 = time.monotonic()
+    response = gov.send_request("post", URL + "sendMessage", params={"chat_id": 9, "text": "x"})
+    assert response.status_code == 200
+    assert gov.retried_429 == 1
+    assert time.monotonic() - t0 >= 0.2
+
+def test_higher_priority_goes_first():
+    gov = make_governor(global_rate=1000, chat_rate=5, chat_burst=1)
+    gov.acquire("1", PRIORITY_LOG)          # bucket khaali
+    order = []
+
+    def send(name, priority):
+        gov.acquire("1", priority)
+        order.append(name)
+
+    log = threading.Thread(target=send, args=("log", PRIORITY_LOG))
+    log.start()
+    time.sleep(0.02)
+    bulk = threading.Thread(target=send, args=("bulk", PRIORITY_BULK))
+    bulk.start()
+    log.join(2)
+    bulk.join(2)
+    assert order == ["bulk", "log"]
+
+class Flood(Exception):
+    # telebot ke ApiTelegramException jaisa result_json
+    result_json = {"ok": False, "error_code": 429, "parameters": {"retry_after": 0.2}}
+
+def test_async_chat_rate_limit_and_exempt():
+    gov = AsyncTelegramGovernor(chat_rate=10, chat_burst=2)
+    async def ok(): return True
+
+    async def run():
+        t0 = time.monotonic()
+        for _ in range(5):
+            await gov.call("sendMessage", 7, ok)
+        limited = time.monotonic() - t0
+        t0 = time.monotonic()
+        for _ in range(5):
+            await gov.call("sendChatAction", 7, ok)
+        return limited, time.monotonic() - t0
+
+    limited, exempt = asyncio.run(run())
+    assert limited >= 0.25
+    assert exempt < 0.05
+    assert gov.sent == 5
+
+def test_async_429_retries_after_wait():
+    gov = AsyncTelegramGovernor(chat_rate=100, chat_burst=10)
+    calls = []
+    async def send():
+        calls.append(time.monotonic())
+        if len(calls) == 1: raise Flood()
+        return "ok"
+
+    assert asyncio.run(gov.call("sendMessage", 9, send)) == "ok"
+    assert gov.retried_429 == 1
+    assert calls[1] - calls[0] >= 0.2
+
+def test_async_429_on_send_voice_reuploads_whole_file():
+    gov = AsyncTelegramGovernor(chat_rate=100, chat_burst=10)
+    voice = io.BytesIO(b"OggS-voice")
+    uploads = []
+    async def send():
+        # telebot upload jaisa: stream poori padhi jaati hai, phir 429
+        uploads.append(voice.read())
+        if len(uploads) == 1: raise Flood()
+        return "ok"
+
+    assert asyncio.run(gov.call("sendVoice", 9, send, [voice])) == "ok"
+    assert uploads == [b"OggS-voice", b"OggS-voice"]
+
+def test_async_other_errors_are_not_retried():
+    gov = AsyncTelegramGovernor()
+    calls = []
+    async def send():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    try:
+        asyncio.run(gov.call("sendMessage", 9, send))
+    except ValueError:
+        pass
+    assert calls == [1]
+    assert gov.retried_429 == 0
+
+def test_async_higher_priority_goes_first():
+    gov = AsyncTelegramGovernor(global_rate=1000, chat_rate=5, chat_burst=1)
+    order = []
+
+    async def send(name, priority):
+        await gov.acquire("1", priority)
+        order.append(name)
+
+    async def run():
+        await gov.acquire("1", PRIORITY_LOG)     # bucket khaali
+        log = asyncio.create_task(send("log", PRIORITY_LOG))
+        await asyncio.sleep(0.02)
+        bulk = asyncio.create_task(send("bulk", PRIORITY_BULK))
+        await asyncio.wait_for(asyncio.gather(log, bulk), 2)
+
+    asyncio.run(run())
+    assert order == ["bulk", "log"]
@@ -0,0 +1,45 @@
+import os
+
+from tts_cache import AudioCache
+
+def test_put_and_get_bytes(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    key = AudioCache.make_key("edge", "voice", "namaste")
+    assert cache.get(key) is None
+    cache.put_bytes(key, b"mp3-data")
+    assert cache.get(key) == b"mp3-data"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_lru_eviction_by_bytes(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=25)
+    keys = [AudioCache.make_key("edge", "v", str(i)) for i in range(3)]
+    cache.put_bytes(keys[0], b"a" * 10)
+    cache.put_bytes(keys[1], b"b" * 10)
+    cache.get(keys[0])
+    cache.put_bytes(keys[2], b"c" * 10)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == b"a" * 10
+    assert cache.stats()["bytes"] <= 25
+
+def test_file_deleted_underneath_is_a_miss(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    key = AudioCache.make_key("gtts", "hi", "x")
+    cache.put_bytes(key, b"data")
+    os.remove(cache._path(key))
+    assert cache.get(key) is None
+    assert cache.stats()["files"] == 0
+    assert cache.stats()["bytes"] == 0
+
+def test_restart_keeps_files_and_drops_temp_leftovers(tmp_path):
+    cache = AudioCache(str(tmp_path))
+    key = AudioCache.make_key("edge", "v", "hello")
+    cache.put_bytes(key, b"12345")
+    leftover = cache.new_temp_path()
+    with open(leftover, "wb") as f: f.write(b"half")
+
+    again = AudioCache(str(tmp_path))
+    assert again.stats()["files"] == 1
+    assert again.stats()["bytes"] == 5
+    assert not os.path.exists(leftover)
+    assert again.get(key) == b"12345"
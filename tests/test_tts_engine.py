@@ -0,0 +1,47 @@
+import asyncio
+import types
+
+import pytest
+
+import tts_engine
+from tts_engine import TTSService
+
+class FakeCommunicate:
+    delay = 0
+
+    def __init__(self, text, voice):
+        self.text = text
+
+    async def stream(self):
+        await asyncio.sleep(self.delay)
+        yield {"type": "WordBoundary"}
+        yield {"type": "audio", "data": self.text.encode()}
+
+@pytest.fixture
+def service(monkeypatch):
+    FakeCommunicate.delay = 0
+    monkeypatch.setattr(tts_engine, "_edge_tts", types.SimpleNamespace(Communicate=FakeCommunicate))
+    svc = TTSService("hi-IN-MadhurNeural", edge_budget=0.2)
+    svc._gtts = lambda text: b"gtts:" + text.encode()
+    return svc
+
+def test_edge_synthesis(service):
+    assert service.synthesize("namaste") == ("edge", b"namaste")
+    assert service.edge_ok == 1
+
+def test_slow_edge_falls_back_to_gtts(service):
+    FakeCommunicate.delay = 1
+    assert service.synthesize("namaste") == ("gtts", b"gtts:namaste")
+    assert service.fallbacks == 1
+
+def test_synthesize_async_from_another_loop(service):
+    async def many():
+        return await asyncio.gather(*(service.synthesize_async(f"t{i}") for i in range(5)))
+    results = asyncio.run(many())
+    assert [data for _, data in results] == [f"t{i}".encode() for i in range(5)]
+
+def test_synthesize_async_timeout(service):
+    FakeCommunicate.delay = 1
+    service.edge_budget = 5
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(service.synthesize_async("x", timeout=0.05))
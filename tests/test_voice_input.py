@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# bot_core import par files (reply.json, quiz bank, tts cache) banata hai, isliye alag process mein
+SCRIPT = textwrap.dedent("""
+    import json, sys
+    from types import SimpleNamespace
+    sys.path.insert(0, {root!r})
+    import bot_core as core
+    uploads = []
+    core.genai = SimpleNamespace(upload_file=lambda f, mime_type: uploads.append((f.read(), mime_type)) or "file-ref")
+    small = core.voice_input(b"1234", "audio/ogg")
+    big = core.voice_input(b"123456789", "audio/mpeg")
+    print("RESULT " + json.dumps({{"small": small == {{"mime_type": "audio/ogg", "data": b"1234"}}, "big": big,
+                                 "uploads": [[d.decode(), m] for d, m in uploads]}}))
+""")
+
+def test_voice_input_inline_below_limit(tmp_path):
+    env = dict(os.environ, GEMINI_BACKEND="fake", TELEGRAM_BOT_TOKEN="123:abc", GOOGLE_API_KEY="x",
+               LOG_CHANNEL_ID="", PORT="", INLINE_AUDIO_LIMIT="8")
+    proc = subprocess.run([sys.executable, "-c", SCRIPT.format(root=ROOT)], cwd=tmp_path, env=env,
+                          capture_output=True, text=True, timeout=120)
+    out = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            out = json.loads(line[len("RESULT "):])
+    assert out is not None, proc.stderr
+    # Chhoti audio request ke andar, badi hi Files API se
+    assert out == {"small": True, "big": "file-ref", "uploads": [["123456789", "audio/mpeg"]]}
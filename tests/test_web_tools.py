@@ -0,0 +1,128 @@
+import socket
+
+import pytest
+
+import web_tools
+from web_tools import BlockedURL, PageFetcher, TextCollector, check_url, extract_urls, make_parser
+
+PUBLIC = {"example.com": "93.184.216.34", "other.org": "151.101.1.69", "evil.test": "127.0.0.1",
+          "meta.test": "169.254.169.254", "lan.test": "192.168.1.10"}
+
+@pytest.fixture(autouse=True)
+def fake_dns(monkeypatch):
+    def getaddrinfo(host, port, *args, **kwargs):
+        if ":" in host:
+            return [(socket.AF_INET6, socket.SOCK_STREAM, 6, "", (host, port, 0, 0))]
+        if host.replace(".", "").isdigit():
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (host, port))]
+        if host not in PUBLIC:
+            raise socket.gaierror("unknown host")
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (PUBLIC[host], port))]
+    monkeypatch.setattr(web_tools.socket, "getaddrinfo", getaddrinfo)
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {"Content-Type": "text/html; charset=utf-8"}
+        self.encoding = "utf-8"
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+class FakeSession:
+    def __init__(self, routes):
+        self.routes = routes      # url -> FakeResponse ya callable(headers)
+        self.requested = []
+
+    def get(self, url, headers=None, timeout=None, stream=False, allow_redirects=True):
+        assert allow_redirects is False
+        self.requested.append((url, dict(headers or {})))
+        route = self.routes[url]
+        return route(headers or {}) if callable(route) else route
+
+def fetcher(routes, **kwargs):
+    f = PageFetcher(backend="stdlib", **kwargs)
+    f.session = FakeSession(routes)
+    return f
+
+def html(*paras):
+    return ("<html><script>var x='<p>no</p>';</script>" + "".join(f"<p>{p}</p>" for p in paras) + "</html>").encode()
+
+def test_extract_urls():
+    assert extract_urls("dekho https://example.com/a, aur (http://other.org/b).") == ["https://example.com/a", "http://other.org/b"]
+
+def test_collector_keeps_only_paragraph_text():
+    collector = TextCollector(max_chars=100)
+    parser = make_parser(collector, "stdlib")
+    parser.feed("<p>one <b>two</b></p><style>p{}</style><div>skip</div><p>three")
+    parser.close()
+    assert collector.close() == "one two three"
+
+@pytest.mark.parametrize("url", [
+    "http://evil.test/", "http://meta.test/latest/meta-data", "http://lan.test/", "http://127.0.0.1/",
+    "http://[::1]/", "https://example.com:8443/", "ftp://example.com/", "file:///etc/passwd", "http://nohost.invalid/",
+])
+def test_check_url_blocks_non_public_targets(url):
+    with pytest.raises(BlockedURL):
+        check_url(url)
+
+def test_check_url_allows_public_hosts():
+    check_url("https://example.com/page")
+    check_url("http://other.org:80/x")
+    check_url("http://8.8.8.8/")
+
+def test_fetch_extracts_and_caches():
+    f = fetcher({"https://example.com/": FakeResponse(body=html("Hello", "World"), headers={
+        "Content-Type": "text/html", "ETag": '"v1"'})}, fresh_ttl=60)
+    page = f.fetch("https://example.com/")
+    assert page.text == "Hello World"
+    assert f.fetch("https://example.com/") is page
+    assert f.stats()["cache_hits"] == 1
+
+def test_conditional_request_after_ttl():
+    def route(headers):
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(body=html("Hello"), headers={"Content-Type": "text/html", "ETag": '"v1"'})
+
+    f = fetcher({"https://example.com/": route}, fresh_ttl=0)
+    first = f.fetch("https://example.com/")
+    assert f.fetch("https://example.com/") is first
+    assert f.stats()["not_modified"] == 1
+
+def test_text_budget_stops_download():
+    body = html(*["x" * 100] * 500)
+    f = fetcher({"https://example.com/": FakeResponse(body=body)}, max_chars=300, chunk_size=1024)
+    page = f.fetch("https://example.com/")
+    assert len(page.text) <= 300
+    assert f.stats()["kb_read"] < len(body) // 1024
+
+def test_redirect_to_private_address_is_blocked():
+    f = fetcher({
+        "https://example.com/go": FakeResponse(302, headers={"Location": "http://meta.test/latest"}),
+        "http://meta.test/latest": FakeResponse(body=html("secret")),
+    })
+    assert f.fetch("https://example.com/go") is None
+    assert [u for u, _ in f.session.requested] == ["https://example.com/go"]
+    assert f.stats()["blocked"] == 1
+
+def test_public_redirect_is_followed():
+    f = fetcher({
+        "https://example.com/go": FakeResponse(301, headers={"Location": "/final"}),
+        "https://example.com/final": FakeResponse(body=html("Landed")),
+    })
+    assert f.fetch("https://example.com/go").text == "Landed"
+
+def test_redirect_loop_is_cut():
+    f = fetcher({"https://example.com/a": FakeResponse(302, headers={"Location": "/a"})}, max_redirects=3)
+    assert f.fetch("https://example.com/a") is None
+    assert len(f.session.requested) == 4
@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main.py import par threads aur files banata hai, isliye har mode alag process mein
+SCRIPT = textwrap.dedent("""
+    import json, sys
+    sys.path.insert(0, {root!r})
+    import main
+    seen = []
+    main.bot.process_new_updates = seen.extend
+    client = main.app.test_client()
+    update = json.dumps({{"update_id": 1, "message": {{"message_id": 1, "date": 0, "chat": {{"id": 5, "type": "private"}},
+                                                    "from": {{"id": 5, "is_bot": False, "first_name": "A"}}, "text": "hi"}}}})
+    out = {{}}
+    for name, secret in (("none", None), ("wrong", "nope"), ("right", "s3cret")):
+        headers = {{"X-Telegram-Bot-Api-Secret-Token": secret}} if secret else {{}}
+        out[name] = client.post("/telegram/webhook", data=update, headers=headers).status_code
+    out["dispatched"] = len(seen)
+    print("RESULT " + json.dumps(out))
+""")
+
+def run_main(tmp_path, **env):
+    full_env = dict(os.environ, GEMINI_BACKEND="fake", TELEGRAM_BOT_TOKEN="123:abc", GOOGLE_API_KEY="x",
+                    LOG_CHANNEL_ID="", PORT="", **env)
+    proc = subprocess.run([sys.executable, "-c", SCRIPT.format(root=ROOT)], cwd=tmp_path, env=full_env,
+                          capture_output=True, text=True, timeout=120)
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return proc, json.loads(line[len("RESULT "):])
+    return proc, None
+
+def test_polling_mode_has_no_webhook_route(tmp_path):
+    _, result = run_main(tmp_path, BOT_MODE="polling", WEBHOOK_SECRET="s3cret")
+    assert result == {"none": 404, "wrong": 404, "right": 404, "dispatched": 0}
+
+def test_webhook_mode_checks_secret(tmp_path):
+    _, result = run_main(tmp_path, BOT_MODE="webhook", WEBHOOK_SECRET="s3cret")
+    assert result == {"none": 403, "wrong": 403, "right": 200, "dispatched": 1}
+
+def test_webhook_mode_refuses_empty_secret(tmp_path):
+    proc, result = run_main(tmp_path, BOT_MODE="webhook", WEBHOOK_SECRET="")
+    assert result is None
+    assert proc.returncode != 0
+    assert "WEBHOOK_SECRET" in proc.stderr
@@ -0,0 +1,110 @@
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+TEMP_PREFIX = ".tts-"
+
+class AudioCache:
+    """
+    Bani hui TTS audio ko disk par (engine, voice, text) ke hash se rakhta hai.
+    Total size byte budget se zyada ho to sabse purani (LRU) files hat jaati hain.
+    """
+
+    def __init__(self, folder, max_bytes=200 * 1024 * 1024, ext=".mp3"):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.ext = ext
+        self._lock = threading.Lock()
+        self._files = OrderedDict()   # key -> size (LRU order)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(folder, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def make_key(engine, voice, text):
+        return hashlib.sha256(f"{engine}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.folder, key + self.ext)
+
+    def _scan(self):
+        # Restart ke baad purani files ko last-use time ke order mein wapas lo
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith(self.ext): continue
+            path = os.path.join(self.folder, name)
+            if name.startswith(TEMP_PREFIX):
+                # Crash/kill se bachi adhoori temp file: cache ka hissa nahi hai
+                try: os.remove(path)
+                except OSError: pass
+                continue
+            try: st = os.stat(path)
+            except OSError: continue
+            entries.append((st.st_mtime, name[:-len(self.ext)], st.st_size))
+        for _, key, size in sorted(entries):
+            self._files[key] = size
+            self._bytes += size
+        self._evict()
+
+    def get(self, key):
+        """
+        Cached audio ke bytes deta hai, na ho to None.
+        Path nahi dete: wapas karne ke baad eviction file delete kar sakta hai.
+        """
+        with self._lock:
+            if key not in self._files:
+                self.misses += 1
+                return None
+            self._files.move_to_end(key)
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f: data = f.read()
+            os.utime(path)
+        except OSError:
+            # Beech mein evict ho gayi ya bahar se delete hui: miss maano, caller dobara banayega
+            with self._lock:
+                if key in self._files:
+                    self._bytes -= self._files.pop(key)
+                self.misses += 1
+            return None
+        with self._lock: self.hits += 1
+        return data
+
+    def new_temp_path(self):
+        fd, tmp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, suffix=self.ext, dir=self.folder)
+        os.close(fd)
+        return tmp_path
+
+    def put_file(self, key, tmp_path):
+        """
+        Temp file ko cache mein move karta hai aur final path return karta hai.
+        """
+        path = self._path(key)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._bytes -= self._files.pop(key, 0)
+            self._files[key] = size
+            self._bytes += size
+            self._evict()
+        return path
+
+    def put_bytes(self, key, data):
+        tmp_path = self.new_temp_path()
+        with open(tmp_path, "wb") as f: f.write(data)
+        return self.put_file(key, tmp_path)
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            key, size = self._files.popitem(last=False)
+            self._bytes -= size
+            try: os.remove(self._path(key))
+            except OSError: pass
+
+    def stats(self):
+        with self._lock:
+            return {"files": len(self._files), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,89 @@
+import io
+import asyncio
+import importlib
+import threading
+
+_edge_tts = None
+
+def _load_edge_tts():
+    # edge_tts (aiohttp ke saath) bhaari import hai, pehli synthesis par hi load karo
+    global _edge_tts
+    if _edge_tts is None:
+        try:
+            _edge_tts = importlib.import_module("edge_tts")
+        except ImportError:
+            _edge_tts = False
+    return _edge_tts
+
+class TTSService:
+    """
+    edge-tts ko process ke andar ek hamesha chalne wale asyncio loop par chalata hai.
+    Audio seedha memory mein aata hai; edge slow/fail ho to usi request ke liye gTTS.
+    """
+
+    def __init__(self, voice, max_concurrent=4, edge_budget=8.0, lang="hi"):
+        self.voice = voice
+        self.lang = lang
+        self.edge_budget = edge_budget
+        self.edge_ok = 0
+        self.fallbacks = 0
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="tts-loop", daemon=True)
+        self._thread.start()
+        # Semaphore loop ke andar hi banana padta hai
+        self._sem = asyncio.run_coroutine_threadsafe(self._make_sem(max_concurrent), self._loop).result()
+
+    @staticmethod
+    async def _make_sem(n):
+        return asyncio.Semaphore(n)
+
+    async def _edge(self, text):
+        chunks = []
+        communicate = _load_edge_tts().Communicate(text, self.voice)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                chunks.append(chunk["data"])
+        if not chunks:
+            raise RuntimeError("edge-tts returned no audio")
+        return b"".join(chunks)
+
+    def _gtts(self, text):
+        from gtts import gTTS
+        buf = io.BytesIO()
+        gTTS(text=text, lang=self.lang, slow=False).write_to_fp(buf)
+        return buf.getvalue()
+
+    async def _synthesize(self, text):
+        async with self._sem:
+            if _load_edge_tts():
+                try:
+                    data = await asyncio.wait_for(self._edge(text), self.edge_budget)
+                    self.edge_ok += 1
+                    return "edge", data
+                except Exception as e:
+                    print(f"Edge TTS Failed, using gTTS: {e!r}")
+            self.fallbacks += 1
+            data = await self._loop.run_in_executor(None, self._gtts, text)
+            return "gtts", data
+
+    def synthesize(self, text, timeout=30):
+        """
+        (engine, mp3 bytes) return karta hai. Blocking call, kisi bhi thread se chala sakte ho.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._synthesize(text), self._loop)
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+    async def synthesize_async(self, text, timeout=30):
+        """
+        synthesize() jaisa, par dusre event loop se await karne ke liye (koi thread block nahi hota).
+        """
+        future = asyncio.run_coroutine_threadsafe(self._synthesize(text), self._loop)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except BaseException:
+            future.cancel()
+            raise
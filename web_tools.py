@@ -1,29 +1,301 @@
+import re
+import time
+import codecs
+import socket
+import hashlib
+import ipaddress
+import threading
+from collections import OrderedDict
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, urljoin
+
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
-def scrape_website(url):
+from singleflight import SingleFlight
+
+# lxml ho to wahi use karo (C parser, kaafi tez); na ho to stdlib html.parser
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+URL_RE = re.compile(r"https?://[^\s<>\"']+", re.IGNORECASE)
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+# Sirf public web: yahi schemes aur unke default ports
+DEFAULT_PORTS = {"http": 80, "https": 443}
+REDIRECT_CODES = {301, 302, 303, 307, 308}
+
+class BlockedURL(ValueError):
+    pass
+
+def _is_public_address(ip):
+    if getattr(ip, "ipv4_mapped", None): ip = ip.ipv4_mapped
+    return ip.is_global and not (ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_reserved
+                                 or ip.is_multicast or ip.is_unspecified)
+
+def check_url(url):
     """
-    Website ke URL se text nikalta hai.
+    User ka bheja link bot ke network se andar (localhost, 10.x, 169.254.x metadata) na jaaye.
+    http/https + default port hona chahiye, aur host ke saare resolved IPs public hone chahiye.
     """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        raise BlockedURL(f"scheme not allowed: {scheme or '-'}")
+    try:
+        port = parts.port
+    except ValueError:
+        raise BlockedURL("bad port")
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        raise BlockedURL(f"port not allowed: {port}")
+    host = parts.hostname
+    if not host:
+        raise BlockedURL("no host")
     try:
-        # Browser ban kar request bhejenge taaki block na hon
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        
-        if response.status_code != 200:
+        infos = socket.getaddrinfo(host, DEFAULT_PORTS[scheme], proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise BlockedURL(f"cannot resolve {host}: {e}")
+    for info in infos:
+        ip = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if not _is_public_address(ip):
+            raise BlockedURL(f"non-public address for {host}: {ip}")
+
+def extract_urls(text):
+    # Message ke saare links (aakhri bracket/punctuation hata ke)
+    return [u.rstrip(".,;:!?)]}") for u in URL_RE.findall(text or "")]
+
+class TextCollector:
+    """
+    Sirf <p> tags ka text jodta hai (script/style chhod ke).
+    max_chars bharte hi full ho jaata hai, taaki fetcher download rok sake.
+    """
+
+    def __init__(self, max_chars=8000):
+        self.max_chars = max_chars
+        self.parts = []
+        self.size = 0
+        self._in_p = False
+        self._skip = 0
+        self._current = []
+
+    @property
+    def full(self):
+        return self.size >= self.max_chars
+
+    def start(self, tag, attrib=None):
+        tag = tag.lower()
+        if tag in SKIP_TAGS: self._skip += 1
+        elif tag == "p":
+            # <p> bina band kiye naya <p> shuru ho sakta hai
+            self._finish_paragraph()
+            self._in_p = True
+
+    def end(self, tag):
+        tag = tag.lower()
+        if tag in SKIP_TAGS: self._skip = max(0, self._skip - 1)
+        elif tag == "p": self._finish_paragraph()
+
+    def data(self, data):
+        if self._in_p and not self._skip and not self.full:
+            self._current.append(data)
+
+    def close(self):
+        self._finish_paragraph()
+        return self.text()
+
+    def _finish_paragraph(self):
+        if self._current:
+            para = " ".join("".join(self._current).split())
+            if para:
+                self.parts.append(para)
+                self.size += len(para) + 1
+        self._current = []
+        self._in_p = False
+
+    def text(self):
+        return " ".join(self.parts)[:self.max_chars]
+
+class _StdlibParser(HTMLParser):
+    # html.parser ke callbacks ko TextCollector par bhejta hai
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs): self.target.start(tag)
+    def handle_endtag(self, tag): self.target.end(tag)
+    def handle_data(self, data): self.target.data(data)
+
+def make_parser(target, backend="auto"):
+    """
+    Incremental parser deta hai jisme feed(chunk) aur close() hain.
+    """
+    if backend in ("auto", "lxml") and etree is not None:
+        return etree.HTMLParser(target=target)
+    return _StdlibParser(target)
+
+class Page:
+    __slots__ = ("url", "text", "etag", "last_modified", "checked_at")
+
+    def __init__(self, url, text, etag=None, last_modified=None):
+        self.url = url
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.checked_at = time.monotonic()
+
+    @property
+    def version(self):
+        # Page badla ya nahi, iski pehchaan (response cache key mein kaam aati hai)
+        if self.etag or self.last_modified:
+            return f"{self.etag}|{self.last_modified}"
+        return hashlib.sha1(self.text.encode("utf-8")).hexdigest()[:16]
+
+class PageFetcher:
+    """
+    Links ka text nikalta hai: ek hi pooled session, byte limit ke saath streamed download,
+    text budget bharte hi parsing band, aur ETag/Last-Modified wala URL cache.
+    Dobara same link aaye to sirf ek conditional request (304) jaati hai.
+    """
+
+    def __init__(self, max_bytes=2 * 1024 * 1024, max_chars=8000, timeout=10, cache_entries=500,
+                 fresh_ttl=60, pool_size=16, chunk_size=16 * 1024, backend="auto", max_redirects=5):
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.timeout = timeout
+        self.cache_entries = cache_entries
+        self.fresh_ttl = fresh_ttl
+        self.chunk_size = chunk_size
+        self.backend = backend
+        self.max_redirects = max_redirects
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"})
+        self._cache = OrderedDict()   # url -> Page
+        self._lock = threading.Lock()
+        # Ek hi link kai users ek saath bhejein to download ek hi baar
+        self._flight = SingleFlight(max_workers=pool_size)
+        self.fetches = 0
+        self.not_modified = 0
+        self.cache_hits = 0
+        self.truncated = 0
+        self.bytes_read = 0
+        self.blocked = 0
+
+    def fetch(self, url):
+        """
+        URL ka Page deta hai (cache ya network se); fail ho to None.
+        """
+        with self._lock:
+            page = self._cache.get(url)
+            if page is not None:
+                self._cache.move_to_end(url)
+                if time.monotonic() - page.checked_at < self.fresh_ttl:
+                    self.cache_hits += 1
+                    return page
+        try:
+            return self._flight.do(url, self._fetch, url, page, timeout=self.timeout * 3)
+        except BlockedURL as e:
+            with self._lock: self.blocked += 1
+            print(f"Scraping Blocked ({url}): {e}")
+            return None
+        except Exception as e:
+            print(f"Scraping Error: {e}")
             return None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Sirf Paragraphs (p tags) nikalo, ads aur menu hata do
-        paragraphs = soup.find_all('p')
-        text_content = ' '.join([p.get_text() for p in paragraphs])
-        
-        # Text agar bahut lamba hai to cut kar do (Gemini limit ke liye)
-        return text_content[:8000] 
-    except Exception as e:
-        print(f"Scraping Error: {e}")
-        return None
-      
+    def _open(self, url, headers):
+        # Redirects khud follow karte hain, taaki har hop ka host bhi check ho
+        target = url
+        for _ in range(self.max_redirects + 1):
+            check_url(target)
+            response = self.session.get(target, headers=headers, timeout=self.timeout, stream=True, allow_redirects=False)
+            location = response.headers.get("Location")
+            if response.status_code not in REDIRECT_CODES or not location:
+                return response
+            response.close()
+            target = urljoin(target, location)
+        raise BlockedURL(f"too many redirects: {url}")
+
+    def _fetch(self, url, cached):
+        headers = {}
+        if cached is not None:
+            if cached.etag: headers["If-None-Match"] = cached.etag
+            if cached.last_modified: headers["If-Modified-Since"] = cached.last_modified
+        with self._open(url, headers) as response:
+            with self._lock: self.fetches += 1
+            if response.status_code == 304 and cached is not None:
+                with self._lock:
+                    self.not_modified += 1
+                    cached.checked_at = time.monotonic()
+                return cached
+            if response.status_code != 200:
+                return None
+            content_type = response.headers.get("Content-Type", "")
+            if content_type and "html" not in content_type and "text" not in content_type:
+                return None
+            text = self._extract(response)
+        page = Page(url, text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        self._store(page)
+        return page
+
+    def _extract(self, response):
+        # Header mein charset na ho to utf-8 (requests ka ISO-8859-1 default galat nikalta hai)
+        encoding = response.encoding if "charset" in response.headers.get("Content-Type", "").lower() else "utf-8"
+        try: decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError: decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        collector = TextCollector(self.max_chars)
+        parser = make_parser(collector, self.backend)
+        read = 0
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            read += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            # Text budget bhar gaya ya byte limit: baaki page download hi nahi hoga
+            if collector.full or read >= self.max_bytes:
+                if read >= self.max_bytes and not collector.full:
+                    with self._lock: self.truncated += 1
+                break
+        try: parser.close()
+        except Exception: pass    # lxml adhoore/khali document par error deta hai
+        with self._lock: self.bytes_read += read
+        return collector.close()
+
+    def _store(self, page):
+        with self._lock:
+            self._cache[page.url] = page
+            self._cache.move_to_end(page.url)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "fetches": self.fetches,
+                "not_modified": self.not_modified,
+                "cache_hits": self.cache_hits,
+                "truncated": self.truncated,
+                "blocked": self.blocked,
+                "kb_read": self.bytes_read // 1024,
+                "cached": len(self._cache),
+                "parser": "lxml" if (etree is not None and self.backend != "stdlib") else "html.parser",
+            }
+
+_default_fetcher = None
+_default_lock = threading.Lock()
+
+def get_fetcher():
+    global _default_fetcher
+    if _default_fetcher is None:
+        with _default_lock:
+            if _default_fetcher is None:
+                _default_fetcher = PageFetcher()
+    return _default_fetcher
+
+def scrape_website(url):
+    """
+    Website ke URL se text nikalta hai.
+    """
+    page = get_fetcher().fetch(url)
+    return page.text if page else None